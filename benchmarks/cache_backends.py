@@ -0,0 +1,92 @@
+"""
+Compare get/set/cull throughput of the cache backends.
+
+Run from the repository root::
+
+    uv run python benchmarks/cache_backends.py --ops 20000 --max-entries 1000
+
+``cull`` writes twice as many distinct keys as ``MAX_ENTRIES`` allows, so every
+second write has to evict something.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+PAYLOAD = {"html": "x" * 2048, "etag": '"0123456789abcdef"', "version": 1}
+
+
+def configure(max_entries, location):
+    settings.configure(
+        CACHES={
+            "filebased": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(Path(location) / "filebased"),
+                "OPTIONS": {"MAX_ENTRIES": max_entries},
+            },
+            "locmem": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "OPTIONS": {"MAX_ENTRIES": max_entries},
+            },
+            "shared": {
+                "BACKEND": "apps.core.backends.cache.SharedMemoryCache",
+                "LOCATION": str(Path(location) / "shared"),
+                "OPTIONS": {"MAX_ENTRIES": max_entries, "SLOT_SIZE": 8192},
+            },
+        }
+    )
+    django.setup()
+
+
+def rate(ops, func):
+    started = time.perf_counter()
+    func()
+    return ops / (time.perf_counter() - started)
+
+
+def bench(cache, ops, max_entries):
+    cache.clear()
+    keys = [f"key-{index}" for index in range(max_entries // 2)]
+    for key in keys:
+        cache.set(key, PAYLOAD)
+
+    def gets():
+        for index in range(ops):
+            cache.get(keys[index % len(keys)])
+
+    def sets():
+        for index in range(ops):
+            cache.set(keys[index % len(keys)], PAYLOAD)
+
+    def culls():
+        for index in range(ops):
+            cache.set(f"cull-{index % (max_entries * 2)}", PAYLOAD)
+
+    return rate(ops, gets), rate(ops, sets), rate(ops, culls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as location:
+        configure(args.max_entries, location)
+        from django.core.cache import caches
+
+        print(f"{'backend':<12} {'get/s':>12} {'set/s':>12} {'cull/s':>12}")
+        for alias in ("filebased", "locmem", "shared"):
+            get_rate, set_rate, cull_rate = bench(caches[alias], args.ops, args.max_entries)
+            print(f"{alias:<12} {get_rate:>12,.0f} {set_rate:>12,.0f} {cull_rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
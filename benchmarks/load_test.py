@@ -0,0 +1,297 @@
+"""
+Load test the dashboard at fixed concurrency levels and write a JSON report.
+
+Run from the repository root::
+
+    uv run python benchmarks/load_test.py run --services 1000 10000 --concurrency 1 8 32 --output before.json
+    uv run python benchmarks/load_test.py compare before.json after.json
+
+For every catalog size in ``--services`` a fresh SQLite database is filled by
+``generate_services`` and granian is started with the production settings (see
+``servers.py``). Every endpoint is then driven at every ``--concurrency`` level
+for ``--seconds``. The report records requests per second, latency percentiles,
+SQL queries per request (from the ``X-Queries`` header added by
+``querycount.QueryCountMiddleware``) and the RSS of every granian worker, and
+is keyed by commit so two runs can be compared with ``compare``.
+
+Endpoints in ``PAGE_CACHED`` are served from the page cache once warm. A
+response whose ``Server-Timing`` header has a ``template`` phase was rendered
+instead, and the run exits with status 1 if any such endpoint was rendered
+after the warm-up, e.g. because the page no longer fits into the cache.
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from servers import ROOT, SERVERS, free_port, prepare, request, wait_until_ready
+
+ENDPOINTS = {
+    "home": "/",
+    "connection-info": "/connection-info/",
+    "media": "/media/{logo}",
+    "admin-changelist": "/admin/core/service/",
+}
+# Anonymous pages that must not be rendered again once the page cache is warm.
+PAGE_CACHED = {"home"}
+EXTRA_SETTINGS = 'SERVER_TIMING = True\nMIDDLEWARE = ["querycount.QueryCountMiddleware", *MIDDLEWARE]  # noqa: F405\n'
+SETUP_SCRIPT = """\
+import json
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from apps.core.models import Service
+
+user = get_user_model().objects.create_superuser("loadtest", "", "loadtest")
+session = SessionStore()
+session[SESSION_KEY] = str(user.pk)
+session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+session.create()
+logo = Service.objects.exclude(logo_file="").values_list("logo_file", flat=True).first()
+print(json.dumps({"session": session.session_key, "logo": logo}))
+"""
+
+
+def git_commit():
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    status = subprocess.run(["git", "status", "--porcelain"], cwd=ROOT, capture_output=True, text=True)
+    return commit.stdout.strip() + ("-dirty" if status.stdout.strip() else "")
+
+
+def worker_rss(pid):
+    """Resident set size in MiB of every child process of ``pid``, or of ``pid`` itself (Linux only)."""
+
+    def rss(status_path):
+        for line in status_path.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+        return 0.0
+
+    children = []
+    for stat_path in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The fields after the parenthesised command are "state ppid ..."
+            if int(stat_path.read_text().rsplit(")", 1)[1].split()[1]) == pid:
+                children.append(rss(stat_path.parent / "status"))
+        except (OSError, IndexError, ValueError):
+            continue
+    if not children:
+        try:
+            return [rss(Path(f"/proc/{pid}/status"))]
+        except OSError:
+            return []
+    return sorted(children)
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+
+def drive(port, path, headers, concurrency, seconds):
+    stop = threading.Event()
+    latencies = [[] for _ in range(concurrency)]
+    queries = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    rendered = [0] * concurrency
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                response = request(connection, path, headers)
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            latencies[index].append(time.perf_counter() - started)
+            if response.status != 200:
+                errors[index] += 1
+            if response.getheader("X-Queries") is not None:
+                queries[index].append(int(response.getheader("X-Queries")))
+            if "template;" in (response.getheader("Server-Timing") or ""):
+                rendered[index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(latency for per_client in latencies for latency in per_client)
+    counts = [count for per_client in queries for count in per_client]
+    if not samples:
+        return {
+            "requests_per_second": 0.0,
+            "latency_ms": None,
+            "queries_per_request": None,
+            "rendered": 0,
+            "errors": sum(errors),
+        }
+    return {
+        "requests_per_second": round(len(samples) / seconds, 1),
+        "latency_ms": {
+            "p50": round(percentile(samples, 0.50), 2),
+            "p90": round(percentile(samples, 0.90), 2),
+            "p99": round(percentile(samples, 0.99), 2),
+            "max": round(samples[-1] * 1000, 2),
+        },
+        "queries_per_request": round(sum(counts) / len(counts), 2) if counts else None,
+        "rendered": sum(rendered),
+        "errors": sum(errors),
+    }
+
+
+def run_catalog(services, args):
+    """Run every endpoint at every concurrency level against a catalog of ``services`` services."""
+    results = []
+    with tempfile.TemporaryDirectory() as location:
+        env = prepare(location, services, EXTRA_SETTINGS)
+        setup = subprocess.run(
+            [sys.executable, str(ROOT / "manage.py"), "shell", "-v0", "-c", SETUP_SCRIPT],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        setup = json.loads(setup.stdout.strip().splitlines()[-1])
+        port = free_port()
+        server = SERVERS[f"granian-{args.interface}"]
+        command = [sys.executable, *(part.format(workers=args.workers, port=port) for part in server)]
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_ready(port, process)
+            for endpoint in args.endpoint:
+                if endpoint == "media" and not setup["logo"]:
+                    continue
+                path = ENDPOINTS[endpoint].format(logo=setup["logo"])
+                headers = {"Cookie": f"sessionid={setup['session']}"} if endpoint == "admin-changelist" else {}
+                # Fill caches and open the database connection in every worker before measuring.
+                drive(port, path, headers, max(args.concurrency), 1)
+                for concurrency in args.concurrency:
+                    result = drive(port, path, headers, concurrency, args.seconds)
+                    result = {"services": services, "endpoint": endpoint, "concurrency": concurrency, **result}
+                    result["worker_rss_mib"] = worker_rss(process.pid)
+                    results.append(result)
+                    print(format_result(result), flush=True)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return results
+
+
+def format_result(result):
+    latency = result["latency_ms"] or {"p50": 0, "p99": 0}
+    queries = result["queries_per_request"]
+    return (
+        f"{result['services']:>8} {result['endpoint']:<17} {result['concurrency']:>5} "
+        f"{result['requests_per_second']:>9,.0f} {latency['p50']:>8.2f} {latency['p99']:>8.2f} "
+        f"{'-' if queries is None else f'{queries:.1f}':>8} {max(result['worker_rss_mib'], default=0):>8.1f} "
+        f"{result['errors']:>7}"
+    )
+
+
+def cache_failures(results):
+    """Results of page-cached endpoints that were rendered after the warm-up."""
+    return [result for result in results if result["endpoint"] in PAGE_CACHED and result["rendered"]]
+
+
+def run(args):
+    print(
+        f"{'services':>8} {'endpoint':<17} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'queries':>8} {'rss MiB':>8} {'errors':>7}",
+        flush=True,
+    )
+    results = []
+    for services in args.services:
+        results.extend(run_catalog(services, args))
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "interface": args.interface,
+            "workers": args.workers,
+            "seconds": args.seconds,
+            "concurrency": args.concurrency,
+            "endpoints": args.endpoint,
+        },
+        "results": results,
+    }
+    output = Path(args.output or f"load-test-{report['commit']}.json")
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {output}")
+    failures = cache_failures(results)
+    for result in failures:
+        print(
+            f"FAIL: {result['endpoint']} with {result['services']} services rendered {result['rendered']} times "
+            f"at concurrency {result['concurrency']} instead of being served from the page cache",
+            file=sys.stderr,
+        )
+    if failures:
+        sys.exit(1)
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return ""
+    return f"{(new - old) / old:+.0%}"
+
+
+def compare(args):
+    """Print the difference between two reports for every (services, endpoint, concurrency)."""
+    old, new = (json.loads(Path(path).read_text()) for path in (args.old, args.new))
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'services':>8} {'endpoint':<17} {'conc':>5} {'req/s':>20} {'p99 ms':>22} {'queries':>14}")
+    before = {(r["services"], r["endpoint"], r["concurrency"]): r for r in old["results"]}
+    for result in new["results"]:
+        previous = before.get((result["services"], result["endpoint"], result["concurrency"]))
+        if previous is None:
+            continue
+        old_p99 = (previous["latency_ms"] or {}).get("p99")
+        new_p99 = (result["latency_ms"] or {}).get("p99")
+        print(
+            f"{result['services']:>8} {result['endpoint']:<17} {result['concurrency']:>5} "
+            f"{previous['requests_per_second']:>8,.0f} {result['requests_per_second']:>6,.0f} "
+            f"{change(previous['requests_per_second'], result['requests_per_second']):>5} "
+            f"{old_p99 or 0:>8.2f} {new_p99 or 0:>8.2f} {change(old_p99, new_p99):>5} "
+            f"{previous['queries_per_request'] or 0:>6.1f} {result['queries_per_request'] or 0:>6.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the load test and write a report")
+    run_parser.add_argument("--services", type=int, nargs="+", default=[1000], help="Catalog sizes")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    run_parser.add_argument("--seconds", type=float, default=5.0)
+    run_parser.add_argument("--workers", type=int, default=4)
+    run_parser.add_argument("--interface", choices=["wsgi", "asgi"], default="wsgi")
+    run_parser.add_argument("--endpoint", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    run_parser.add_argument("--output", help="Report path, default load-test-<commit>.json")
+    compare_parser = commands.add_parser("compare", help="Compare two reports")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Middleware for the load test harness that reports the number of SQL queries of
+every request in an ``X-Queries`` response header.
+"""
+
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class QueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        response["X-Queries"] = str(count)
+        return response
@@ -0,0 +1,107 @@
+"""
+Compare the FTS5 service search with the ``icontains`` scan it replaces.
+
+Run from the repository root::
+
+    uv run python benchmarks/search.py --services 100000
+
+A fresh SQLite database is filled by ``generate_services`` (without logos).
+Every query is then run ``--repeat`` times through ``search_services`` and
+through the ``name``/``description`` ``icontains`` filter that the admin used
+before, both limited to 20 results, and the p50/p99 latency is reported.
+``common`` words appear in about 10% of the services, ``rare`` ones in one.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+QUERIES = {
+    "common": ["media", "backup serv", "wiki", "cam"],
+    "rare": ["000042", "synthetic 012345", "printer 099"],
+    "none": ["zzz", "jellyfin"],
+}
+HEADER = f"{'kind':<8} {'query':<18} {'fts p50':>8} {'fts p99':>8} {'like p50':>9} {'like p99':>9} {'hits':>5}"
+
+
+def configure(location):
+    settings.configure(
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth", "apps.core"],
+        DATABASES={"default": {"ENGINE": "apps.core.backends.sqlite3", "NAME": str(Path(location) / "db.sqlite3")}},
+        SQLITE_PRAGMAS={"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -16 * 1024},
+        MEDIA_ROOT=str(Path(location) / "media"),
+        DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+        USE_TZ=True,
+        SERVER_TIMING=False,
+        METRICS_ENABLED=False,
+    )
+    django.setup()
+
+
+def prepare(services):
+    from django.core.management import call_command
+
+    from apps.core.models import Service
+
+    call_command("migrate", verbosity=0)
+    Service.objects.all().delete()
+    call_command("generate_services", count=services, logos=0, verbosity=0)
+
+
+def like_search(query):
+    from django.db.models import Q
+
+    from apps.core.models import Service
+
+    services = Service.objects.filter(is_active=True)
+    for word in query.split():
+        services = services.filter(Q(name__icontains=word) | Q(description__icontains=word))
+    return list(services.values_list("name", flat=True)[:20])
+
+
+def timed(function, query, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = function(query)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99)] * 1000, len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as location:
+        configure(location)
+        started = time.perf_counter()
+        prepare(args.services)
+        print(f"Generated {args.services:,} services in {time.perf_counter() - started:.1f}s", flush=True)
+
+        from apps.core.search import search_services
+
+        print(HEADER)
+        for kind, queries in QUERIES.items():
+            for query in queries:
+                fts_p50, fts_p99, hits = timed(search_services, query, args.repeat)
+                like_p50, like_p99, _hits = timed(like_search, query, args.repeat)
+                print(
+                    f"{kind:<8} {query:<18} {fts_p50:>8.2f} {fts_p99:>8.2f} {like_p50:>9.2f} {like_p99:>9.2f} "
+                    f"{hits:>5}",
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
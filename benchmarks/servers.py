@@ -0,0 +1,183 @@
+"""
+Compare the dashboard under granian (WSGI), granian (ASGI) and gunicorn.
+
+Run from the repository root::
+
+    uv run python benchmarks/servers.py --workers 4 --concurrency 32 --seconds 10
+
+Every server runs the production settings on a free local port against a fresh
+SQLite database with ``--services`` services from ``generate_services`` and its
+own ``collectstatic`` output. The client keeps ``--concurrency`` persistent
+connections busy with anonymous ``GET`` requests for ``--path`` (the cached
+dashboard by default) and reports requests per second and the p50/p99 latency.
+gunicorn runs its default sync workers, so it can serve at most ``--workers``
+requests at a time.
+
+The client is plain Python threads; if req/s stops growing with
+``--concurrency`` the client, not the server, is the bottleneck.
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SETTINGS = """\
+from config.settings.production import *  # noqa
+
+STATIC_ROOT = {location!r} + "/static"
+MEDIA_ROOT = {location!r} + "/media"
+# The benchmark warms every server up itself, so all of them start from the same state.
+WARMUP_ON_STARTUP = False
+{extra}"""
+
+SERVERS = {
+    "granian-wsgi": ["-m", "granian", "--interface", "wsgi", "--workers", "{workers}", "--host", "127.0.0.1",
+                     "--port", "{port}", "src.config.wsgi:application"],
+    "granian-asgi": ["-m", "granian", "--interface", "asgi", "--workers", "{workers}", "--host", "127.0.0.1",
+                     "--port", "{port}", "src.config.asgi:application"],
+    "gunicorn": ["-m", "gunicorn", "--workers", "{workers}", "--bind", "127.0.0.1:{port}",
+                 "src.config.wsgi:application"],
+}  # fmt: skip
+HEADER = f"{'server':<14} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare(location, services, extra_settings=""):
+    """Write the settings module, migrate, collect static files and generate the services."""
+    (Path(location) / "bench_settings.py").write_text(SETTINGS.format(location=location, extra=extra_settings))
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([location, str(ROOT / "src"), str(ROOT / "benchmarks")]),
+        "DJANGO_SETTINGS_MODULE": "bench_settings",
+        "DJANGO_SECRET_KEY": "benchmark",
+        "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+        "DJANGO_SECURE_SSL_REDIRECT": "False",
+        "DATABASE_URL": f"sqlite:///{Path(location) / 'db.sqlite3'}",
+        "DJANGO_CACHE_LOCATION": str(Path(location) / "cache"),
+        "DJANGO_LOG_LEVEL": "WARNING",
+        "HOMELAB_LOG_LEVEL": "WARNING",
+    }
+    manage = [sys.executable, str(ROOT / "manage.py")]
+    subprocess.run([*manage, "migrate", "-v0"], env=env, check=True)
+    subprocess.run([*manage, "collectstatic", "--noinput", "-v0"], env=env, check=True)
+    subprocess.run(
+        [*manage, "generate_services", "--count", str(services)], env=env, check=True, stdout=subprocess.DEVNULL
+    )
+    return env
+
+
+def request(connection, path, headers=None):
+    connection.request("GET", path, headers={"Host": "127.0.0.1", "Accept-Encoding": "br, gzip", **(headers or {})})
+    response = connection.getresponse()
+    response.read()
+    return response
+
+
+def wait_until_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            if request(connection, "/").status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not answer within {timeout}s")
+
+
+def load(port, path, concurrency, seconds):
+    stop = threading.Event()
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                if request(connection, path).status != 200:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            latencies[index].append(time.perf_counter() - started)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(latency for per_client in latencies for latency in per_client)
+    if not samples:
+        return {"requests": 0.0, "p50": 0.0, "p99": 0.0, "errors": sum(errors)}
+    return {
+        "requests": len(samples) / seconds,
+        "p50": statistics.median(samples) * 1000,
+        "p99": samples[int(len(samples) * 0.99)] * 1000,
+        "errors": sum(errors),
+    }
+
+
+def run(server, env, args):
+    port = free_port()
+    command = [sys.executable, *(part.format(workers=args.workers, port=port) for part in SERVERS[server])]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, process)
+        # Let every worker fill its connection and templates before measuring.
+        load(port, args.path, args.concurrency, 1)
+        return load(port, args.path, args.concurrency, args.seconds)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--server", choices=[*SERVERS, "all"], default="all")
+    args = parser.parse_args()
+
+    servers = list(SERVERS) if args.server == "all" else [args.server]
+    print(HEADER, flush=True)
+    for server in servers:
+        with tempfile.TemporaryDirectory() as location:
+            env = prepare(location, args.services)
+            result = run(server, env, args)
+        print(
+            f"{server:<14} {result['requests']:>10,.0f} {result['p50']:>8.2f} {result['p99']:>8.2f} "
+            f"{result['errors']:>7}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Compare dashboard reads under a concurrent writer for the stock SQLite setup and the tuned backend.
+
+Run from the repository root::
+
+    uv run python benchmarks/sqlite_concurrency.py --readers 8 --seconds 5
+
+``stock`` uses Django's SQLite backend with the default rollback journal and
+reconnects for every request (``CONN_MAX_AGE = 0``). ``tuned`` uses
+``apps.core.backends.sqlite3`` with the pragma profile from the settings and
+keeps one connection per thread. Each reader repeatedly runs the dashboard
+query while a single writer keeps updating services, like an admin session.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -16 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+BACKENDS = {
+    "stock": {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {"timeout": 5}},
+    "tuned": {"ENGINE": "apps.core.backends.sqlite3", "OPTIONS": {"transaction_mode": "IMMEDIATE"}},
+}
+HEADER = f"{'backend':<8} {'reads/s':>10} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+
+
+def configure(backend, location):
+    settings.configure(
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth", "apps.core"],
+        DATABASES={"default": {**BACKENDS[backend], "NAME": str(Path(location) / "db.sqlite3")}},
+        SQLITE_PRAGMAS=SQLITE_PRAGMAS,
+        DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+        USE_TZ=True,
+        SERVER_TIMING=False,
+        METRICS_ENABLED=False,
+    )
+    django.setup()
+
+
+def prepare(services):
+    from django.core.management import call_command
+
+    from apps.core.models import Service
+
+    call_command("migrate", verbosity=0)
+    # Replace the services added by data migrations with a known number of rows.
+    Service.objects.all().delete()
+    Service.objects.bulk_create(
+        Service(name=f"Service {index}", url=f"https://service-{index}.example", order=index)
+        for index in range(services)
+    )
+
+
+def run(persistent, readers, seconds):
+    from django.db import OperationalError, connection
+
+    from apps.core.models import Service
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+    counts = {"writes": 0, "errors": 0}
+
+    def reader(index):
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                list(Service.objects.filter(is_active=True).select_related("status"))
+            except OperationalError:
+                counts["errors"] += 1
+            latencies[index].append(time.perf_counter() - started)
+            if not persistent:
+                connection.close()
+        connection.close()
+
+    def writer():
+        index = 0
+        while not stop.is_set():
+            try:
+                Service.objects.filter(order=index % 50).update(description=f"edit {index}")
+                counts["writes"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+            if not persistent:
+                connection.close()
+            index += 1
+        connection.close()
+
+    threads = [threading.Thread(target=reader, args=(index,)) for index in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(latency for per_thread in latencies for latency in per_thread)
+    return {
+        "reads": len(samples) / seconds,
+        "writes": counts["writes"] / seconds,
+        "p50": statistics.median(samples) * 1000,
+        "p99": samples[int(len(samples) * 0.99)] * 1000,
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--backend", choices=[*BACKENDS, "all"], default="all")
+    args = parser.parse_args()
+
+    if args.backend == "all":
+        # Settings can only be configured once per process, so every backend runs in its own.
+        print(HEADER, flush=True)
+        for backend in BACKENDS:
+            subprocess.run([sys.executable, *sys.argv, "--backend", backend], check=True)
+        return
+
+    with tempfile.TemporaryDirectory() as location:
+        configure(args.backend, location)
+        prepare(args.services)
+        result = run(args.backend == "tuned", args.readers, args.seconds)
+    print(
+        f"{args.backend:<8} {result['reads']:>10,.0f} {result['writes']:>10,.0f} "
+        f"{result['p50']:>8.2f} {result['p99']:>8.2f} {result['errors']:>7}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,57 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models.expressions import RawSQL
 
-from .models import Service
+from .logos import LogoError, process_logo
+from .models import Category, Service, Tag
+from .search import MATCHING_IDS_SQL, match_expression, uses_fts
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ["name", "icon", "order", "active_service_count"]
+    search_fields = ["name"]
+    list_editable = ["order"]
+    prepopulated_fields = {"slug": ["name"]}
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ["name", "slug"]
+    search_fields = ["name"]
+    prepopulated_fields = {"slug": ["name"]}
 
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
-    list_display = ["name", "url", "is_active", "order", "created_at"]
-    list_filter = ["is_active", "created_at"]
+    list_display = ["name", "url", "category", "tag_list", "is_active", "order", "created_at"]
+    list_filter = ["is_active", "category", "tags", "created_at"]
+    # The category column and the tags are loaded with the page, not one query per row.
+    list_select_related = ["category"]
     search_fields = ["name", "description"]
     ordering = ["order", "name"]
     list_editable = ["order", "is_active"]
-    fields = ["name", "description", "url", "icon", "logo_file", "is_active", "order"]
+    autocomplete_fields = ["category"]
+    filter_horizontal = ["tags"]
+    fields = ["name", "description", "url", "icon", "logo_file", "category", "tags", "is_active", "order"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("tags")
+
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text table matches word prefixes in name, description, tags and category without a LIKE scan.
+        match = match_expression(search_term)
+        if match is None or not uses_fts():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=RawSQL(MATCHING_IDS_SQL, [match])), False
+
+    @admin.display(description="Tags")
+    def tag_list(self, obj):
+        return ", ".join(tag.name for tag in obj.tags.all())
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "logo_file" in form.changed_data:
+            try:
+                process_logo(obj)
+            except LogoError as exc:
+                self.message_user(request, f"Logo was saved but could not be processed: {exc}", messages.WARNING)
@@ -0,0 +1,144 @@
+"""
+Read-only JSON API for services.
+
+``/api/services/`` lists services as ``{"services": [{...}, ...]}``, ordered by
+id. ``?fields=name,url`` limits every object to the named fields of
+``FIELDS``, and ``?is_active=true`` or ``false`` filters by state. Rows are
+read with ``.values_list()`` in keyset batches of ``BATCH_SIZE`` services, so no
+model instances are built and the response is streamed with flat memory however
+large the catalog is. Tags cost one more query per batch and only if they are
+requested. Under ASGI the body comes from the async ``astream_services``, as
+Django would read a synchronous iterator to the end before sending it.
+
+The ETag is derived from the services version and the query string, not from
+the content, so it is known before any query runs: a matching
+``If-None-Match`` is answered with 304 from the cache alone.
+"""
+
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+
+from .caching import get_services_version
+from .models import Service
+
+# API field: the lookup passed to .values_list(); tags are collected separately
+FIELDS = {
+    "id": "pk",
+    "name": "name",
+    "description": "description",
+    "url": "url",
+    "icon": "icon",
+    "logo": "logo_file",
+    "category": "category__slug",
+    "tags": None,
+    "is_active": "is_active",
+    "order": "order",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+BATCH_SIZE = 500
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+# One encoder for all rows; the C encoder does not need a default() hook because values are converted first.
+encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def parse_fields(value):
+    """API field names of ``?fields=``, all of them if it is empty; ``ValueError`` for unknown names."""
+    if not value:
+        return list(FIELDS)
+    fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}" if unknown else "no fields")
+    return fields
+
+
+def parse_is_active(value):
+    """``True``, ``False`` or ``None`` (no filter) for ``?is_active=``; ``ValueError`` otherwise."""
+    if value is None:
+        return None
+    try:
+        return BOOLEANS[value.lower()]
+    except KeyError as exc:
+        raise ValueError(f"is_active must be true or false, not {value!r}") from exc
+
+
+def services_etag(fields, is_active):
+    """Strong ETag of a listing, changes whenever a service, category or tag does."""
+    query = hashlib.sha256(f"{','.join(fields)}|{is_active}".encode()).hexdigest()[:12]
+    return f'"{get_services_version()}-{query}"'
+
+
+def converters():
+    storage = Service._meta.get_field("logo_file").storage
+    return {
+        "logo": lambda name: storage.url(name) if name else None,
+        "created_at": lambda value: value.isoformat(),
+        "updated_at": lambda value: value.isoformat(),
+    }
+
+
+def fetch_batch(fields, is_active, last):
+    """The next ``BATCH_SIZE`` matching services after id ``last`` as dicts of ``fields``, and the last id."""
+    columns = [name for name in fields if FIELDS[name] is not None]
+    convert = [(name, function) for name, function in converters().items() if name in columns]
+    services = Service.objects.order_by("pk")
+    if is_active is not None:
+        services = services.filter(is_active=is_active)
+    # Every batch starts after the last id of the previous one, so no OFFSET is ever scanned.
+    batch = list(services.filter(pk__gt=last).values_list("pk", *(FIELDS[name] for name in columns))[:BATCH_SIZE])
+    if not batch:
+        return [], last
+    tags = {}
+    if "tags" in fields:
+        for service_id, slug in (
+            Service.tags.through.objects.filter(service_id__in=[row[0] for row in batch])
+            .order_by("tag__slug")
+            .values_list("service_id", "tag__slug")
+        ):
+            tags.setdefault(service_id, []).append(slug)
+    rows = []
+    for pk, *values in batch:
+        row = dict(zip(columns, values, strict=True))
+        for name, function in convert:
+            row[name] = function(row[name])
+        if "tags" in fields:
+            row["tags"] = tags.get(pk, [])
+        rows.append({name: row[name] for name in fields})
+    return rows, batch[-1][0]
+
+
+def stream_services(fields, is_active):
+    """Yield the JSON document chunk by chunk, one chunk per batch of services."""
+    yield '{"services":['
+    separator = ""
+    last = 0
+    while True:
+        rows, last = fetch_batch(fields, is_active, last)
+        if rows:
+            yield separator + encoder.encode(rows)[1:-1]
+            separator = ","
+        if len(rows) < BATCH_SIZE:
+            break
+    yield "]}"
+
+
+async def astream_services(fields, is_active):
+    """
+    ``stream_services`` for ASGI. Django buffers a synchronous iterator there
+    before sending any of it, an async one is sent batch by batch.
+    """
+    yield '{"services":['
+    separator = ""
+    last = 0
+    while True:
+        rows, last = await sync_to_async(fetch_batch)(fields, is_active, last)
+        if rows:
+            yield separator + encoder.encode(rows)[1:-1]
+            separator = ","
+        if len(rows) < BATCH_SIZE:
+            break
+    yield "]}"
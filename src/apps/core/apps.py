@@ -1,7 +1,20 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     verbose_name = "Core"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .catalog import load_catalog
+        from .search import create_search_table
+        from .timing import enabled, install_query_timer
+
+        if enabled():
+            connection_created.connect(install_query_timer, dispatch_uid="core-server-timing")
+        post_migrate.connect(create_search_table, sender=self, dispatch_uid="core-search-table")
+        post_migrate.connect(load_catalog, sender=self, dispatch_uid="core-catalog")
@@ -0,0 +1,388 @@
+"""
+Shared-memory cache backend.
+
+All workers on a host map the same file and use it as a fixed-size,
+set-associative hash table: a key hashes to one bucket of ``BUCKET_WAYS``
+slots, and when the bucket is full the least recently used (or an expired)
+slot is overwritten. Culling therefore never looks at more than one bucket.
+
+Writers serialise per bucket with a thread lock plus an ``fcntl`` byte-range
+lock. Readers take no lock at all; each slot carries a sequence number that is
+odd while a write is in progress, and a read is retried when the number
+changed underneath it.
+
+Values larger than a slot go to an overflow file next to the mapped one,
+named after the key hash and the content digest, and the slot only holds that
+name. Writing a new value for the key, evicting or deleting it removes the
+file. Values above ``MAX_VALUE_SIZE`` are not cached at all.
+
+Example::
+
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.core.backends.cache.SharedMemoryCache",
+            "LOCATION": "/dev/shm/homelab_cache",
+            "OPTIONS": {"MAX_ENTRIES": 4096, "SLOT_SIZE": 65536},
+        }
+    }
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger("homelab.cache")
+
+MAGIC = b"HLSHMC02"
+FILE_HEADER = struct.Struct("<8sIII")  # magic, buckets, ways, slot size
+FILE_HEADER_SIZE = 64
+# sequence, key hash, expires (0 = never), last access, key length, value length, flags
+SLOT_HEADER = struct.Struct("<QQddIII")
+# The value of the slot is the name of an overflow file.
+OVERFLOW = 1
+SEQUENCE = struct.Struct("<Q")
+LAST_ACCESS = struct.Struct("<d")
+LAST_ACCESS_OFFSET = 24
+FILENAME = "cache.mmap"
+OVERFLOW_DIRNAME = "overflow"
+READ_RETRIES = 100
+THREAD_LOCK_STRIPES = 64
+
+
+class SharedMemoryCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._ways = int(options.get("BUCKET_WAYS", 8))
+        self._slot_size = int(options.get("SLOT_SIZE", 64 * 1024))
+        self._buckets = max(1, -(-self._max_entries // self._ways))
+        self._bucket_size = self._ways * self._slot_size
+        self._capacity = self._slot_size - SLOT_HEADER.size
+        self._max_value_size = int(options.get("MAX_VALUE_SIZE", 8 * 1024 * 1024))
+        self._path = os.path.join(location, FILENAME)
+        self._overflow_dir = os.path.join(location, OVERFLOW_DIRNAME)
+        # Keys already reported as too large, so a page that never fits does not log on every request.
+        self._too_large = set()
+        self._size = FILE_HEADER_SIZE + self._buckets * self._bucket_size
+        self._pid = None
+        self._fd = None
+        self._mm = None
+        self._open_lock = threading.Lock()
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+
+    # File handling
+
+    @property
+    def mm(self):
+        if self._pid != os.getpid():
+            with self._open_lock:
+                if self._pid != os.getpid():
+                    self._open()
+        return self._mm
+
+    def _open(self):
+        """Map the cache file, replacing it with a fresh one when its layout does not match."""
+        directory = os.path.dirname(self._path)
+        os.makedirs(directory, exist_ok=True)
+        header = FILE_HEADER.pack(MAGIC, self._buckets, self._ways, self._slot_size)
+        # Serialises the layout check and replacement between processes.
+        lock_fd = os.open(self._path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(lock_fd, fcntl.LOCK_EX)
+            fd = self._open_matching(header)
+            if fd is None:
+                # Workers of another configuration may still have the old file mapped, truncating it
+                # under them would crash them with SIGBUS. They keep the unlinked file until they restart.
+                if os.path.exists(self._path):
+                    logger.warning("Replacing cache file %s, its layout does not match the settings", self._path)
+                tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{FILENAME}.")
+                try:
+                    os.ftruncate(tmp_fd, self._size)
+                    os.pwrite(tmp_fd, header, 0)
+                    os.fsync(tmp_fd)
+                finally:
+                    os.close(tmp_fd)
+                os.replace(tmp_path, self._path)
+                # Overflow files of the old layout are not referenced by the new file.
+                shutil.rmtree(self._overflow_dir, ignore_errors=True)
+                fd = self._open_matching(header)
+        finally:
+            os.close(lock_fd)
+        if fd is None:
+            raise ImproperlyConfigured(f"Could not initialise the cache file {self._path}")
+        self._fd = fd
+        self._mm = mmap.mmap(fd, self._size)
+        # Locks and mappings inherited across fork() must not be shared with the parent.
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+        self._pid = os.getpid()
+
+    def _open_matching(self, header):
+        """A descriptor of the cache file if it exists with the expected layout, else ``None``."""
+        try:
+            fd = os.open(self._path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        if os.fstat(fd).st_size == self._size and os.pread(fd, FILE_HEADER.size, 0) == header:
+            return fd
+        os.close(fd)
+        return None
+
+    # Slot helpers
+
+    def _locate(self, key):
+        key_bytes = key.encode()
+        key_hash = int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") or 1
+        return key_bytes, key_hash, key_hash % self._buckets
+
+    def _slot_offsets(self, bucket):
+        start = FILE_HEADER_SIZE + bucket * self._bucket_size
+        return range(start, start + self._bucket_size, self._slot_size)
+
+    @contextmanager
+    def _locked(self, bucket):
+        mm = self.mm
+        start = FILE_HEADER_SIZE + bucket * self._bucket_size
+        with self._thread_locks[bucket % THREAD_LOCK_STRIPES]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._bucket_size, start)
+            try:
+                yield mm
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, start)
+
+    @staticmethod
+    def _read(mm, offset, key_bytes, key_hash):
+        """Return ``(expires, payload, flags)`` if the slot holds the key, else ``None``."""
+        for _ in range(READ_RETRIES):
+            sequence, slot_hash, expires, _, key_length, value_length, flags = SLOT_HEADER.unpack_from(mm, offset)
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if slot_hash != key_hash or key_length != len(key_bytes):
+                return None
+            start = offset + SLOT_HEADER.size
+            if mm[start : start + key_length] != key_bytes:
+                return None
+            payload = mm[start + key_length : start + key_length + value_length]
+            if SEQUENCE.unpack_from(mm, offset)[0] == sequence:
+                return expires, payload, flags
+        return None
+
+    @staticmethod
+    def _expired(expires, now):
+        return expires != 0.0 and expires <= now
+
+    def _find(self, mm, bucket, key_bytes, key_hash, now):
+        """Return the offset of the live slot holding the key, or ``None``. Call with the bucket locked."""
+        for offset in self._slot_offsets(bucket):
+            found = self._read(mm, offset, key_bytes, key_hash)
+            if found is not None and not self._expired(found[0], now):
+                return offset
+        return None
+
+    def _victim(self, mm, bucket, key_bytes, key_hash, now):
+        """Pick the slot to write the key into: its own, a free one, or the least recently used."""
+        free, victim, oldest = None, None, None
+        for offset in self._slot_offsets(bucket):
+            _, slot_hash, expires, last_access, key_length, _, _ = SLOT_HEADER.unpack_from(mm, offset)
+            if slot_hash == key_hash and self._read(mm, offset, key_bytes, key_hash) is not None:
+                return offset
+            if free is None and (key_length == 0 or self._expired(expires, now)):
+                free = offset
+            if oldest is None or last_access < oldest:
+                victim, oldest = offset, last_access
+        return free if free is not None else victim
+
+    @staticmethod
+    def _write(mm, offset, key_bytes, key_hash, payload, flags, expires, now):
+        sequence = SEQUENCE.unpack_from(mm, offset)[0] | 1
+        SEQUENCE.pack_into(mm, offset, sequence)
+        SLOT_HEADER.pack_into(mm, offset, sequence, key_hash, expires, now, len(key_bytes), len(payload), flags)
+        start = offset + SLOT_HEADER.size
+        mm[start : start + len(key_bytes)] = key_bytes
+        mm[start + len(key_bytes) : start + len(key_bytes) + len(payload)] = payload
+        SEQUENCE.pack_into(mm, offset, sequence + 1)
+
+    def _erase(self, mm, offset):
+        self._release(mm, offset)
+        sequence = SEQUENCE.unpack_from(mm, offset)[0] | 1
+        SEQUENCE.pack_into(mm, offset, sequence)
+        SLOT_HEADER.pack_into(mm, offset, sequence, 0, 0.0, 0.0, 0, 0, 0)
+        SEQUENCE.pack_into(mm, offset, sequence + 1)
+
+    # Overflow files
+
+    def _pack(self, key, key_bytes, key_hash, pickled):
+        """Return ``(payload, flags)`` for a pickled value, writing an overflow file if it needs one."""
+        if len(key_bytes) + len(pickled) <= self._capacity:
+            return pickled, 0
+        if len(pickled) > self._max_value_size:
+            if key not in self._too_large:
+                if len(self._too_large) >= 1024:
+                    self._too_large.clear()
+                self._too_large.add(key)
+                logger.warning("Value for cache key %r is %d bytes, larger than MAX_VALUE_SIZE", key, len(pickled))
+            return None, 0
+        digest = hashlib.blake2b(pickled, digest_size=16).hexdigest()
+        name = f"{key_hash:016x}-{digest}"
+        os.makedirs(self._overflow_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._overflow_dir, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(pickled)
+            os.replace(tmp_path, os.path.join(self._overflow_dir, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return name.encode(), OVERFLOW
+
+    def _unpack(self, payload, flags):
+        """The pickled value of a slot, ``None`` if its overflow file is gone."""
+        if not flags & OVERFLOW:
+            return payload
+        try:
+            with open(os.path.join(self._overflow_dir, payload.decode()), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _release(self, mm, offset, keep=None):
+        """Remove the overflow file of a slot that is about to be overwritten, unless it is ``keep``."""
+        _, _, _, _, key_length, value_length, flags = SLOT_HEADER.unpack_from(mm, offset)
+        if not flags & OVERFLOW:
+            return
+        start = offset + SLOT_HEADER.size + key_length
+        name = mm[start : start + value_length]
+        if name != keep:
+            try:
+                os.unlink(os.path.join(self._overflow_dir, name.decode()))
+            except FileNotFoundError:
+                pass
+
+    def _put(self, mm, offset, key, key_bytes, key_hash, pickled, expires, now):
+        """Write a value into a slot; return ``False`` if it is too large to cache. Call with the bucket locked."""
+        payload, flags = self._pack(key, key_bytes, key_hash, pickled)
+        if payload is None or len(key_bytes) + len(payload) > self._capacity:
+            return False
+        self._release(mm, offset, keep=payload if flags & OVERFLOW else None)
+        self._write(mm, offset, key_bytes, key_hash, payload, flags, expires, now)
+        return True
+
+    def _store(self, key, value, timeout, only_if_missing=False):
+        key_bytes, key_hash, bucket = self._locate(key)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        expires = self.get_backend_timeout(timeout) or 0.0
+        now = time.time()
+        with self._locked(bucket) as mm:
+            existing = self._find(mm, bucket, key_bytes, key_hash, now)
+            if only_if_missing and existing is not None:
+                return False
+            offset = existing if existing is not None else self._victim(mm, bucket, key_bytes, key_hash, now)
+            if not self._put(mm, offset, key, key_bytes, key_hash, pickled, expires, now):
+                # The previous value is outdated now, it must not be served any more.
+                if existing is not None:
+                    self._erase(mm, existing)
+                return False
+            return True
+
+    # Cache API
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._store(key, value, timeout, only_if_missing=True)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_bytes, key_hash, bucket = self._locate(key)
+        mm = self.mm
+        now = time.time()
+        for offset in self._slot_offsets(bucket):
+            found = self._read(mm, offset, key_bytes, key_hash)
+            if found is None:
+                continue
+            expires, payload, flags = found
+            if self._expired(expires, now):
+                continue
+            pickled = self._unpack(payload, flags)
+            if pickled is None:
+                continue
+            # A racy write only affects which slot is evicted next, so it needs no lock.
+            LAST_ACCESS.pack_into(mm, offset + LAST_ACCESS_OFFSET, now)
+            return pickle.loads(pickled)
+        return default
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._store(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_bytes, key_hash, bucket = self._locate(key)
+        now = time.time()
+        with self._locked(bucket) as mm:
+            offset = self._find(mm, bucket, key_bytes, key_hash, now)
+            if offset is None:
+                return False
+            _, payload, flags = self._read(mm, offset, key_bytes, key_hash)
+            expires = self.get_backend_timeout(timeout) or 0.0
+            self._write(mm, offset, key_bytes, key_hash, payload, flags, expires, now)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_bytes, key_hash, bucket = self._locate(key)
+        now = time.time()
+        with self._locked(bucket) as mm:
+            offset = self._find(mm, bucket, key_bytes, key_hash, now)
+            pickled = None
+            if offset is not None:
+                expires, payload, flags = self._read(mm, offset, key_bytes, key_hash)
+                pickled = self._unpack(payload, flags)
+            if pickled is None:
+                raise ValueError(f"Key '{key}' not found")
+            new_value = pickle.loads(pickled) + delta
+            pickled = pickle.dumps(new_value, self.pickle_protocol)
+            if not self._put(mm, offset, key, key_bytes, key_hash, pickled, expires, now):
+                self._erase(mm, offset)
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_bytes, key_hash, bucket = self._locate(key)
+        mm = self.mm
+        now = time.time()
+        for offset in self._slot_offsets(bucket):
+            found = self._read(mm, offset, key_bytes, key_hash)
+            if found is not None and not self._expired(found[0], now):
+                return True
+        return False
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        key_bytes, key_hash, bucket = self._locate(key)
+        with self._locked(bucket) as mm:
+            offset = self._find(mm, bucket, key_bytes, key_hash, time.time())
+            if offset is None:
+                return False
+            self._erase(mm, offset)
+            return True
+
+    def clear(self):
+        for bucket in range(self._buckets):
+            with self._locked(bucket) as mm:
+                for offset in self._slot_offsets(bucket):
+                    if SLOT_HEADER.unpack_from(mm, offset)[4]:
+                        self._erase(mm, offset)
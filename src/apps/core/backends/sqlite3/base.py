@@ -0,0 +1,37 @@
+"""
+SQLite backend with a tuned pragma profile.
+
+Identical to Django's SQLite backend except that every new connection applies
+``SQLITE_PRAGMAS`` (WAL journaling, ``synchronous=NORMAL``, memory-mapped I/O,
+a larger page cache, in-memory temp tables and a busy timeout) and that
+``OPTIONS["pragmas"]`` can override single pragmas per database. With WAL,
+readers no longer wait for admin writes, and together with ``CONN_MAX_AGE``
+each worker thread keeps its connection and page cache between requests.
+"""
+
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+# Pragmas that are stored in the database file or only make sense for files on disk.
+FILE_ONLY_PRAGMAS = {"journal_mode", "mmap_size"}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Django passes unknown OPTIONS on to sqlite3.connect(), which does not know about pragmas.
+        params.pop("pragmas", None)
+        return params
+
+    def get_pragmas(self):
+        pragmas = {**settings.SQLITE_PRAGMAS, **self.settings_dict["OPTIONS"].get("pragmas", {})}
+        if self.is_in_memory_db():
+            pragmas = {name: value for name, value in pragmas.items() if name not in FILE_ONLY_PRAGMAS}
+        return pragmas
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.get_pragmas().items():
+            if value is not None:
+                conn.execute(f"PRAGMA {name} = {value}")
+        return conn
@@ -0,0 +1,92 @@
+"""
+Content-addressed file storage.
+
+``ContentAddressedStorage`` stores every file under the SHA-256 of its
+content, sharded by the first two bytes of the digest so no directory grows
+too large::
+
+    services/logos/foo.png -> services/logos/3f/2a/3f2a9c...e1.png
+
+The directory of the requested name and its extension are kept, the rest of
+the name is dropped. Saving content that is already stored writes nothing and
+returns the existing name, so re-uploads and repeated catalog syncs never
+create ``_abc1234`` suffixed copies. A name can never point at different
+content, which makes the URLs safe to cache forever; ``apps.core.media``
+serves them as ``immutable``.
+
+Files are shared by everything that saved the same content, so they must not
+be deleted when one reference goes away. ``collect_logos`` removes the files no
+service references any more.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+
+# Each shard level is two hex digits, 65536 directories for two levels.
+SHARD_LEVELS = 2
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def hashed_name(name, digest):
+    """``dir/name.ext`` -> ``dir/ab/cd/<digest>.ext``."""
+    directory, filename = posixpath.split(name)
+    extension = posixpath.splitext(filename)[1].lower()
+    shards = [digest[index * 2 : index * 2 + 2] for index in range(SHARD_LEVELS)]
+    return posixpath.join(directory, *shards, f"{digest}{extension}")
+
+
+def content_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """``FileSystemStorage`` that names files by the SHA-256 of their content."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = hashed_name(self.generate_filename(name), content_digest(content))
+        validate_file_name(name, allow_relative_path=True)
+        if max_length is not None and len(name) > max_length:
+            # The name cannot be shortened without losing the digest, so fail like get_available_name() does.
+            raise SuspiciousFileOperation(
+                f'Storage name "{name}" is longer than {max_length} characters, shorten the upload directory.'
+            )
+        if self.exists(name):
+            return name
+        saved = self._save(name, content)
+        if saved != name:
+            # Another process stored the same content first, keep its file.
+            super().delete(saved)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        directory, filename = posixpath.split(name)
+        base = directory
+        for _level in range(SHARD_LEVELS):
+            base = posixpath.dirname(base)
+        digest = posixpath.splitext(filename)[0]
+        if not DIGEST_RE.match(digest) or hashed_name(posixpath.join(base, filename), digest) != name:
+            # Not a content-addressed name, e.g. a logo stored before this storage was used.
+            return
+        # Remove shard directories that became empty, never the directory above them.
+        for _level in range(SHARD_LEVELS):
+            try:
+                os.rmdir(self.path(directory))
+            except OSError:
+                break
+            directory = posixpath.dirname(directory)
@@ -0,0 +1,30 @@
+"""
+Django template backend that reports render times to ``apps.core.timing``.
+
+Identical to ``django.template.backends.django.DjangoTemplates``, except that
+every template it returns records its ``render()`` as the ``template`` phase
+of the Server-Timing header. Included templates are rendered inside their
+parent, so each page is counted once.
+"""
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as backend
+
+from ..timing import measure
+
+
+class Template(backend.Template):
+    def render(self, context=None, request=None):
+        with measure("template"):
+            return super().render(context, request)
+
+
+class DjangoTemplates(backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            backend.reraise(exc, self)
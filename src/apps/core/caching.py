@@ -0,0 +1,276 @@
+"""
+Full-page caching for the dashboard.
+
+Rendered pages are stored together with gzip and brotli variants under a key
+that contains the services version. The version is bumped by signals whenever a
+``Service`` changes, so stale pages are never served and never have to be
+deleted explicitly. Only one worker renders a missing page, the others wait
+briefly for its result instead of all hitting the database at once.
+
+Probe results have their own status version. Only pages that show statuses
+(``status=True``, the dashboard and its card batches) include it in their
+key, so a flapping service re-renders those pages but not the logo sprite,
+the icon subset, the search index, the API ETags or the service worker, which
+only change with the configuration.
+
+Cached pages carry no ``Last-Modified``. What a page shows (statuses,
+sparklines, deleted services) has no single modification time, the strong
+ETag of the content is the only validator.
+
+``acached_page`` is the same for async views, it uses the async cache API and
+awaits ``render``.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .media import IMMUTABLE_MAX_AGE
+from .metrics import record_cache
+from .timing import measure
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+SERVICES_VERSION_KEY = "core:services-version"
+STATUS_VERSION_KEY = "core:status-version"
+
+# How long a worker waits for another worker that is already rendering the page.
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_version(key):
+    """Return the counter at ``key``, initialising it if necessary."""
+    with measure("cache"):
+        version = cache.get(key)
+        if version is None:
+            # Seed with the current time so a lost counter never reuses an old version.
+            cache.add(key, time.time_ns() // 1000, timeout=None)
+            version = cache.get(key)
+    return version
+
+
+async def aget_version(key):
+    with measure("cache"):
+        version = await cache.aget(key)
+        if version is None:
+            await cache.aadd(key, time.time_ns() // 1000, timeout=None)
+            version = await cache.aget(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_version(key)
+
+
+def get_services_version():
+    """Return the current services version, initialising it if necessary."""
+    return get_version(SERVICES_VERSION_KEY)
+
+
+async def aget_services_version():
+    return await aget_version(SERVICES_VERSION_KEY)
+
+
+def bump_services_version():
+    """Invalidate everything derived from the services, categories and tags."""
+    return bump_version(SERVICES_VERSION_KEY)
+
+
+def bump_status_version():
+    """Invalidate the pages that show probe results, after a service went up or down."""
+    return bump_version(STATUS_VERSION_KEY)
+
+
+def get_page_version(status=False):
+    """The version a page is cached under, with the status version for pages that show probe results."""
+    version = get_services_version()
+    return f"{version}.{get_version(STATUS_VERSION_KEY)}" if status else version
+
+
+async def aget_page_version(status=False):
+    version = await aget_services_version()
+    return f"{version}.{await aget_version(STATUS_VERSION_KEY)}" if status else version
+
+
+def page_cache_key(name, version):
+    return f"core:page:{name}:{version}"
+
+
+def build_entry(response, last_modified):
+    """Turn a rendered response into a cache entry with precompressed variants."""
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    entry = {
+        "content_type": response["Content-Type"],
+        "etag": f'"{digest}"',
+        "last_modified": last_modified,
+        "identity": content,
+        "gzip": gzip.compress(content, compresslevel=6, mtime=0),
+    }
+    if brotli is not None:
+        entry["br"] = brotli.compress(content, quality=5)
+    return entry
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts with a non-zero quality."""
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(request, entry):
+    accepted = accepted_encodings(request)
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in entry:
+            return encoding
+    return "identity"
+
+
+def coded_etag(etag, encoding):
+    """
+    The strong ETag of one coding of an entry.
+
+    The gzip and brotli variants are different bytes, so they cannot share the
+    ETag of the uncompressed page: a cache could then answer a range or
+    conditional request for one variant with the other.
+    """
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def response_from_entry(request, entry, immutable=False):
+    """
+    Build the response for ``entry``. Pages are revalidated on every request,
+    ``immutable`` entries are served under a content-hashed URL and cached for a year.
+    """
+    encoding = choose_encoding(request, entry)
+    etag = coded_etag(entry["etag"], encoding)
+    response = HttpResponse(entry[encoding], content_type=entry["content_type"])
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    if entry["last_modified"] is not None:
+        response["Last-Modified"] = http_date(entry["last_modified"])
+    if immutable:
+        patch_vary_headers(response, ["Accept-Encoding"])
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_vary_headers(response, ["Accept-Encoding", "Cookie"])
+        patch_cache_control(response, no_cache=True)
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=entry["last_modified"],
+        response=response,
+    )
+
+
+def fill(key, render):
+    """Render the page and store it, returning the new entry."""
+    response = render()
+    entry = build_entry(response, None)
+    with measure("cache"):
+        cache.set(key, entry, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return entry
+
+
+def cached_page(request, name, render, status=False):
+    """
+    Serve ``name`` from the page cache, rendering it at most once per version.
+
+    ``render`` returns a rendered ``HttpResponse``, it is only called on a
+    cache miss. Pages that show probe results pass ``status=True`` to be
+    re-rendered when they change.
+    """
+    key = page_cache_key(name, get_page_version(status))
+    with measure("cache"):
+        entry = cache.get(key)
+    record_cache(name, entry is not None)
+    if entry is None:
+        lock_key = f"{key}:lock"
+        with measure("cache"):
+            locked = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+        if locked:
+            try:
+                entry = fill(key, render)
+            finally:
+                cache.delete(lock_key)
+        else:
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                with measure("cache"):
+                    found = cache.get_many([key, lock_key])
+                entry = found.get(key)
+                # Without an entry a released lock means the page could not be cached, waiting longer is pointless.
+                if entry is not None or lock_key not in found:
+                    break
+            if entry is None:
+                # The rendering worker is stuck, gone or could not store the page: render without the lock.
+                entry = build_entry(render(), None)
+    return response_from_entry(request, entry)
+
+
+async def afill(key, render):
+    response = await render()
+    entry = build_entry(response, None)
+    with measure("cache"):
+        await cache.aset(key, entry, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return entry
+
+
+async def acached_page(request, name, render, status=False):
+    """Async ``cached_page``; ``render`` is a coroutine function."""
+    key = page_cache_key(name, await aget_page_version(status))
+    with measure("cache"):
+        entry = await cache.aget(key)
+    record_cache(name, entry is not None)
+    if entry is None:
+        lock_key = f"{key}:lock"
+        with measure("cache"):
+            locked = await cache.aadd(lock_key, 1, timeout=LOCK_TIMEOUT)
+        if locked:
+            try:
+                entry = await afill(key, render)
+            finally:
+                await cache.adelete(lock_key)
+        else:
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                with measure("cache"):
+                    found = await cache.aget_many([key, lock_key])
+                entry = found.get(key)
+                if entry is not None or lock_key not in found:
+                    break
+            if entry is None:
+                entry = build_entry(await render(), None)
+    return response_from_entry(request, entry)
@@ -0,0 +1,294 @@
+"""
+Declarative service catalog.
+
+``catalog.toml`` lists the default categories and services. ``plan_sync``
+compares it with the database and ``apply_sync`` applies the difference, so
+syncing takes the same handful of queries for 30 or 3,000 services:
+
+- one query each reads the current categories and services,
+- new rows are written with ``bulk_create`` and changed ones with
+  ``bulk_update`` (``BATCH_SIZE`` rows per query),
+- logo files are read once per file name and stored once per content hash,
+  their renditions are built once and shared by all services that use them.
+
+Categories are matched by slug, services by name. Only the fields a manifest
+entry sets are compared, so values edited in the admin, ``is_active`` in
+particular, are kept unless the manifest sets them. Logos are only added to
+services that have none. With ``prune`` active services that are not in the
+manifest are deactivated.
+
+Bulk writes send no model signals, so ``apply_sync`` updates the category
+counts and bumps the services version itself.
+
+``load_catalog`` runs the sync for the default manifest after every
+``migrate``. It stores a fingerprint of the manifest and its logo files in
+``CatalogState`` and skips the sync while the fingerprint is unchanged, so
+``migrate`` on an up-to-date database reads one row and no services.
+"""
+
+import hashlib
+import logging
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from .caching import bump_services_version
+from .logos import LogoError, build_renditions, save_renditions
+from .models import CatalogState, Category, Service
+
+DEFAULT_MANIFEST = Path(__file__).with_name("catalog.toml")
+LOGOS_DIR = Path(__file__).parent / "static" / "core" / "logos"
+BATCH_SIZE = 500
+# CatalogState.name of the default manifest
+CATALOG_NAME = "default"
+
+logger = logging.getLogger("homelab.catalog")
+
+CATEGORY_FIELDS = {"slug": str, "name": str, "icon": str, "order": int}
+SERVICE_FIELDS = {
+    "name": str,
+    "category": str,
+    "description": str,
+    "url": str,
+    "icon": str,
+    "logo": str,
+    "is_active": bool,
+    "order": int,
+}
+
+
+class CatalogError(Exception):
+    """Raised when a manifest is invalid."""
+
+
+@dataclass
+class SyncPlan:
+    """Changes that make the database match a manifest."""
+
+    create_categories: list = field(default_factory=list)
+    update_categories: list = field(default_factory=list)
+    create_services: list = field(default_factory=list)
+    # (service, names of the changed fields)
+    update_services: list = field(default_factory=list)
+    deactivate_services: list = field(default_factory=list)
+    # (service, logo file name)
+    logos: list = field(default_factory=list)
+    missing_logos: list = field(default_factory=list)
+
+    def __bool__(self):
+        return any(
+            (
+                self.create_categories,
+                self.update_categories,
+                self.create_services,
+                self.update_services,
+                self.deactivate_services,
+                self.logos,
+            )
+        )
+
+    def describe(self):
+        """One line per change, for ``--dry-run`` and verbose output."""
+        lines = [f"Create category {category.slug}" for category in self.create_categories]
+        lines += [f"Update category {category.slug}" for category in self.update_categories]
+        lines += [f"Create service {service.name}" for service in self.create_services]
+        lines += [f"Update service {service.name}: {', '.join(fields)}" for service, fields in self.update_services]
+        lines += [f"Deactivate service {service.name}" for service in self.deactivate_services]
+        lines += [f"Add logo {logo} to {service.name}" for service, logo in self.logos]
+        lines += [f"Logo file {logo} of {name} not found, skipped" for name, logo in self.missing_logos]
+        return lines
+
+
+def check_entry(entry, fields, kind, required):
+    if not isinstance(entry, dict):
+        raise CatalogError(f"every entry of {kind} must be a table")
+    label = entry.get(required, "?")
+    if not isinstance(entry.get(required), str) or not entry[required]:
+        raise CatalogError(f"an entry of {kind} has no {required}")
+    for key, value in entry.items():
+        if key not in fields:
+            raise CatalogError(f"{kind} {label!r}: unknown field {key!r}")
+        # bool is a subclass of int, so check it explicitly.
+        if not isinstance(value, fields[key]) or (fields[key] is int and isinstance(value, bool)):
+            raise CatalogError(f"{kind} {label!r}: {key} must be of type {fields[key].__name__}")
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    """Read and validate a manifest, return ``{"categories": [...], "services": [...]}``."""
+    try:
+        with open(path, "rb") as f:
+            manifest = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as exc:
+        raise CatalogError(f"cannot read {path}: {exc}") from exc
+    unknown = set(manifest) - {"categories", "services"}
+    if unknown:
+        raise CatalogError(f"unknown sections: {', '.join(sorted(unknown))}")
+    categories = manifest.get("categories", [])
+    services = manifest.get("services", [])
+    for entry in categories:
+        check_entry(entry, CATEGORY_FIELDS, "categories", "slug")
+    for entry in services:
+        check_entry(entry, SERVICE_FIELDS, "services", "name")
+    slugs = [entry["slug"] for entry in categories]
+    names = [entry["name"] for entry in services]
+    for kind, keys in (("category", slugs), ("service", names)):
+        duplicates = sorted({key for key in keys if keys.count(key) > 1})
+        if duplicates:
+            raise CatalogError(f"duplicate {kind}: {', '.join(duplicates)}")
+    for entry in services:
+        if entry.get("category") not in (None, *slugs):
+            raise CatalogError(f"service {entry['name']!r}: unknown category {entry['category']!r}")
+    return {"categories": categories, "services": services}
+
+
+def plan_sync(manifest, logos_dir=LOGOS_DIR, prune=False):
+    """Compare ``manifest`` with the database and return the ``SyncPlan``; nothing is written."""
+    plan = SyncPlan()
+    categories = {category.slug: category for category in Category.objects.all()}
+    for entry in manifest["categories"]:
+        category = categories.get(entry["slug"])
+        if category is None:
+            category = categories[entry["slug"]] = Category(**entry)
+            plan.create_categories.append(category)
+        elif any(getattr(category, key) != value for key, value in entry.items()):
+            for key, value in entry.items():
+                setattr(category, key, value)
+            plan.update_categories.append(category)
+
+    services = {service.name: service for service in Service.objects.all()}
+    for entry in manifest["services"]:
+        values = {key: value for key, value in entry.items() if key not in ("category", "logo")}
+        service = services.pop(entry["name"], None)
+        if service is None:
+            service = Service(**values)
+            plan.create_services.append(service)
+        else:
+            changed = [key for key, value in values.items() if getattr(service, key) != value]
+            for key in changed:
+                setattr(service, key, values[key])
+            target = categories.get(entry.get("category"))
+            if "category" in entry and (target.pk is None or service.category_id != target.pk):
+                changed.append("category")
+            if changed:
+                plan.update_services.append((service, changed))
+        if "category" in entry:
+            # Set by object, so services of new categories get the pk once the category is saved.
+            service.category = categories[entry["category"]]
+        logo = entry.get("logo")
+        if logo and not service.logo_file:
+            if (logos_dir / logo).is_file():
+                plan.logos.append((service, logo))
+            else:
+                plan.missing_logos.append((service.name, logo))
+
+    if prune:
+        plan.deactivate_services = [service for service in services.values() if service.is_active]
+    return plan
+
+
+def store_logos(plan, logos_dir):
+    """
+    Save every logo of ``plan`` once and return ``{logo: (storage name, renditions)}``.
+
+    Files are read once per name. The storage is content-addressed, so a logo
+    that is already stored is not written again and keeps its name.
+    """
+    storage = Service._meta.get_field("logo_file").storage
+    upload_to = Service._meta.get_field("logo_file").upload_to
+    stored = {}
+    by_digest = {}
+    for logo in sorted({logo for _service, logo in plan.logos}):
+        data = (logos_dir / logo).read_bytes()
+        digest = hashlib.sha256(data).digest()
+        if digest not in by_digest:
+            name = storage.save(f"{upload_to}{logo}", ContentFile(data))
+            try:
+                # save_renditions only needs the storage and name of the logo file.
+                renditions = save_renditions(Service(logo_file=name), build_renditions(data, name))
+            except LogoError:
+                renditions = {}
+            by_digest[digest] = (name, renditions)
+        stored[logo] = by_digest[digest]
+    return stored
+
+
+def apply_sync(plan, logos_dir=LOGOS_DIR):
+    """Write ``plan`` in a constant number of queries and return it."""
+    if not plan:
+        return plan
+    now = timezone.now()
+    logos = store_logos(plan, logos_dir)
+    # id(service) -> (service, changed fields)
+    updates = {id(service): (service, set(fields)) for service, fields in plan.update_services}
+    for service in plan.deactivate_services:
+        service.is_active = False
+        updates[id(service)] = (service, {"is_active"})
+    for service, logo in plan.logos:
+        service.logo_file.name, service.logo_renditions = logos[logo]
+        if service.pk is not None:
+            updates.setdefault(id(service), (service, set()))[1].update({"logo_file", "logo_renditions"})
+
+    with transaction.atomic():
+        Category.objects.bulk_create(plan.create_categories, batch_size=BATCH_SIZE)
+        if plan.update_categories:
+            Category.objects.bulk_update(plan.update_categories, list(CATEGORY_FIELDS), batch_size=BATCH_SIZE)
+        Service.objects.bulk_create(plan.create_services, batch_size=BATCH_SIZE)
+        if updates:
+            fields = {"updated_at"}.union(*(changed for _service, changed in updates.values()))
+            for service, _changed in updates.values():
+                service.updated_at = now
+            services = [service for service, _changed in updates.values()]
+            Service.objects.bulk_update(services, sorted(fields), batch_size=BATCH_SIZE)
+        Category.update_active_service_counts()
+    bump_services_version()
+    return plan
+
+
+def catalog_fingerprint(manifest, path=DEFAULT_MANIFEST, logos_dir=LOGOS_DIR):
+    """SHA-256 of the manifest file and the name and content of every logo it references."""
+    digest = hashlib.sha256(Path(path).read_bytes())
+    for logo in sorted({entry["logo"] for entry in manifest["services"] if "logo" in entry}):
+        digest.update(b"\0" + logo.encode())
+        if (logos_dir / logo).is_file():
+            digest.update(hashlib.sha256((logos_dir / logo).read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def is_fully_migrated(using):
+    executor = MigrationExecutor(connections[using])
+    return not executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def load_catalog(using=DEFAULT_DB_ALIAS, path=DEFAULT_MANIFEST, logos_dir=LOGOS_DIR, force=False, **kwargs):
+    """
+    ``post_migrate`` receiver that syncs the default manifest unless its fingerprint is unchanged.
+
+    Skipped with ``CATALOG_AUTOLOAD`` off, for other databases and while
+    migrations are still unapplied, e.g. after ``migrate core 0017``. Returns
+    the applied ``SyncPlan``, or ``None`` if nothing was loaded.
+    """
+    if not settings.CATALOG_AUTOLOAD or using != DEFAULT_DB_ALIAS or not is_fully_migrated(using):
+        return None
+    manifest = load_manifest(path)
+    fingerprint = catalog_fingerprint(manifest, path, logos_dir)
+    state = CatalogState.objects.filter(name=CATALOG_NAME).first()
+    if state is not None and state.fingerprint == fingerprint and not force:
+        logger.debug("Catalog %s is unchanged", fingerprint[:12])
+        return None
+    plan = apply_sync(plan_sync(manifest, logos_dir=logos_dir), logos_dir=logos_dir)
+    CatalogState.objects.update_or_create(name=CATALOG_NAME, defaults={"fingerprint": fingerprint})
+    logger.info(
+        "Loaded catalog %s: created %d services, updated %d",
+        fingerprint[:12],
+        len(plan.create_services),
+        len(plan.update_services),
+    )
+    for name, logo in plan.missing_logos:
+        logger.warning("Logo file %s of %s not found, skipped", logo, name)
+    return plan
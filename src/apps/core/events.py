@@ -0,0 +1,215 @@
+"""
+Live dashboard updates over Server-Sent Events.
+
+One ``EventBroker`` per worker process polls the database every
+``EVENTS_POLL_INTERVAL`` seconds while clients are connected and fans the
+changes out to all of them, so the number of open dashboards does not change
+the database load:
+
+- ``status`` events carry the probe results whose shown state (up/down, status
+  code, latency, error) changed since the last poll,
+- ``services`` events carry the new services version after a service,
+  category or tag changed; dashboards rendered for an older version reload.
+  The status version the prober bumps for the page cache is never published,
+  a status change alone does not reload any dashboard.
+
+Every event gets an id ``<epoch>-<sequence>`` and is kept in a ring of the last
+``EVENTS_RING_SIZE`` events. A reconnecting ``EventSource`` sends the last id
+it saw in ``Last-Event-ID`` and only gets the events it missed. If they are no
+longer in the ring, or the id is from another worker or an earlier process
+(another epoch), the client gets a ``snapshot`` of all statuses and the
+version instead. New connections start with a snapshot too, because cached
+pages can show older statuses.
+
+Each client has a queue of at most ``EVENTS_CLIENT_BUFFER`` events. A client
+that falls that far behind is disconnected instead of buffering without limit;
+its browser reconnects and resumes from the ring. Idle streams get a comment
+line every ``EVENTS_HEARTBEAT`` seconds so proxies keep them open.
+
+Streams are only served by the ASGI entry point, where an open connection is a
+suspended coroutine. Under WSGI every stream would hold a worker thread, so
+the view answers ``204 No Content``, which tells ``EventSource`` not to retry.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from . import metrics
+from .caching import aget_services_version
+from .models import ServiceStatus
+
+logger = logging.getLogger("homelab.events")
+
+# Milliseconds the browser waits before reconnecting.
+RETRY_MS = 5000
+HEARTBEAT = b": ping\n\n"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    data: object
+
+    def encode(self):
+        data = json.dumps(self.data, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n".encode()
+
+
+def status_data(service_id, is_up, status_code, latency_ms, error):
+    return {"id": service_id, "up": is_up, "code": status_code, "latency": latency_ms, "error": error}
+
+
+class Subscriber:
+    """The queue of one connected client."""
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.dropped = False
+
+    def put(self, event):
+        """Queue ``event``; return ``False`` if the client is too far behind and has to be dropped."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            # Discard the backlog and wake the stream, which ends the response.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+        return True
+
+
+class EventBroker:
+    """Single producer that polls for changes and fans them out to all subscribers of this process."""
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.ring = deque(maxlen=settings.EVENTS_RING_SIZE)
+        self.subscribers = set()
+        # Last published state: service id -> status data, and the services version.
+        self.statuses = None
+        self.version = None
+        self.checked_at = None
+        self._task = None
+        self._ready = None
+
+    @property
+    def last_id(self):
+        return f"{self.epoch}-{self.sequence}"
+
+    def publish(self, type, data):
+        self.sequence += 1
+        event = Event(self.last_id, type, data)
+        self.ring.append(event)
+        for subscriber in list(self.subscribers):
+            if not subscriber.put(event):
+                self.subscribers.discard(subscriber)
+                metrics.inc("homelab_event_clients_dropped_total", {})
+                logger.info("Dropped a slow event stream client after %d queued events", subscriber.queue.maxsize)
+        return event
+
+    def snapshot(self):
+        """All current statuses and the services version, with the id of the latest event."""
+        statuses = list((self.statuses or {}).values())
+        return Event(self.last_id, "snapshot", {"version": self.version, "statuses": statuses})
+
+    def missed(self, last_event_id):
+        """Events after ``last_event_id``, or ``None`` if they are not all in the ring any more."""
+        epoch, _, sequence = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) > self.sequence:
+            return None
+        sequence = int(sequence)
+        first = self.ring[0].id.partition("-")[2] if self.ring else str(self.sequence + 1)
+        if sequence + 1 < int(first):
+            return None
+        return [event for event in self.ring if int(event.id.partition("-")[2]) > sequence]
+
+    async def poll(self):
+        """Publish what changed since the previous poll."""
+        version = await aget_services_version()
+        rows = ServiceStatus.objects.values_list(
+            "service_id", "is_up", "status_code", "latency_ms", "error", "checked_at"
+        ).order_by()
+        if self.checked_at is not None:
+            rows = rows.filter(checked_at__gt=self.checked_at)
+        first = self.statuses is None
+        if first:
+            self.statuses = {}
+        changed = []
+        async for service_id, is_up, status_code, latency_ms, error, checked_at in rows:
+            data = status_data(service_id, is_up, status_code, latency_ms, error)
+            if self.statuses.get(service_id) != data:
+                self.statuses[service_id] = data
+                changed.append(data)
+            self.checked_at = max(self.checked_at or checked_at, checked_at)
+        if first:
+            self.version = version
+            return
+        if changed:
+            self.publish("status", changed)
+        if version != self.version:
+            self.version = version
+            self.publish("services", {"version": version})
+
+    async def run(self):
+        try:
+            while True:
+                try:
+                    await self.poll()
+                except Exception:
+                    logger.exception("Polling for dashboard events failed")
+                self._ready.set()
+                await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+                if not self.subscribers:
+                    break
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def subscribe(self):
+        """Register a client and start the producer if it is not running in this event loop."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.get_loop() is not loop:
+            self._ready = asyncio.Event()
+            self._task = loop.create_task(self.run())
+        subscriber = Subscriber(settings.EVENTS_CLIENT_BUFFER)
+        self.subscribers.add(subscriber)
+        # The first poll fills the state that snapshots are made of.
+        await self._ready.wait()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    async def stream(self, last_event_id=None):
+        """The response body for one client."""
+        subscriber = await self.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            missed = self.missed(last_event_id)
+            for event in [self.snapshot()] if missed is None else missed:
+                yield event.encode()
+            while True:
+                try:
+                    async with asyncio.timeout(settings.EVENTS_HEARTBEAT):
+                        event = await subscriber.queue.get()
+                except TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if event is None:
+                    return
+                yield event.encode()
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broker = EventBroker()
@@ -0,0 +1,299 @@
+"""
+Probe history in fixed-size ring buffers.
+
+Storing one row per probe would grow to millions of rows a year. Instead every
+service has one ``ServiceHistory`` row with four rings, each a ``BinaryField``
+of constant size:
+
+- ``samples``: the last ``SAMPLES`` probe results (time, latency, up),
+- ``minutes``, ``hours``, ``days``: rollups with the number of probes and of
+  successful ones, and min/avg/max/p95 of their latency.
+
+A ring is a header with the position of the oldest record and the number of
+records, followed by one ``array`` per column of ``capacity`` items, so a
+single column can be read with one slice and ``array.frombytes`` without
+unpacking records one by one. Columns are stored little-endian.
+
+Rollups are built when a probe lands in a new bucket: the minute that just
+ended is summarised from the samples, the hour from its minutes and the day
+from its hours. Minute rollups are exact. Hours and days weight the averages
+by the number of successful probes, and their p95 is the weighted 95th
+percentile of the p95 values below them, an approximation.
+
+``sparklines`` reads the hourly averages of many services in one query for
+the dashboard cards.
+"""
+
+import math
+import struct
+import sys
+from array import array
+
+from .models import ServiceHistory
+
+HEADER = struct.Struct("<II")
+
+SAMPLE_COLUMNS = [("time", "I"), ("latency", "f"), ("up", "B")]
+ROLLUP_COLUMNS = [
+    ("start", "I"),
+    ("count", "H"),
+    ("up", "H"),
+    ("min", "f"),
+    ("avg", "f"),
+    ("max", "f"),
+    ("p95", "f"),
+]
+
+# Samples only need to cover the minute being built, 360 is an hour at the default 10 s interval.
+SAMPLES = 360
+# (field, bucket width in seconds, capacity): a day of minutes, 30 days of hours, two years of days
+LEVELS = [("minutes", 60, 1440), ("hours", 3600, 720), ("days", 86400, 730)]
+
+SPARKLINE_POINTS = 24
+SPARKLINE_WIDTH = 100
+SPARKLINE_HEIGHT = 20
+
+
+class Ring:
+    """A fixed-capacity ring of records, stored column by column in one ``bytes`` value."""
+
+    def __init__(self, columns, capacity, data=b""):
+        self.columns = columns
+        self.capacity = capacity
+        self.start = self.length = 0
+        self.arrays = {name: array(code, bytes(array(code).itemsize * capacity)) for name, code in columns}
+        if data and len(data) == self.size(columns, capacity):
+            self.start, self.length = HEADER.unpack_from(data)
+            for name, _code in columns:
+                self.arrays[name] = self.read_column(data, columns, capacity, name)
+        # Anything else is empty or was written with another capacity, it starts over.
+
+    @staticmethod
+    def size(columns, capacity):
+        return HEADER.size + sum(array(code).itemsize * capacity for _name, code in columns)
+
+    @staticmethod
+    def read_column(data, columns, capacity, name):
+        """One column of a stored ring in storage order, without decoding the others."""
+        offset = HEADER.size
+        for column, code in columns:
+            width = array(code).itemsize * capacity
+            if column == name:
+                values = array(code)
+                values.frombytes(memoryview(data)[offset : offset + width])
+                if sys.byteorder == "big":
+                    values.byteswap()
+                return values
+            offset += width
+        raise KeyError(name)
+
+    @staticmethod
+    def ordered(values, start, length):
+        """``values`` of a column from the oldest to the newest record."""
+        end = start + length
+        if end <= len(values):
+            return values[start:end]
+        return values[start:] + values[: end - len(values)]
+
+    def append(self, **record):
+        index = (self.start + self.length) % self.capacity
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        for name, _code in self.columns:
+            self.arrays[name][index] = record[name]
+
+    def column(self, name):
+        return self.ordered(self.arrays[name], self.start, self.length)
+
+    def last(self, name):
+        if not self.length:
+            return None
+        return self.arrays[name][(self.start + self.length - 1) % self.capacity]
+
+    def rows(self):
+        columns = [(name, self.column(name)) for name, _code in self.columns]
+        return [{name: values[index] for name, values in columns} for index in range(self.length)]
+
+    def to_bytes(self):
+        parts = [HEADER.pack(self.start, self.length)]
+        for name, _code in self.columns:
+            values = self.arrays[name]
+            if sys.byteorder == "big":
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+
+def percentile(values, weights, fraction):
+    """Weighted nearest-rank percentile of ``values``."""
+    pairs = sorted(zip(values, weights, strict=True))
+    rank = fraction * sum(weights)
+    seen = 0
+    for value, weight in pairs:
+        seen += weight
+        if seen >= rank:
+            return value
+    return pairs[-1][0]
+
+
+def summarize(start, count, up, latencies):
+    """A rollup record of ``latencies``, the latencies of the successful probes."""
+    if not latencies:
+        return {
+            "start": start,
+            "count": count,
+            "up": up,
+            "min": math.nan,
+            "avg": math.nan,
+            "max": math.nan,
+            "p95": math.nan,
+        }
+    return {
+        "start": start,
+        "count": count,
+        "up": up,
+        "min": min(latencies),
+        "avg": sum(latencies) / len(latencies),
+        "max": max(latencies),
+        "p95": percentile(latencies, [1] * len(latencies), 0.95),
+    }
+
+
+def merge(start, rollups):
+    """Combine the rollups of a bucket into one of the next level."""
+    measured = [rollup for rollup in rollups if not math.isnan(rollup["avg"]) and rollup["up"]]
+    count = min(sum(rollup["count"] for rollup in rollups), 0xFFFF)
+    up = min(sum(rollup["up"] for rollup in rollups), 0xFFFF)
+    if not measured:
+        return summarize(start, count, up, [])
+    weights = [rollup["up"] for rollup in measured]
+    return {
+        "start": start,
+        "count": count,
+        "up": up,
+        "min": min(rollup["min"] for rollup in measured),
+        "avg": sum(rollup["avg"] * weight for rollup, weight in zip(measured, weights, strict=True)) / sum(weights),
+        "max": max(rollup["max"] for rollup in measured),
+        "p95": percentile([rollup["p95"] for rollup in measured], weights, 0.95),
+    }
+
+
+class History:
+    """The rings of one ``ServiceHistory`` row."""
+
+    def __init__(self, row):
+        self.row = row
+        self.samples = Ring(SAMPLE_COLUMNS, SAMPLES, bytes(row.samples))
+        self.levels = {
+            field: Ring(ROLLUP_COLUMNS, capacity, bytes(getattr(row, field))) for field, _w, capacity in LEVELS
+        }
+
+    def close_minute(self, start):
+        times, latencies, ups = (self.samples.column(name) for name in ("time", "latency", "up"))
+        count = up = 0
+        measured = []
+        # The samples of the minute are the newest ones.
+        for index in range(len(times) - 1, -1, -1):
+            if times[index] < start:
+                break
+            if times[index] >= start + 60:
+                continue
+            count += 1
+            if ups[index]:
+                up += 1
+                if not math.isnan(latencies[index]):
+                    measured.append(latencies[index])
+        return summarize(start, count, up, measured)
+
+    def close_bucket(self, lower, start, width):
+        rollups = [rollup for rollup in lower.rows() if start <= rollup["start"] < start + width]
+        return merge(start, rollups)
+
+    def record(self, timestamp, is_up, latency_ms):
+        """Add a probe result; return the fields whose rings changed."""
+        changed = {"samples"}
+        last = self.samples.last("time")
+        if last is not None and timestamp // 60 > last // 60:
+            rollup = self.close_minute(last // 60 * 60)
+            self.levels["minutes"].append(**rollup)
+            changed.add("minutes")
+            for (lower, _w, _c), (field, width, _capacity) in zip(LEVELS, LEVELS[1:], strict=False):
+                if timestamp // width <= last // width:
+                    break
+                self.levels[field].append(**self.close_bucket(self.levels[lower], last // width * width, width))
+                changed.add(field)
+        latency = math.nan if latency_ms is None else latency_ms
+        self.samples.append(time=timestamp, latency=latency, up=int(is_up))
+        return changed
+
+    def save_to_row(self, fields):
+        for field in fields:
+            ring = self.samples if field == "samples" else self.levels[field]
+            setattr(self.row, field, ring.to_bytes())
+
+
+def record_results(results, checked_at):
+    """
+    Add a probe round to the history of its services in one read and at most two bulk writes.
+
+    Returns ``True`` if an hour ended, which changes the sparklines of the dashboard.
+    """
+    if not results:
+        return False
+    timestamp = int(checked_at.timestamp())
+    rows = {
+        row.service_id: row for row in ServiceHistory.objects.filter(service_id__in=[r.service_id for r in results])
+    }
+    new, changed = [], set()
+    for result in results:
+        row = rows.get(result.service_id)
+        if row is None:
+            row = ServiceHistory(service_id=result.service_id)
+            new.append(row)
+        history = History(row)
+        fields = history.record(timestamp, result.is_up, result.latency_ms)
+        history.save_to_row(fields)
+        changed |= fields
+    # Rows that did not close a bucket write back the rings they were loaded with.
+    if rows:
+        ServiceHistory.objects.bulk_update(rows.values(), sorted(changed))
+    if new:
+        ServiceHistory.objects.bulk_create(new)
+    return "hours" in changed
+
+
+def sparkline(averages):
+    """SVG polyline points for hourly average latencies, ``None`` with fewer than two values."""
+    points = [(index, value) for index, value in enumerate(averages) if not math.isnan(value)]
+    if len(points) < 2:
+        return None
+    low = min(value for _index, value in points)
+    high = max(value for _index, value in points)
+    spread = (high - low) or 1.0
+    step = SPARKLINE_WIDTH / max(len(averages) - 1, 1)
+    return " ".join(
+        f"{index * step:.1f},{SPARKLINE_HEIGHT - 1 - (value - low) / spread * (SPARKLINE_HEIGHT - 2):.1f}"
+        for index, value in points
+    )
+
+
+def sparklines(service_ids, points=SPARKLINE_POINTS):
+    """``{service id: {"points": ..., "max": ...}}`` of the last ``points`` hours, read in one query."""
+    capacity = next(capacity for field, _width, capacity in LEVELS if field == "hours")
+    lines = {}
+    for service_id, data in ServiceHistory.objects.filter(service_id__in=service_ids).values_list(
+        "service_id", "hours"
+    ):
+        data = bytes(data)
+        if len(data) != Ring.size(ROLLUP_COLUMNS, capacity):
+            continue
+        start, length = HEADER.unpack_from(data)
+        # Only the averages are decoded, straight from the stored bytes.
+        averages = Ring.ordered(Ring.read_column(data, ROLLUP_COLUMNS, capacity, "avg"), start, length)[-points:]
+        line = sparkline(averages)
+        if line is not None:
+            lines[service_id] = {"points": line, "max": max(value for value in averages if not math.isnan(value))}
+    return lines
@@ -0,0 +1,189 @@
+"""
+Self-hosted Font Awesome subset.
+
+Instead of the complete Font Awesome stylesheet and webfonts from a CDN, the
+dashboard loads a small stylesheet that only contains the icons used in our
+templates and in ``Service.icon``. Each icon is an SVG from the
+``fontawesomefree`` package embedded as a CSS mask, so the existing
+``<i class="fas fa-home"></i>`` markup keeps working and icons take the text
+color.
+
+``build_icons`` writes the subset to the static file ``core/css/icons.css``
+before ``collectstatic``, so WhiteNoise serves it hashed, precompressed and
+immutable like the other stylesheets. The subset is worked out again per
+services version: as long as it is the built file, pages link the static file.
+An icon changed in the admin after the deploy produces a subset that is not,
+and until the next deploy that one is served by ``views.icon_stylesheet``
+under its own content hash.
+"""
+
+import functools
+import json
+import logging
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+
+from .caching import build_entry, get_services_version, page_cache_key
+from .metrics import record_cache
+from .models import Category, Service
+from .timing import measure
+
+logger = logging.getLogger("homelab.icons")
+
+STYLESHEET_PAGE_NAME = "icon-stylesheet"
+STATIC_NAME = "core/css/icons.css"
+STYLE_DIRS = {
+    "fas": "solid",
+    "fa-solid": "solid",
+    "far": "regular",
+    "fa-regular": "regular",
+    "fab": "brands",
+    "fa-brands": "brands",
+}
+ICON_RE = re.compile(r"(?<![\w-])(fa[srb]|fa-solid|fa-regular|fa-brands)\s+fa-([a-z0-9]+(?:-[a-z0-9]+)*)")
+SVG_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+VIEW_BOX_RE = re.compile(r'viewBox="0 0 (\d+) (\d+)"')
+
+BASE_RULE = (
+    ".fas,.far,.fab,.fa-solid,.fa-regular,.fa-brands{display:inline-block;height:1em;width:1.25em;"
+    "vertical-align:-.125em;background-color:currentColor;"
+    "-webkit-mask:var(--fa-icon) center/contain no-repeat;mask:var(--fa-icon) center/contain no-repeat}"
+)
+
+
+def source_dir():
+    """Directory with the Font Awesome ``svgs/`` and ``metadata/`` folders."""
+    if settings.FONTAWESOME_DIR:
+        return Path(settings.FONTAWESOME_DIR)
+    try:
+        import fontawesomefree
+    except ImportError:
+        return None
+    return Path(fontawesomefree.__file__).parent / "static" / "fontawesomefree"
+
+
+@functools.cache
+def load_aliases(directory):
+    """Map old names like ``home`` to the file name of the icon (``house``)."""
+    try:
+        with open(directory / "metadata" / "icons.json", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {alias: name for name, icon in metadata.items() for alias in icon.get("aliases", {}).get("names", [])}
+
+
+def parse_icons(text):
+    """Return the ``(style, name)`` pairs of all icon class combinations in ``text``."""
+    return {(STYLE_DIRS[style], name) for style, name in ICON_RE.findall(text)}
+
+
+def template_icons():
+    """Icons used in the templates of our own apps."""
+    icons = set()
+    base_dir = Path(settings.BASE_DIR).resolve()
+    template_dirs = [Path(directory) for config in settings.TEMPLATES for directory in config.get("DIRS", [])]
+    template_dirs += [Path(app.path) / "templates" for app in apps.get_app_configs()]
+    for directory in template_dirs:
+        if not directory.is_dir() or not directory.resolve().is_relative_to(base_dir):
+            continue
+        for template in directory.rglob("*.html"):
+            icons |= parse_icons(template.read_text(encoding="utf-8"))
+    return icons
+
+
+def used_icons():
+    """Icons referenced by templates or any service or category."""
+    icons = template_icons()
+    for model in (Service, Category):
+        for icon in model.objects.exclude(icon="").values_list("icon", flat=True).distinct():
+            icons |= parse_icons(icon)
+    return icons
+
+
+def icon_svg(directory, style, name):
+    path = directory / "svgs" / style / f"{name}.svg"
+    if not path.exists():
+        path = directory / "svgs" / style / f"{load_aliases(directory).get(name, name)}.svg"
+    try:
+        return SVG_COMMENT_RE.sub("", path.read_text(encoding="utf-8"))
+    except OSError:
+        return None
+
+
+def build_stylesheet(icons):
+    """Return ``(css, missing)`` for the given ``(style, name)`` pairs."""
+    directory = source_dir()
+    rules = [BASE_RULE]
+    missing = []
+    for style, name in sorted(icons):
+        svg = icon_svg(directory, style, name) if directory else None
+        if svg is None:
+            missing.append(f"{style}/{name}")
+            continue
+        selector = ",".join(
+            f".{prefix}.fa-{name}" for prefix, directory_name in STYLE_DIRS.items() if directory_name == style
+        )
+        declarations = f'--fa-icon:url("data:image/svg+xml,{quote(svg, safe=" /=:;,.-")}")'
+        match = VIEW_BOX_RE.search(svg)
+        if match and int(match.group(1)) > int(match.group(2)) * 1.25:
+            # Wide icons such as brand logos would be squeezed by the default 1.25em box.
+            declarations += f";width:{int(match.group(1)) / int(match.group(2)):.3g}em"
+        rules.append(f"{selector}{{{declarations}}}")
+    return "\n".join(rules) + "\n", missing
+
+
+def static_source():
+    """Where ``build_icons`` writes the subset, in the static files of this app."""
+    return Path(apps.get_app_config("core").path) / "static" / STATIC_NAME
+
+
+def write_static_stylesheet(css):
+    path = static_source()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(css, encoding="utf-8")
+
+
+def static_url(css):
+    """URL of the collected static subset if it is ``css``, otherwise ``None``."""
+    try:
+        if static_source().read_text(encoding="utf-8") != css:
+            return None
+        return staticfiles_storage.url(STATIC_NAME)
+    except (OSError, ValueError):
+        # Not built, or built after collectstatic and missing from the manifest.
+        return None
+
+
+def get_icon_stylesheet():
+    """
+    The icon subset for the current services version as a dict with its
+    ``url`` and the ``missing`` icons. A subset that is not the static file
+    also has the precompressed cache ``entry`` that ``views.icon_stylesheet`` serves.
+    """
+    key = page_cache_key(STYLESHEET_PAGE_NAME, get_services_version())
+    with measure("cache"):
+        stylesheet = cache.get(key)
+    record_cache(STYLESHEET_PAGE_NAME, stylesheet is not None)
+    if stylesheet is None:
+        css, missing = build_stylesheet(used_icons())
+        if missing:
+            logger.warning("Font Awesome icons not found: %s", ", ".join(missing))
+        url = static_url(css)
+        if url is not None:
+            stylesheet = {"entry": None, "url": url, "missing": missing}
+        else:
+            entry = build_entry(HttpResponse(css, content_type="text/css; charset=utf-8"), last_modified=None)
+            digest = entry["etag"].strip('"')[:12]
+            stylesheet = {"entry": entry, "url": reverse("core:icon-stylesheet", args=[digest]), "missing": missing}
+        with measure("cache"):
+            cache.set(key, stylesheet, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return stylesheet
@@ -0,0 +1,205 @@
+"""
+Logo processing.
+
+Uploaded raster logos are turned into small AVIF/WebP/PNG renditions at 1x and
+2x of the rendered icon size, SVG logos are sanitised and minified. The
+metadata needed for ``<picture>``/``srcset``/``width``/``height`` is stored in
+``Service.logo_renditions``.
+
+``build_renditions`` only works on bytes and returns bytes, so it can run in a
+process pool; ``process_logo`` does the storage and database side.
+
+Logos and renditions are stored by content (see ``backends.storage``), so one
+file can belong to several services. Nothing here deletes files, the
+``collect_logos`` command removes them once no service references them.
+"""
+
+import io
+import math
+import re
+import xml.etree.ElementTree as ET
+
+from django.core.files.base import ContentFile
+from PIL import Image, features
+
+# The dashboard renders logos in an 80x80 CSS pixel box, see .service-logo.
+LOGO_BOX = 80
+DENSITIES = (1, 2)
+RENDITIONS_DIR = "services/logos/renditions"
+
+RASTER_FORMATS = [
+    # (format, mime type, Pillow save options)
+    ("avif", "image/avif", {"quality": 60}),
+    ("webp", "image/webp", {"quality": 85, "method": 6}),
+    ("png", "image/png", {"optimize": True}),
+]
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+UNSAFE_SVG_TAGS = {"script", "foreignObject", "iframe", "embed", "object", "metadata"}
+LENGTH_RE = re.compile(r"^\s*([\d.]+)\s*(px)?\s*$")
+
+
+class LogoError(Exception):
+    """Raised when an uploaded logo cannot be processed."""
+
+
+def fit(width, height, box, enlarge=False):
+    """Scale ``(width, height)`` to fit into a ``box`` square."""
+    scale = box / max(width, height)
+    if not enlarge:
+        scale = min(1.0, scale)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def available_formats():
+    return [(fmt, mime, options) for fmt, mime, options in RASTER_FORMATS if fmt == "png" or features.check(fmt)]
+
+
+def build_raster_renditions(data):
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise LogoError(f"not a readable image: {exc}") from exc
+    image = image.convert("RGBA")
+    width, height = fit(*image.size, LOGO_BOX)
+    files = {}
+    sources = []
+    for fmt, mime, options in available_formats():
+        srcset = []
+        previous = None
+        for density in DENSITIES:
+            size = fit(*image.size, LOGO_BOX * density)
+            if size == previous:
+                # The source is too small to add detail at this density.
+                break
+            previous = size
+            rendition = image.resize(size, Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            rendition.save(buffer, fmt.upper(), **options)
+            suffix = f"-{LOGO_BOX * density}.{fmt}"
+            files[suffix] = buffer.getvalue()
+            srcset.append((suffix, f"{density}x"))
+        sources.append({"type": mime, "srcset": srcset})
+    # Sources are ordered by preference and end with PNG, whose 1x rendition is also the <img> fallback.
+    return {"width": width, "height": height, "files": files, "src": sources[-1]["srcset"][0][0], "sources": sources}
+
+
+def positive_size(width, height):
+    """Both values as floats, a ``LogoError`` unless they are finite and greater than 0."""
+    try:
+        size = float(width), float(height)
+    except ValueError as exc:
+        raise LogoError(f"invalid SVG size: {width!r} x {height!r}") from exc
+    if not all(math.isfinite(value) and value > 0 for value in size):
+        raise LogoError(f"invalid SVG size: {width!r} x {height!r}")
+    return size
+
+
+def svg_dimensions(root):
+    view_box = root.get("viewBox", "").replace(",", " ").split()
+    if len(view_box) == 4:
+        return positive_size(view_box[2], view_box[3])
+    width, height = LENGTH_RE.match(root.get("width", "")), LENGTH_RE.match(root.get("height", ""))
+    if width and height:
+        return positive_size(width.group(1), height.group(1))
+    return LOGO_BOX, LOGO_BOX
+
+
+def local_name(name):
+    return name.rsplit("}", 1)[-1]
+
+
+def sanitize_svg(data):
+    """Return ``(minified_svg, width, height)`` with scripts, handlers and external references removed."""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as exc:
+        raise LogoError(f"not a valid SVG: {exc}") from exc
+    if local_name(root.tag) != "svg":
+        raise LogoError("not an SVG document")
+
+    for parent in root.iter():
+        for child in list(parent):
+            tag = child.tag if isinstance(child.tag, str) else ""
+            foreign = tag.startswith("{") and not tag.startswith(f"{{{SVG_NS}}}")
+            if not tag or foreign or local_name(tag) in UNSAFE_SVG_TAGS:
+                parent.remove(child)
+    for element in root.iter():
+        for attribute in list(element.attrib):
+            name = local_name(attribute)
+            value = element.attrib[attribute].strip()
+            foreign = attribute.startswith("{") and not attribute.startswith(f"{{{XLINK_NS}}}")
+            external = name == "href" and not value.startswith(("#", "data:image/"))
+            if foreign or name.startswith("on") or external:
+                del element.attrib[attribute]
+        if element.text is not None and not element.text.strip():
+            element.text = None
+        if element.tail is not None and not element.tail.strip():
+            element.tail = None
+
+    width, height = svg_dimensions(root)
+    return ET.tostring(root, encoding="utf-8", xml_declaration=False), width, height
+
+
+def build_svg_renditions(data):
+    svg, width, height = sanitize_svg(data)
+    # Vector logos scale freely, so always fill the box.
+    width, height = fit(width, height, LOGO_BOX, enlarge=True)
+    return {"width": width, "height": height, "files": {".svg": svg}, "src": ".svg", "sources": []}
+
+
+def build_renditions(data, name):
+    """Compute all renditions for a logo file; pure and picklable for process pools."""
+    if name.lower().endswith(".svg"):
+        return build_svg_renditions(data)
+    return build_raster_renditions(data)
+
+
+def save_renditions(service, result):
+    """Store computed renditions and return the metadata for ``Service.logo_renditions``."""
+    storage = service.logo_file.storage
+    names = {}
+    for suffix, content in result["files"].items():
+        # The storage names the file by its content, only the directory and extension are kept.
+        extension = suffix.rsplit(".", 1)[1]
+        names[suffix] = storage.save(f"{RENDITIONS_DIR}/logo.{extension}", ContentFile(content))
+    return {
+        "source": service.logo_file.name,
+        "width": result["width"],
+        "height": result["height"],
+        "src": names[result["src"]],
+        "sources": [
+            {"type": source["type"], "srcset": [[names[suffix], descriptor] for suffix, descriptor in source["srcset"]]}
+            for source in result["sources"]
+        ],
+    }
+
+
+def rendition_names(renditions):
+    names = set()
+    if renditions.get("src"):
+        names.add(renditions["src"])
+    for source in renditions.get("sources", []):
+        names.update(name for name, _descriptor in source["srcset"])
+    return names
+
+
+def apply_renditions(service, result):
+    """Save ``result`` for ``service`` and persist the metadata."""
+    # Replaced renditions may be shared with other services; collect_logos deletes them once unreferenced.
+    service.logo_renditions = save_renditions(service, result) if result else {}
+    service.save(update_fields=["logo_renditions", "updated_at"])
+
+
+def process_logo(service):
+    """(Re)build the renditions of ``service.logo_file``."""
+    if not service.logo_file:
+        apply_renditions(service, None)
+        return
+    with service.logo_file.open("rb") as f:
+        data = f.read()
+    apply_renditions(service, build_renditions(data, service.logo_file.name))
@@ -1,250 +1,44 @@
 from pathlib import Path
 
-from django.core.files import File
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
 
+from apps.core.catalog import DEFAULT_MANIFEST, LOGOS_DIR, CatalogError, apply_sync, load_manifest, plan_sync
 from apps.core.models import Service
 
 
 class Command(BaseCommand):
-    help = "Add default services to the database"
+    help = "Create and update the default services from the catalog manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST, help="TOML manifest to sync from")
+        parser.add_argument(
+            "--logos-dir", type=Path, default=LOGOS_DIR, help="Directory with the logo files named in the manifest"
+        )
+        parser.add_argument(
+            "--prune", action="store_true", help="Deactivate active services that are not in the manifest"
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Show the changes without writing them")
 
     def handle(self, *args, **options):
-        # Path to static logos directory where we keep the source logos
-        logos_dir = Path(__file__).parent.parent.parent / "static" / "core" / "logos"
-
-        services = [
-            {
-                "name": "Home Assistant",
-                "description": "Smart home automation platform for controlling lights, sensors, and devices",
-                "url": "https://homeassistant.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-home",
-                "logo_filename": "home-assistant.png",
-                "order": 1,
-            },
-            {
-                "name": "Nyxmon",
-                "description": "System monitoring and metrics dashboard for homelab infrastructure",
-                "url": "https://nyxmon.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-chart-line",
-                "logo_filename": "nyxmon.png",
-                "order": 2,
-            },
-            {
-                "name": "Unifi",
-                "description": "Self-hosted network controller for managing WiFi access points and switches",
-                "url": "https://unifi.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-network-wired",
-                "logo_filename": "unifi.png",
-                "order": 3,
-            },
-            {
-                "name": "Paperless-ngx",
-                "description": "Document management system for transforming paper into searchable digital archives",
-                "url": "https://paperless.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-file-alt",
-                "logo_filename": "paperless.png",
-                "order": 4,
-            },
-            {
-                "name": "FastDeploy",
-                "description": "Deployment automation platform for managing web applications via API and web interface",
-                "url": "https://deploy.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-rocket",
-                "logo_filename": "fastdeploy.png",
-                "order": 5,
-            },
-            {
-                "name": "Vaultwarden",
-                "description": "Self-hosted password manager compatible with Bitwarden clients",
-                "url": "https://vault.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-lock",
-                "logo_filename": "vaultwarden.svg",
-                "order": 6,
-            },
-            {
-                "name": "SnappyMail",
-                "description": "Self-hosted webmail client for IMAP/SMTP access",
-                "url": "https://webmail.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-envelope",
-                "logo_filename": "snappymail.svg",
-                "order": 7,
-            },
-            {
-                "name": "MinIO",
-                "description": "S3-compatible object storage for backups and data archiving",
-                "url": "https://minio.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-database",
-                "logo_filename": "minio.png",
-                "order": 8,
-            },
-            {
-                "name": "Navidrome",
-                "description": "Self-hosted music streaming server (Subsonic-compatible)",
-                "url": "https://music.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-music",
-                "logo_filename": "navidrome.png",
-                "order": 9,
-            },
-            {
-                "name": "Jellyfin",
-                "description": "Self-hosted video server for movies, TV, and downloads",
-                "url": "https://media.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-film",
-                "logo_filename": "jellyfin.svg",
-                "order": 10,
-            },
-            {
-                "name": "MeTube",
-                "description": "Share-sheet video downloader to Jellyfin (yt-dlp queue)",
-                "url": "https://metube.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-cloud-download-alt",
-                "order": 11,
-            },
-            {
-                "name": "Minecraft",
-                "description": "Java Edition server - Connect at macmini.fritz.box:25565",
-                "url": "",
-                "icon": "fas fa-cube",
-                "logo_filename": "minecraft.png",
-                "order": 12,
-            },
-            {
-                "name": "PostfixAdmin",
-                "description": "Mail user and alias management for self-hosted email",
-                "url": "https://mailadmin.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-users-cog",
-                "logo_filename": "postfixadmin.svg",
-                "order": 13,
-            },
-            {
-                "name": "Fractal IPMI",
-                "description": "IPMI/BMC management interface for the fractal server",
-                "url": "https://asrock.fritz.box/",
-                "icon": "fas fa-microchip",
-                "logo_filename": "fractal-ipmi.svg",
-                "is_active": True,
-                "order": 14,
-            },
-            {
-                "name": "Family Blog CMS",
-                "description": "Wagtail admin for the family blog",
-                "url": "https://wersdoerfer.de/cms",
-                "icon": "fas fa-feather-alt",
-                "logo_filename": "wagtail.svg",
-                "order": 15,
-            },
-            {
-                "name": "Python Podcast CMS",
-                "description": "Wagtail admin for python-podcast.de",
-                "url": "https://python-podcast.de/cms",
-                "icon": "fas fa-podcast",
-                "logo_filename": "wagtail.svg",
-                "order": 16,
-            },
-            {
-                "name": "qBittorrent",
-                "description": "BitTorrent client for downloads and seeding",
-                "url": "https://torrent.home.wersdörfer.de",
-                "icon": "fas fa-magnet",
-                "logo_filename": "qbittorrent.svg",
-                "order": 17,
-            },
-            {
-                "name": "Takahe",
-                "description": "Fediverse server for python-podcast.de",
-                "url": "https://fedi.python-podcast.de/",
-                "icon": "fas fa-comment-dots",
-                "order": 18,
-            },
-            {
-                "name": "Mastodon",
-                "description": "Mastodon instance for wersdoerfer.de",
-                "url": "https://fedi.wersdoerfer.de/",
-                "icon": "fab fa-mastodon",
-                "order": 19,
-            },
-            {
-                "name": "Open WebUI",
-                "description": "Chat interface for local LLMs (Open WebUI)",
-                "url": "https://open-webui.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-comments",
-                "logo_filename": "open-webui.png",
-                "order": 20,
-            },
-            {
-                "name": "Echoport",
-                "description": "Backup orchestration service for SQLite databases and config files",
-                "url": "https://echoport.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-cloud-upload-alt",
-                "logo_filename": "echoport.svg",
-                "order": 21,
-            },
-            {
-                "name": "OpenClaw",
-                "description": "AI automation gateway and web dashboard",
-                "url": "https://openclaw.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-robot",
-                "logo_filename": "openclaw.svg",
-                "order": 22,
-            },
-            {
-                "name": "Voxhelm",
-                "description": "Operator UI for local audio/video transcription and transcript exports",
-                "url": "https://voxhelm.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-wave-square",
-                "order": 23,
-            },
-            {
-                "name": "Graphyard",
-                "description": "Metrics catalog and operator interface for the homelab metrics platform",
-                "url": "https://graphyard.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-project-diagram",
-                "logo_filename": "graphyard.svg",
-                "order": 24,
-            },
-            {
-                "name": "Grafana",
-                "description": "Time-series dashboards and drill-down views for Graphyard metrics",
-                "url": "https://grafana.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-chart-area",
-                "order": 25,
-            },
-            {
-                "name": "OpsGate",
-                "description": "Approval queue and audit surface for human-reviewed operator actions",
-                "url": "https://opsgate.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-clipboard-check",
-                "order": 25,
-            },
-            {
-                "name": "Archive",
-                "description": (
-                    "Self-hosted archive for saved links, podcast episodes, and videos with summaries and public feeds"
-                ),
-                "url": "https://archive.home.xn--wersdrfer-47a.de/",
-                "icon": "fas fa-box-archive",
-                "order": 26,
-            },
-        ]
-
-        with transaction.atomic():
-            for service_data in services:
-                logo_filename = service_data.pop("logo_filename", None)
-
-                service, created = Service.objects.update_or_create(name=service_data["name"], defaults=service_data)
-
-                # Add logo file if specified and file exists
-                if logo_filename:
-                    logo_path = logos_dir / logo_filename
-                    if logo_path.exists() and not service.logo_file:
-                        with open(logo_path, "rb") as f:
-                            service.logo_file.save(logo_filename, File(f), save=True)
-                        self.stdout.write(self.style.SUCCESS(f"Added logo for {service.name}"))
-
-                status = "Created" if created else "Updated"
-                self.stdout.write(self.style.SUCCESS(f"{status} service: {service.name}"))
+        try:
+            manifest = load_manifest(options["manifest"])
+        except CatalogError as exc:
+            raise CommandError(str(exc)) from exc
+        plan = plan_sync(manifest, logos_dir=options["logos_dir"], prune=options["prune"])
+
+        for line in plan.describe():
+            self.stdout.write(line)
+        counts = (len(plan.create_services), len(plan.update_services), len(plan.deactivate_services), len(plan.logos))
+        if options["dry_run"]:
+            message = "Dry run: would create {} services, update {}, deactivate {} and add {} logos"
+            self.stdout.write(self.style.WARNING(message.format(*counts)))
+            return
+        if plan:
+            apply_sync(plan, logos_dir=options["logos_dir"])
+            message = "Created {} services, updated {}, deactivated {} and added {} logos"
+            self.stdout.write(self.style.SUCCESS(message.format(*counts)))
+        else:
+            self.stdout.write(self.style.SUCCESS("Services are up to date"))
 
         total = Service.objects.count()
         self.stdout.write(self.style.SUCCESS(f"\nTotal services in database: {total}"))
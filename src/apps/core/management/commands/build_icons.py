@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.icons import STATIC_NAME, build_stylesheet, used_icons, write_static_stylesheet
+
+
+class Command(BaseCommand):
+    help = "Build the Font Awesome subset from the icons used in templates and services, run before collectstatic"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Also write the stylesheet to this file")
+        parser.add_argument("--check", action="store_true", help="Fail if an icon is not available in Font Awesome")
+
+    def handle(self, *args, **options):
+        icons = used_icons()
+        css, missing = build_stylesheet(icons)
+        if options["verbosity"] > 1:
+            for style, name in sorted(icons):
+                self.stdout.write(f"{style}/{name}")
+        for icon in missing:
+            self.stderr.write(self.style.WARNING(f"Icon not found: {icon}"))
+
+        write_static_stylesheet(css)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(css)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(icons) - len(missing)} icons, {len(css.encode()) / 1024:.1f} KiB, written to {STATIC_NAME}"
+            )
+        )
+        if options["check"] and missing:
+            raise CommandError(f"{len(missing)} icons are missing")
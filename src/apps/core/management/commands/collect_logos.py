@@ -0,0 +1,88 @@
+"""
+Garbage collection of stored logos.
+
+Logos and renditions are stored by content, so one file can belong to several
+services and is only deleted once no ``Service`` references it. Files younger
+than ``min_age`` are kept: another process may have stored the same content
+and not yet committed the service that uses it.
+"""
+
+import time
+from collections import Counter
+from datetime import UTC, datetime
+
+from django.core.management.base import BaseCommand
+
+from apps.core.logos import rendition_names
+from apps.core.media import media_index
+from apps.core.models import Service
+
+# Seconds a stored file is kept even when nothing references it.
+MIN_AGE = 3600
+
+
+def logo_reference_counts():
+    """Number of services that reference each stored logo and rendition file."""
+    counts = Counter()
+    services = Service.objects.exclude(logo_file="").values_list("logo_file", "logo_renditions")
+    for logo_file, renditions in services.iterator():
+        counts.update({logo_file, *rendition_names(renditions or {})})
+    return counts
+
+
+def delete_unreferenced(names, min_age=MIN_AGE, dry_run=False):
+    """Delete those of ``names`` that no service references and that are older than ``min_age`` seconds."""
+    storage = Service._meta.get_field("logo_file").storage
+    counts = logo_reference_counts()
+    cutoff = datetime.fromtimestamp(time.time() - min_age, tz=UTC)
+    unreferenced = sorted(
+        name
+        for name in names
+        if not counts[name] and storage.exists(name) and storage.get_modified_time(name) <= cutoff
+    )
+    if not dry_run:
+        for name in unreferenced:
+            storage.delete(name)
+        if unreferenced:
+            media_index.clear()
+    return unreferenced
+
+
+def stored_files(storage, directory):
+    """Names of all files below ``directory``."""
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield f"{directory}/{filename}"
+    for subdirectory in directories:
+        yield from stored_files(storage, f"{directory}/{subdirectory}")
+
+
+class Command(BaseCommand):
+    help = "Delete stored logos and renditions that no service references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=MIN_AGE,
+            help="Keep files younger than this many seconds, they may belong to an upload in progress",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the files without deleting them")
+
+    def handle(self, *args, **options):
+        field = Service._meta.get_field("logo_file")
+        directory = field.upload_to.rstrip("/")
+        if not field.storage.exists(directory):
+            self.stdout.write("No logos are stored")
+            return
+
+        names = list(stored_files(field.storage, directory))
+        unreferenced = delete_unreferenced(names, min_age=options["min_age"], dry_run=options["dry_run"])
+        if options["verbosity"] > 1 or options["dry_run"]:
+            for name in unreferenced:
+                self.stdout.write(f"Unreferenced: {name}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run: would delete {len(unreferenced)} of {len(names)} files"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {len(unreferenced)} of {len(names)} files"))
@@ -0,0 +1,180 @@
+import io
+import random
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from PIL import Image, ImageDraw
+
+from apps.core.caching import bump_services_version
+from apps.core.logos import build_renditions, rendition_names, save_renditions
+from apps.core.management.commands.collect_logos import delete_unreferenced
+from apps.core.models import Category, Service, ServiceStatus, Tag
+
+ICONS = [
+    "fas fa-server",
+    "fas fa-home",
+    "fas fa-chart-line",
+    "fas fa-network-wired",
+    "fas fa-rocket",
+    "fas fa-database",
+    "fas fa-cloud",
+    "fas fa-film",
+    "fas fa-music",
+    "fas fa-book",
+    "fas fa-envelope",
+    "fas fa-code",
+]
+WORDS = [
+    "media", "backup", "photos", "monitor", "git", "wiki", "dns", "proxy", "vault", "notes",
+    "feeds", "mail", "music", "metrics", "files", "cameras", "printer", "calendar", "recipes", "books",
+]  # fmt: skip
+BATCH_SIZE = 500
+
+
+def random_color(rng):
+    return tuple(rng.randrange(256) for _ in range(3))
+
+
+def png_logo(rng):
+    """A raster logo of a typical upload size: a gradient background with a few shapes."""
+    width, height = rng.choice([(512, 512), (256, 256), (600, 200), (1024, 1024)])
+    top, bottom = (Image.new("RGB", (width, height), random_color(rng)) for _ in range(2))
+    image = Image.composite(bottom, top, Image.linear_gradient("L").resize((width, height)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(3, 8)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randint(min(width, height) // 10, min(width, height) // 3)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=random_color(rng))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def svg_logo(rng):
+    shapes = []
+    for _ in range(rng.randint(2, 6)):
+        color = "#{:02x}{:02x}{:02x}".format(*random_color(rng))
+        x, y, radius = rng.randint(10, 90), rng.randint(10, 90), rng.randint(5, 40)
+        shapes.append(f'<circle cx="{x}" cy="{y}" r="{radius}" fill="{color}"/>')
+    return f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">{"".join(shapes)}</svg>'.encode()
+
+
+def logo_variants(rng, count):
+    """``count`` distinct logos, half SVG and half PNG, with their renditions computed once."""
+    variants = []
+    for index in range(count):
+        extension, data = (".svg", svg_logo(rng)) if index % 2 else (".png", png_logo(rng))
+        variants.append((extension, data, build_renditions(data, f"logo{extension}")))
+    return variants
+
+
+class Command(BaseCommand):
+    help = "Create synthetic services with logos and statuses for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000, help="Number of services to create")
+        parser.add_argument("--prefix", default="Synthetic", help="Name prefix that marks generated services")
+        parser.add_argument("--logos", type=float, default=0.6, help="Share of services with an uploaded logo")
+        parser.add_argument("--logo-variants", type=int, default=24, help="Number of distinct logo images")
+        parser.add_argument("--categories", type=int, default=8, help="Number of categories to spread services over")
+        parser.add_argument("--max-tags", type=int, default=3, help="Maximum number of tags per service")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated services first")
+
+    def handle(self, *args, **options):
+        if min(options["count"], options["categories"], options["max_tags"]) < 0 or not 0 <= options["logos"] <= 1:
+            raise CommandError(
+                "--count, --categories and --max-tags must not be negative and --logos must be between 0 and 1"
+            )
+        prefix = options["prefix"]
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+
+        if options["clear"]:
+            self.stdout.write(f"Deleted {self.clear(prefix)} generated services")
+
+        variants = logo_variants(rng, options["logo_variants"]) if options["logos"] else []
+        categories = [self.get_category(prefix, number) for number in range(options["categories"])]
+        tags = [self.get_tag(prefix, word) for word in WORDS] if options["max_tags"] else []
+        offset = Service.objects.filter(name__startswith=f"{prefix} ").count()
+        # Generated services are listed after all existing ones.
+        first_order = (Service.objects.order_by("-order").values_list("order", flat=True).first() or 0) + 1 - offset
+        for batch_start in range(0, options["count"], BATCH_SIZE):
+            numbers = range(offset + batch_start, offset + min(batch_start + BATCH_SIZE, options["count"]))
+            services = [
+                self.build_service(rng, prefix, number, first_order, variants, categories, options)
+                for number in numbers
+            ]
+            with transaction.atomic():
+                created = Service.objects.bulk_create(services)
+                ServiceStatus.objects.bulk_create(self.build_status(rng, service) for service in created)
+                Service.tags.through.objects.bulk_create(
+                    Service.tags.through(service=service, tag=tag)
+                    for service in created
+                    for tag in rng.sample(tags, rng.randint(0, min(options["max_tags"], len(tags))))
+                )
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Created {batch_start + len(services)} of {options['count']} services")
+
+        # bulk_create does not send post_save, so the counts and cached pages have to be updated here.
+        Category.update_active_service_counts()
+        bump_services_version()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Created {options['count']} services in {elapsed:.1f}s"))
+
+    def get_category(self, prefix, number):
+        name = f"{prefix} category {number:02d}"
+        return Category.objects.get_or_create(name=name, defaults={"slug": slugify(name), "order": 1000 + number})[0]
+
+    def get_tag(self, prefix, word):
+        name = f"{prefix.lower()}-{word}"
+        return Tag.objects.get_or_create(name=name, defaults={"slug": slugify(name)})[0]
+
+    def build_service(self, rng, prefix, number, first_order, variants, categories, options):
+        words = rng.sample(WORDS, 2)
+        service = Service(
+            name=f"{prefix} {number:06d} {words[0]}",
+            description=f"Synthetic {words[0]} and {words[1]} service for load testing",
+            url=f"https://{words[0]}-{number}.synthetic.invalid/",
+            icon=rng.choice(ICONS),
+            order=first_order + number,
+            is_active=rng.random() < 0.95,
+            category=rng.choice(categories) if categories else None,
+        )
+        if variants and rng.random() < options["logos"]:
+            extension, data, result = rng.choice(variants)
+            # Stored by content, so services with the same variant share one file.
+            service.logo_file.name = service.logo_file.storage.save(
+                f"services/logos/synthetic{extension}", ContentFile(data)
+            )
+            service.logo_renditions = save_renditions(service, result)
+        return service
+
+    def build_status(self, rng, service):
+        is_up = rng.random() < 0.9
+        return ServiceStatus(
+            service=service,
+            is_up=is_up,
+            status_code=200 if is_up else None,
+            latency_ms=round(rng.lognormvariate(3, 0.8), 1) if is_up else None,
+            error="" if is_up else "Connection refused",
+            consecutive_failures=0 if is_up else rng.randint(1, 20),
+            checked_at=timezone.now(),
+        )
+
+    def clear(self, prefix):
+        services = Service.objects.filter(name__startswith=f"{prefix} ")
+        names = set()
+        for logo_file, renditions in services.exclude(logo_file="").values_list("logo_file", "logo_renditions"):
+            names.update({logo_file, *rendition_names(renditions)})
+        count = services.count()
+        services.delete()
+        # Generated files are not shared with an upload in progress, so they need no minimum age.
+        delete_unreferenced(names, min_age=0)
+        Category.objects.filter(name__startswith=f"{prefix} category ").delete()
+        Tag.objects.filter(name__startswith=f"{prefix.lower()}-").delete()
+        return count
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.caching import bump_status_version
+from apps.core.history import record_results
+from apps.core.models import Service, ServiceStatus
+from apps.core.probes import Prober
+
+
+class Command(BaseCommand):
+    help = "Probe all active services concurrently and store their status"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run a single round and exit")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between the start of two rounds")
+        parser.add_argument("--concurrency", type=int, default=32, help="Maximum number of probes in flight")
+        parser.add_argument("--timeout", type=float, default=2.0, help="Per-probe timeout in seconds")
+        parser.add_argument("--insecure", action="store_true", help="Do not verify TLS certificates")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_is_up = {}
+
+    def handle(self, *args, **options):
+        # async_to_sync keeps ORM calls on this thread's database connection.
+        async_to_sync(self.run)(options)
+
+    async def run(self, options):
+        prober = Prober(
+            concurrency=options["concurrency"],
+            timeout=options["timeout"],
+            verify_tls=not options["insecure"],
+        )
+        try:
+            while True:
+                started = time.monotonic()
+                await self.run_round(prober, options["verbosity"])
+                if options["once"]:
+                    break
+                await asyncio.sleep(max(0.0, options["interval"] - (time.monotonic() - started)))
+        finally:
+            await prober.aclose()
+
+    async def run_round(self, prober, verbosity=1):
+        started = time.perf_counter()
+        targets = [
+            target async for target in Service.objects.filter(is_active=True).exclude(url="").values_list("id", "url")
+        ]
+        results = await prober.run_round(targets)
+        await self.save_results(prober, results)
+
+        if verbosity >= 1:
+            up = sum(result.is_up for result in results)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Probed {len(results)} of {len(targets)} services in {elapsed:.2f}s "
+                f"({up} up, {len(results) - up} down)"
+            )
+        if verbosity >= 2:
+            for result in results:
+                if not result.is_up:
+                    self.stdout.write(self.style.WARNING(f"  service {result.service_id}: {result.error}"))
+        return results
+
+    async def save_results(self, prober, results):
+        """Upsert all results of a round in a single query."""
+        if not results:
+            return
+        checked_at = timezone.now()
+        statuses = [
+            ServiceStatus(
+                service_id=result.service_id,
+                is_up=result.is_up,
+                status_code=result.status_code,
+                latency_ms=result.latency_ms,
+                error=result.error,
+                consecutive_failures=0 if result.is_up else prober.backoff[result.service_id].failures,
+                checked_at=checked_at,
+            )
+            for result in results
+        ]
+        await ServiceStatus.objects.abulk_create(
+            statuses,
+            update_conflicts=True,
+            unique_fields=["service"],
+            update_fields=["is_up", "status_code", "latency_ms", "error", "consecutive_failures", "checked_at"],
+        )
+        # Cached dashboards only need re-rendering when a service went up or down. This is the status
+        # version, the sprite, search index, API and service worker stay cached.
+        changed = [result for result in results if self.last_is_up.get(result.service_id) != result.is_up]
+        self.last_is_up.update((result.service_id, result.is_up) for result in results)
+        # The sparklines on the dashboard show hourly averages, a new hour re-renders it as well.
+        hour_closed = await sync_to_async(record_results)(results, checked_at)
+        if changed or hour_closed:
+            bump_status_version()
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.core.logos import LogoError, apply_renditions, build_renditions
+from apps.core.models import Service
+
+
+def read_logo(service):
+    with service.logo_file.open("rb") as f:
+        return f.read()
+
+
+class Command(BaseCommand):
+    help = "Build resized logo renditions for services that are missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild renditions for every logo")
+        parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+
+    def handle(self, *args, **options):
+        services = [
+            service
+            for service in Service.objects.exclude(logo_file="")
+            if options["all"] or service.logo_renditions.get("source") != service.logo_file.name
+        ]
+        if not services:
+            self.stdout.write("All logos are up to date")
+            return
+
+        # Resizing and encoding is CPU bound, storage and database writes stay in this process.
+        processed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = []
+            for service in services:
+                try:
+                    data = read_logo(service)
+                except OSError as exc:
+                    # A file lost in a restore or a partial sync must not stop the other logos.
+                    self.stderr.write(self.style.WARNING(f"Skipping {service.name}: {exc}"))
+                    continue
+                futures.append((service, executor.submit(build_renditions, data, service.logo_file.name)))
+            for service, future in futures:
+                try:
+                    result = future.result()
+                except (LogoError, OSError) as exc:
+                    self.stderr.write(self.style.WARNING(f"Skipping {service.name}: {exc}"))
+                    continue
+                apply_renditions(service, result)
+                processed += 1
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Processed logo for {service.name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} of {len(services)} logos"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = "Warm up URLconfs, templates, the database connection and the shared dashboard cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-ms", type=float, help="Fail if the warm-up takes longer than this")
+
+    def handle(self, *args, **options):
+        report = warmup()
+        for name, ms in report.timings.items():
+            error = report.errors.get(name)
+            line = f"{name:<10} {ms:8.1f} ms"
+            self.stdout.write(self.style.ERROR(f"{line}  {error}") if error else line)
+        self.stdout.write(f"{'total':<10} {report.total_ms:8.1f} ms")
+
+        if report.errors:
+            raise CommandError(f"{len(report.errors)} warm-up steps failed")
+        if options["max_ms"] is not None and report.total_ms > options["max_ms"]:
+            raise CommandError(f"Warm-up took {report.total_ms:.0f} ms, more than {options['max_ms']:.0f} ms")
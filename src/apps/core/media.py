@@ -0,0 +1,195 @@
+"""
+Serving of uploaded media files.
+
+Replaces ``django.views.static.serve`` for ``/media/``. File metadata (size,
+mtime, ETag, content type) comes from an in-memory index instead of a stat per
+request, conditional requests are answered with 304, single byte ranges are
+supported, and the body is either handed to the front-end server through an
+``X-Accel-Redirect``/``X-Sendfile`` header or sent with ``FileResponse`` so the
+WSGI server can use ``sendfile``.
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+from .timing import measure
+
+# Content-addressed names like ``logo.3f2a9c0d41b7.png`` or ``ab/cd/<sha256>.svg`` never change.
+HASHED_NAME_RE = re.compile(r"(?:^|[/._-])[0-9a-f]{12,64}\.[A-Za-z0-9]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+@dataclass(frozen=True)
+class MediaFile:
+    path: str
+    size: int
+    mtime: int
+    etag: str
+    content_type: str
+    checked_at: float
+
+
+class MediaIndex:
+    """Path to ``MediaFile`` lookup for everything below ``MEDIA_ROOT``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._root = None
+        self._files = {}
+
+    def _stat(self, fullpath):
+        try:
+            stat = os.stat(fullpath)
+        except OSError:
+            return None
+        if not os.path.isfile(fullpath):
+            return None
+        content_type, encoding = mimetypes.guess_type(fullpath)
+        if encoding:
+            content_type = "application/octet-stream"
+        return MediaFile(
+            path=fullpath,
+            size=stat.st_size,
+            mtime=int(stat.st_mtime),
+            etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+            content_type=content_type or "application/octet-stream",
+            checked_at=time.monotonic(),
+        )
+
+    def build(self, root):
+        """Index every file below ``root``."""
+        files = {}
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                fullpath = os.path.join(dirpath, filename)
+                relative_path = os.path.relpath(fullpath, root).replace(os.sep, "/")
+                entry = self._stat(fullpath)
+                if entry is not None:
+                    files[relative_path] = entry
+        with self._lock:
+            self._root = root
+            self._files = files
+
+    def lookup(self, path):
+        root = str(settings.MEDIA_ROOT)
+        if self._root != root:
+            self.build(root)
+        entry = self._files.get(path)
+        if entry is None or time.monotonic() - entry.checked_at > settings.MEDIA_INDEX_TTL:
+            # New uploads and files changed behind our back are picked up with a single stat.
+            entry = self._stat(safe_join(root, path))
+            with self._lock:
+                if entry is None:
+                    self._files.pop(path, None)
+                else:
+                    self._files[path] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._root = None
+            self._files = {}
+
+
+media_index = MediaIndex()
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range. Return ``(start, end)`` with an inclusive end,
+    ``None`` to serve the whole file, or raise ``ValueError`` if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, entry):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/"')):
+        return if_range == entry.etag
+    return parse_http_date_safe(if_range) == entry.mtime
+
+
+def serve_media(request, path):
+    """Serve a file below ``MEDIA_ROOT``."""
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        with measure("media"):
+            entry = media_index.lookup(path)
+    except SuspiciousFileOperation as exc:
+        raise Http404("Invalid media path") from exc
+    if entry is None:
+        raise Http404(f"“{path}” does not exist")
+
+    response = HttpResponse(content_type=entry.content_type)
+    response["ETag"] = entry.etag
+    response["Last-Modified"] = http_date(entry.mtime)
+    response["Accept-Ranges"] = "bytes"
+    if HASHED_NAME_RE.search(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    if entry.content_type == "image/svg+xml":
+        # Uploaded SVGs may contain scripts, never let them run in our origin.
+        response["Content-Security-Policy"] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+
+    not_modified = get_conditional_response(request, etag=entry.etag, last_modified=entry.mtime, response=response)
+    if not_modified is not response:
+        return not_modified
+
+    if settings.MEDIA_SENDFILE_HEADER:
+        # The front-end server reads the file and handles ranges itself.
+        if settings.MEDIA_SENDFILE_HEADER.lower() == "x-sendfile":
+            response[settings.MEDIA_SENDFILE_HEADER] = entry.path
+        else:
+            response[settings.MEDIA_SENDFILE_HEADER] = settings.MEDIA_SENDFILE_PREFIX + path
+        return response
+
+    range_header = request.headers.get("Range")
+    if range_header and if_range_matches(request, entry):
+        try:
+            byte_range = parse_range(range_header, entry.size)
+        except ValueError:
+            response.status_code = 416
+            response["Content-Range"] = f"bytes */{entry.size}"
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            with measure("media"), open(entry.path, "rb") as f:
+                f.seek(start)
+                response.content = f.read(end - start + 1)
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{entry.size}"
+            return response
+
+    file_response = FileResponse(open(entry.path, "rb"), content_type=entry.content_type)
+    for header, value in response.items():
+        if header.lower() not in ("content-length", "content-type"):
+            file_response[header] = value
+    return file_response
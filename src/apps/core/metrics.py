@@ -0,0 +1,283 @@
+"""
+Prometheus metrics aggregated across granian workers.
+
+Every worker process counts into its own memory-mapped file
+``METRICS_DIR/metrics-<pid>.db``, like the multiprocess mode of
+``prometheus_client``: no lock is shared between processes, a thread lock only
+serialises the threads of one worker. ``/metrics`` reads all files, sums the
+samples and renders the Prometheus text format. Counters of workers that have
+exited stay in the sum, so they never go backwards while the service runs; the
+systemd unit clears the directory on start.
+
+A file is an 8 byte header with the number of bytes in use, followed by
+entries of a 4 byte key length, the UTF-8 key padded to 8 bytes and a double.
+New entries are written before the header is updated, so readers never see a
+half-written entry.
+
+Request metrics are recorded by ``ServerTimingMiddleware`` from the same
+per-request ``Timings`` that feed the ``Server-Timing`` header.
+
+The endpoint is not public: it answers staff users and scrapers that send
+``Authorization: Bearer <METRICS_TOKEN>``.
+"""
+
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+
+HEADER = struct.Struct("<Q")
+KEY_LENGTH = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+INITIAL_SIZE = 64 * 1024
+FILE_PREFIX = "metrics-"
+FILE_SUFFIX = ".db"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAMILIES = {
+    # name: (type, help)
+    "homelab_http_requests_total": ("counter", "HTTP responses by view and status code."),
+    "homelab_http_request_duration_seconds": ("histogram", "Time from the first middleware to the response."),
+    "homelab_db_queries_total": ("counter", "SQL queries by view."),
+    "homelab_db_query_seconds_total": ("counter", "Time spent in SQL queries by view."),
+    "homelab_cache_requests_total": ("counter", "Page, sprite and icon cache lookups by cache and result."),
+    "homelab_worker_resident_memory_bytes": ("gauge", "Resident memory of each running worker process."),
+    "homelab_event_clients_dropped_total": ("counter", "Event stream clients disconnected for falling behind."),
+}
+
+
+def entry_size(key_length):
+    # The key is padded so the value that follows is 8 byte aligned.
+    return KEY_LENGTH.size + key_length + (-(KEY_LENGTH.size + key_length) % 8) + VALUE.size
+
+
+def read_entries(data):
+    """Yield ``(key, value, value_offset)`` from the contents of a counter file."""
+    if len(data) < HEADER.size:
+        return
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    offset = HEADER.size
+    while offset + KEY_LENGTH.size <= used:
+        (length,) = KEY_LENGTH.unpack_from(data, offset)
+        size = entry_size(length)
+        if offset + size > used:
+            break
+        key = bytes(data[offset + KEY_LENGTH.size : offset + KEY_LENGTH.size + length]).decode()
+        value_offset = offset + size - VALUE.size
+        yield key, VALUE.unpack_from(data, value_offset)[0], value_offset
+        offset += size
+
+
+class CounterFile:
+    """A map of sample keys to doubles in a memory-mapped file that only this process writes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")  # noqa: SIM115 - kept open for the life of the process
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            self._file.truncate(INITIAL_SIZE)
+        self._map()
+        self._used = HEADER.unpack_from(self._mm, 0)[0] or HEADER.size
+        self._offsets = {key: offset for key, _value, offset in read_entries(self._mm)}
+
+    def _map(self):
+        self._mm = mmap.mmap(self._file.fileno(), os.fstat(self._file.fileno()).st_size)
+
+    def _append(self, key):
+        encoded = key.encode()
+        size = entry_size(len(encoded))
+        if self._used + size > len(self._mm):
+            capacity = len(self._mm)
+            while self._used + size > capacity:
+                capacity *= 2
+            self._mm.close()
+            self._file.truncate(capacity)
+            self._map()
+        KEY_LENGTH.pack_into(self._mm, self._used, len(encoded))
+        self._mm[self._used + KEY_LENGTH.size : self._used + KEY_LENGTH.size + len(encoded)] = encoded
+        offset = self._used + size - VALUE.size
+        VALUE.pack_into(self._mm, offset, 0.0)
+        self._used += size
+        HEADER.pack_into(self._mm, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def add(self, key, amount):
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            VALUE.pack_into(self._mm, offset, VALUE.unpack_from(self._mm, offset)[0] + amount)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+_counter_file = None
+_counter_file_lock = threading.Lock()
+
+
+def counter_file():
+    """The counter file of this process, reopened after a fork or when ``METRICS_DIR`` changes."""
+    global _counter_file
+    path = os.path.join(settings.METRICS_DIR, f"{FILE_PREFIX}{os.getpid()}{FILE_SUFFIX}")
+    current = _counter_file
+    if current is None or current.path != path:
+        with _counter_file_lock:
+            if _counter_file is None or _counter_file.path != path:
+                os.makedirs(settings.METRICS_DIR, exist_ok=True)
+                _counter_file = CounterFile(path)
+            current = _counter_file
+    return current
+
+
+def sample_key(name, labels):
+    return json.dumps([name, labels], sort_keys=True, separators=(",", ":"))
+
+
+def inc(name, labels, amount=1.0):
+    if settings.METRICS_ENABLED:
+        counter_file().add(sample_key(name, labels), amount)
+
+
+def observe(name, labels, value):
+    """Add ``value`` to a histogram; buckets are stored per bucket and made cumulative when rendered."""
+    if not settings.METRICS_ENABLED:
+        return
+    counters = counter_file()
+    bucket = next((str(bound) for bound in DURATION_BUCKETS if value <= bound), "+Inf")
+    counters.add(sample_key(f"{name}_bucket", {**labels, "le": bucket}), 1.0)
+    counters.add(sample_key(f"{name}_sum", labels), value)
+    counters.add(sample_key(f"{name}_count", labels), 1.0)
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    if match.namespace == "admin":
+        return "admin"
+    return match.view_name
+
+
+def record_request(request, response, timings, seconds):
+    labels = {"view": view_label(request)}
+    inc("homelab_http_requests_total", {**labels, "method": request.method, "status": str(response.status_code)})
+    observe("homelab_http_request_duration_seconds", labels, seconds)
+    if timings.counts["db"]:
+        inc("homelab_db_queries_total", labels, timings.counts["db"])
+        inc("homelab_db_query_seconds_total", labels, timings.durations["db"])
+
+
+def record_cache(name, hit):
+    # Pages cached per parameter ("home-cards:<cursor>") share one label, so the series stay bounded.
+    cache_name = name.partition(":")[0]
+    inc("homelab_cache_requests_total", {"cache": cache_name, "result": "hit" if hit else "miss"})
+
+
+def collect(directory):
+    """Sum the samples of all counter files in ``directory``, return them and the pids that wrote them."""
+    totals = {}
+    pids = []
+    for path in sorted(Path(directory).glob(f"{FILE_PREFIX}*{FILE_SUFFIX}")):
+        try:
+            data = path.read_bytes()
+            pids.append(int(path.name.removeprefix(FILE_PREFIX).removesuffix(FILE_SUFFIX)))
+        except (OSError, ValueError):
+            continue
+        for key, value, _offset in read_entries(data):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals, pids
+
+
+def resident_memory(pid):
+    """RSS of a running process in bytes, or ``None`` if it is gone or there is no ``/proc``."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_sample(name, labels, value):
+    formatted = ",".join(f'{label}="{escape(labels[label])}"' for label in sorted(labels))
+    value = str(int(value)) if value == int(value) else repr(value)
+    return f"{name}{{{formatted}}} {value}" if formatted else f"{name} {value}"
+
+
+def render(directory):
+    """Prometheus text exposition of the aggregated metrics."""
+    totals, pids = collect(directory)
+    # family -> label set -> sample name -> value
+    families = {family: {} for family in FAMILIES}
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        family = next((family for family in FAMILIES if name.startswith(family)), None)
+        if family is None:
+            continue
+        bucket = labels.pop("le", None)
+        series = families[family].setdefault(json.dumps(labels, sort_keys=True), {})
+        series[(name, bucket)] = value
+    for pid in pids:
+        rss = resident_memory(pid)
+        if rss is not None:
+            labels = json.dumps({"pid": str(pid)})
+            families["homelab_worker_resident_memory_bytes"][labels] = {
+                ("homelab_worker_resident_memory_bytes", None): rss
+            }
+
+    lines = []
+    for family, series in families.items():
+        if not series:
+            continue
+        kind, help_text = FAMILIES[family]
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for labels, values in sorted(series.items()):
+            labels = json.loads(labels)
+            if kind == "histogram":
+                cumulative = 0.0
+                for bound in [*map(str, DURATION_BUCKETS), "+Inf"]:
+                    cumulative += values.get((f"{family}_bucket", bound), 0.0)
+                    lines.append(format_sample(f"{family}_bucket", {**labels, "le": bound}, cumulative))
+                for suffix in ("_sum", "_count"):
+                    lines.append(
+                        format_sample(f"{family}{suffix}", labels, values.get((f"{family}{suffix}", None), 0.0))
+                    )
+            else:
+                lines.append(format_sample(family, labels, values[(family, None)]))
+    return "\n".join(lines) + "\n"
+
+
+def may_scrape(request):
+    """Staff users, or a request with the bearer token of ``METRICS_TOKEN`` if one is configured."""
+    if request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    return (
+        bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+    )
+
+
+@never_cache
+def metrics_view(request):
+    """Prometheus scrape endpoint with the metrics of all workers."""
+    # Behind Traefik every request comes from 127.0.0.1, so the client address cannot be trusted here.
+    if not may_scrape(request):
+        raise PermissionDenied
+    return HttpResponse(render(settings.METRICS_DIR), content_type="text/plain; version=0.0.4; charset=utf-8")
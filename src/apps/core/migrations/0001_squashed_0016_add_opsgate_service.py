@@ -1,9 +1,28 @@
-# Generated by Django 5.2.4 on 2025-08-04 20:43
+# Squashes the initial schema and the data migrations 0002-0016, which created the default services one
+# at a time. The services are now loaded from catalog.toml after migrate, see apps.core.catalog.load_catalog.
 
 from django.db import migrations, models
 
 
 class Migration(migrations.Migration):
+    replaces = [
+        ("core", "0001_initial"),
+        ("core", "0002_add_default_services"),
+        ("core", "0003_add_snappymail_service"),
+        ("core", "0004_add_postfixadmin_service"),
+        ("core", "0005_add_fractal_ipmi_service"),
+        ("core", "0006_add_cms_services"),
+        ("core", "0007_add_qbittorrent_service"),
+        ("core", "0008_add_takahe_service"),
+        ("core", "0009_add_mastodon_service"),
+        ("core", "0010_add_open_webui_service"),
+        ("core", "0011_update_open_webui_service"),
+        ("core", "0012_add_openclaw_service"),
+        ("core", "0013_add_graphyard_and_grafana_services"),
+        ("core", "0014_add_logyard_service"),
+        ("core", "0015_add_archive_service"),
+        ("core", "0016_add_opsgate_service"),
+    ]
 
     initial = True
 
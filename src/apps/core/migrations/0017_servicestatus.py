@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_squashed_0016_add_opsgate_service"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceStatus",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("is_up", models.BooleanField(default=False)),
+                ("status_code", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "latency_ms",
+                    models.FloatField(
+                        blank=True, help_text="Response time of the last probe in milliseconds", null=True
+                    ),
+                ),
+                ("error", models.CharField(blank=True, max_length=200)),
+                ("consecutive_failures", models.PositiveIntegerField(default=0)),
+                ("checked_at", models.DateTimeField()),
+                (
+                    "service",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="status", to="core.service"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Service status",
+                "verbose_name_plural": "Service statuses",
+            },
+        ),
+    ]
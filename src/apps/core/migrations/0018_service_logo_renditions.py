@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0017_servicestatus"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="logo_renditions",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, help_text="Resized logo files, see apps.core.logos"
+            ),
+        ),
+    ]
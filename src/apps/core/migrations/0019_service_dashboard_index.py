@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0018_service_logo_renditions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="service",
+            index=models.Index(fields=["is_active", "order", "name"], name="core_service_dashboard_idx"),
+        ),
+    ]
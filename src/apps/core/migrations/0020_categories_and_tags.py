@@ -0,0 +1,74 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0019_service_dashboard_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("slug", models.SlugField(max_length=100, unique=True)),
+                (
+                    "icon",
+                    models.CharField(
+                        blank=True, help_text="Font Awesome icon class shown next to the name", max_length=50
+                    ),
+                ),
+                ("order", models.IntegerField(default=0, help_text="Display order (lower numbers appear first)")),
+                (
+                    "active_service_count",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, help_text="Number of active services, kept up to date by signals"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Category",
+                "verbose_name_plural": "Categories",
+                "ordering": ["order", "name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("slug", models.SlugField(unique=True)),
+            ],
+            options={
+                "verbose_name": "Tag",
+                "verbose_name_plural": "Tags",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="service",
+            name="core_service_dashboard_idx",
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="services",
+                to="core.category",
+            ),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="tags",
+            field=models.ManyToManyField(blank=True, related_name="services", to="core.tag"),
+        ),
+        migrations.AddIndex(
+            model_name="service",
+            index=models.Index(fields=["category", "is_active", "order", "name"], name="core_service_dashboard_idx"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_categories_and_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('loaded_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Catalog state',
+                'verbose_name_plural': 'Catalog states',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+import apps.core.backends.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_catalogstate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='service',
+            name='logo_file',
+            field=models.FileField(blank=True, help_text='Custom logo file (SVG, PNG, etc.)', storage=apps.core.backends.storage.ContentAddressedStorage(), upload_to='services/logos/'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_service_logo_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('samples', models.BinaryField(default=bytes, help_text='Last probe results')),
+                ('minutes', models.BinaryField(default=bytes, help_text='Per-minute latency rollups')),
+                ('hours', models.BinaryField(default=bytes, help_text='Per-hour latency rollups')),
+                ('days', models.BinaryField(default=bytes, help_text='Per-day latency rollups')),
+                ('service', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='core.service')),
+            ],
+            options={
+                'verbose_name': 'Service history',
+                'verbose_name_plural': 'Service histories',
+            },
+        ),
+    ]
@@ -1,4 +1,54 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+
+from .backends.storage import ContentAddressedStorage
+
+
+class Category(models.Model):
+    """A section of the dashboard grouping related services."""
+
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True)
+    icon = models.CharField(max_length=50, blank=True, help_text="Font Awesome icon class shown next to the name")
+    order = models.IntegerField(default=0, help_text="Display order (lower numbers appear first)")
+    active_service_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of active services, kept up to date by signals"
+    )
+
+    class Meta:
+        ordering = ["order", "name"]
+        verbose_name = "Category"
+        verbose_name_plural = "Categories"
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def update_active_service_counts(cls):
+        """Recount the active services of every category in one ``UPDATE``."""
+        active = (
+            Service.objects.filter(category=models.OuterRef("pk"), is_active=True)
+            .order_by()
+            .values("category")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        cls.objects.update(active_service_count=Coalesce(models.Subquery(active), 0))
+
+
+class Tag(models.Model):
+    """A free-form label for services, e.g. "media" or "self-hosted"."""
+
+    name = models.CharField(max_length=50, unique=True)
+    slug = models.SlugField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name = "Tag"
+        verbose_name_plural = "Tags"
+
+    def __str__(self):
+        return self.name
 
 
 class Service(models.Model):
@@ -8,7 +58,17 @@ class Service(models.Model):
     description = models.TextField(blank=True)
     url = models.URLField(blank=True)
     icon = models.CharField(max_length=50, blank=True, help_text="Font Awesome icon class (fallback if no logo)")
-    logo_file = models.FileField(upload_to="services/logos/", blank=True, help_text="Custom logo file (SVG, PNG, etc.)")
+    logo_file = models.FileField(
+        upload_to="services/logos/",
+        storage=ContentAddressedStorage(),
+        blank=True,
+        help_text="Custom logo file (SVG, PNG, etc.)",
+    )
+    logo_renditions = models.JSONField(
+        default=dict, blank=True, editable=False, help_text="Resized logo files, see apps.core.logos"
+    )
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name="services")
+    tags = models.ManyToManyField(Tag, blank=True, related_name="services")
     is_active = models.BooleanField(default=True)
     order = models.IntegerField(default=0, help_text="Display order (lower numbers appear first)")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -16,8 +76,80 @@ class Service(models.Model):
 
     class Meta:
         ordering = ["order", "name"]
+        indexes = [models.Index(fields=["category", "is_active", "order", "name"], name="core_service_dashboard_idx")]
         verbose_name = "Service"
         verbose_name_plural = "Services"
 
     def __str__(self):
         return self.name
+
+    @property
+    def logo_picture(self):
+        """URLs and dimensions for rendering the logo, or ``None`` if renditions are missing or outdated."""
+        renditions = self.logo_renditions
+        if not self.logo_file or not renditions or renditions.get("source") != self.logo_file.name:
+            return None
+        url = self.logo_file.storage.url
+        return {
+            "src": url(renditions["src"]),
+            "width": renditions["width"],
+            "height": renditions["height"],
+            "sources": [
+                {
+                    "type": source["type"],
+                    "srcset": ", ".join(f"{url(name)} {descriptor}" for name, descriptor in source["srcset"]),
+                }
+                for source in renditions["sources"]
+            ],
+        }
+
+
+class ServiceStatus(models.Model):
+    """Latest health probe result for a service, written by ``probe_services``."""
+
+    service = models.OneToOneField(Service, on_delete=models.CASCADE, related_name="status")
+    is_up = models.BooleanField(default=False)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency_ms = models.FloatField(null=True, blank=True, help_text="Response time of the last probe in milliseconds")
+    error = models.CharField(max_length=200, blank=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Service status"
+        verbose_name_plural = "Service statuses"
+
+    def __str__(self):
+        return f"{self.service}: {'up' if self.is_up else 'down'}"
+
+
+class ServiceHistory(models.Model):
+    """Probe history of a service as fixed-size binary ring buffers, see ``apps.core.history``."""
+
+    service = models.OneToOneField(Service, on_delete=models.CASCADE, related_name="history")
+    samples = models.BinaryField(default=bytes, help_text="Last probe results")
+    minutes = models.BinaryField(default=bytes, help_text="Per-minute latency rollups")
+    hours = models.BinaryField(default=bytes, help_text="Per-hour latency rollups")
+    days = models.BinaryField(default=bytes, help_text="Per-day latency rollups")
+
+    class Meta:
+        verbose_name = "Service history"
+        verbose_name_plural = "Service histories"
+
+    def __str__(self):
+        return f"History of {self.service}"
+
+
+class CatalogState(models.Model):
+    """Fingerprint of the last catalog loaded by ``load_catalog``, so unchanged catalogs are skipped."""
+
+    name = models.CharField(max_length=100, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Catalog state"
+        verbose_name_plural = "Catalog states"
+
+    def __str__(self):
+        return f"{self.name}: {self.fingerprint[:12]}"
@@ -0,0 +1,152 @@
+"""
+Keyset pagination of the dashboard.
+
+The dashboard is grouped by category. Within a category services are ordered
+by ``(order, name, id)`` and a page starts after the last service of the
+previous one instead of at an ``OFFSET``, so SQLite seeks into the
+``(category, is_active, order, name)`` index and reads one page of rows however
+deep the page is. The position, including the category, is passed around as an
+opaque cursor.
+
+The first page shows the first ``size`` services of every category. Each
+category, and the services without one, gets its own ``LIMIT size + 1`` query
+that reads one page of the index, so the cost does not depend on the size of
+the catalog. A window function over all active services, which is what a
+sliced ``Prefetch`` compiles to, would read every active row, and SQLite does
+not allow ``LIMIT`` in the parts of a ``UNION``. The tags of all groups are
+then fetched in one query.
+
+``first_page``, ``category_page`` and ``services_page`` have async twins with
+an ``a`` prefix for the ASGI views.
+"""
+
+import base64
+import json
+
+from django.db.models import F, Q, Window, aprefetch_related_objects, prefetch_related_objects
+from django.db.models.functions import RowNumber
+
+from .models import Category, Service
+
+ORDERING = ("order", "name", "id")
+UNCATEGORIZED = "Other services"
+
+
+def encode_cursor(service):
+    data = json.dumps([service.category_id, service.order, service.name, service.pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return ``(category_id, order, name, id)`` of a cursor, raise ``ValueError`` if it is malformed."""
+    try:
+        category_id, order, name, pk = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"invalid cursor {cursor!r}") from exc
+    if not (
+        (category_id is None or isinstance(category_id, int))
+        and isinstance(order, int)
+        and isinstance(name, str)
+        and isinstance(pk, int)
+    ):
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return category_id, order, name, pk
+
+
+def active_services():
+    return Service.objects.filter(is_active=True).select_related("status").prefetch_related("tags").order_by(*ORDERING)
+
+
+def category_services(category):
+    """Active services of ``category`` (unsaved for those without one), their tags are fetched for all groups."""
+    return Service.objects.filter(is_active=True, category=category.pk).select_related("status").order_by(*ORDERING)
+
+
+def services_after(cursor):
+    """Active services of the cursor's category that come after it in ``ORDERING``."""
+    category_id, order, name, pk = decode_cursor(cursor)
+    # The order__gte bound lets SQLite start the index scan at the cursor, the rest breaks ties.
+    return active_services().filter(
+        Q(order__gt=order) | Q(order=order, name__gt=name) | Q(order=order, name=name, pk__gt=pk),
+        category_id=category_id,
+        order__gte=order,
+    )
+
+
+def services_page(queryset, size):
+    """Return the first ``size`` services of ``queryset`` and the cursor of the next page, or ``None``."""
+    services = list(queryset[: size + 1])
+    return page_of(services, size)
+
+
+async def aservices_page(queryset, size):
+    services = [service async for service in queryset[: size + 1]]
+    return page_of(services, size)
+
+
+def page_of(services, size):
+    next_cursor = encode_cursor(services[size - 1]) if len(services) > size else None
+    return services[:size], next_cursor
+
+
+def first_page_categories():
+    # The denormalized count skips categories without active services before querying their services.
+    return Category.objects.filter(active_service_count__gt=0)
+
+
+def first_page(size):
+    """
+    Categories with active services, each with its first ``size`` services in
+    ``page_services`` and the cursor of the rest in ``next_cursor``. Services
+    without a category follow in an unsaved ``Category``.
+    """
+    groups = []
+    for category in [*first_page_categories(), Category(name=UNCATEGORIZED)]:
+        category.page_services, category.next_cursor = services_page(category_services(category), size)
+        if category.page_services:
+            groups.append(category)
+    prefetch_related_objects([service for group in groups for service in group.page_services], "tags")
+    return groups
+
+
+async def afirst_page(size):
+    groups = []
+    for category in [category async for category in first_page_categories()] + [Category(name=UNCATEGORIZED)]:
+        category.page_services, category.next_cursor = await aservices_page(category_services(category), size)
+        if category.page_services:
+            groups.append(category)
+    await aprefetch_related_objects([service for group in groups for service in group.page_services], "tags")
+    return groups
+
+
+def category_page(cursor, size):
+    """The category of ``cursor`` with the ``size`` services after it, like the groups of ``first_page``."""
+    category_id = decode_cursor(cursor)[0]
+    if category_id is None:
+        category = Category(name=UNCATEGORIZED)
+    else:
+        try:
+            category = Category.objects.get(pk=category_id)
+        except Category.DoesNotExist as exc:
+            raise ValueError(f"invalid cursor {cursor!r}") from exc
+    category.page_services, category.next_cursor = services_page(services_after(cursor), size)
+    return category
+
+
+async def acategory_page(cursor, size):
+    category_id = decode_cursor(cursor)[0]
+    if category_id is None:
+        category = Category(name=UNCATEGORIZED)
+    else:
+        try:
+            category = await Category.objects.aget(pk=category_id)
+        except Category.DoesNotExist as exc:
+            raise ValueError(f"invalid cursor {cursor!r}") from exc
+    category.page_services, category.next_cursor = await aservices_page(services_after(cursor), size)
+    return category
+
+
+def first_page_services(size):
+    """Active services of the first page, ``first_page`` without the grouping."""
+    position = Window(RowNumber(), partition_by=F("category"), order_by=[F(field).asc() for field in ORDERING])
+    return Service.objects.filter(is_active=True).annotate(position=position).filter(position__lte=size)
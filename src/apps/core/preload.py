@@ -0,0 +1,97 @@
+"""
+Preload hints for the dashboard.
+
+The browser only discovers the stylesheets and logos of the dashboard while it
+parses the HTML. ``HomeView`` therefore sends them in ``Link: rel=preload``
+headers, so the fetches start as soon as the headers arrive:
+
+- ``core/css/style.css`` unless its critical CSS is inlined completely,
+- the Font Awesome subset,
+- the logo sprite,
+- the raster logos of the first ``EAGER_LOGOS`` cards, which are loaded eagerly.
+
+Raster logos are ``<picture>`` elements, so only their first source is
+preloaded, with its ``type`` and ``imagesrcset``: browsers that do not support
+the type skip the hint instead of fetching a file the page will not use.
+
+The header is computed once per services version and cached like the pages.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from .caching import get_services_version, page_cache_key
+from .icons import get_icon_stylesheet
+from .metrics import record_cache
+from .models import Category
+from .pagination import active_services
+from .sprites import get_logo_sprite
+from .staticfiles import load_critical_css
+from .timing import measure
+
+PRELOAD_PAGE_NAME = "preload-links"
+# Logos on the first page that the browser loads right away, the rest use loading="lazy".
+EAGER_LOGOS = 6
+STYLESHEET = "core/css/style.css"
+
+
+def link(url, destination, **attributes):
+    parts = [f"<{url}>", "rel=preload", f"as={destination}"]
+    parts.extend(f'{name}="{value}"' for name, value in attributes.items())
+    return "; ".join(parts)
+
+
+def logo_link(service, sprite_symbols):
+    """Preload link for the logo of ``service``, or ``None`` if it has none or it is in the sprite."""
+    if not service.logo_file or service.pk in sprite_symbols:
+        return None
+    picture = service.logo_picture
+    if picture is None:
+        return link(service.logo_file.url, "image")
+    if picture["sources"]:
+        source = picture["sources"][0]
+        return link(source["srcset"].split()[0], "image", type=source["type"], imagesrcset=source["srcset"])
+    return link(picture["src"], "image")
+
+
+def eager_services():
+    """The services whose logos the dashboard loads eagerly, the start of its first group."""
+    services = active_services().prefetch_related(None).select_related(None)
+    category = Category.objects.filter(active_service_count__gt=0).first()
+    if category is not None:
+        first_group = list(services.filter(category=category)[:EAGER_LOGOS])
+        if first_group:
+            return first_group
+    return list(services.filter(category=None)[:EAGER_LOGOS])
+
+
+def build_preload_links():
+    links = []
+    critical = load_critical_css(STYLESHEET)
+    if critical is None or not critical.complete:
+        links.append(link(static(STYLESHEET), "style"))
+    links.append(link(get_icon_stylesheet()["url"], "style"))
+    sprite = get_logo_sprite()
+    symbols = {}
+    if sprite is not None:
+        links.append(link(sprite["url"], "image"))
+        symbols = sprite["symbols"]
+    for service in eager_services():
+        logo = logo_link(service, symbols)
+        if logo is not None:
+            links.append(logo)
+    return ", ".join(links)
+
+
+def get_preload_links():
+    """The ``Link`` header for the current services version."""
+    key = page_cache_key(PRELOAD_PAGE_NAME, get_services_version())
+    with measure("cache"):
+        header = cache.get(key)
+    record_cache(PRELOAD_PAGE_NAME, header is not None)
+    if header is None:
+        header = build_preload_links()
+        with measure("cache"):
+            cache.set(key, header, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return header
@@ -0,0 +1,242 @@
+"""
+Asynchronous health probes for service URLs.
+
+A single ``Prober`` checks all services concurrently. Connections are kept
+alive and pooled per host, every probe has its own timeout, and hosts that keep
+failing are retried with jittered exponential backoff instead of every round.
+"""
+
+import asyncio
+import logging
+import random
+import ssl
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("homelab.probes")
+
+USER_AGENT = "homelab-probe/1.0"
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a single probe."""
+
+    service_id: int
+    is_up: bool
+    status_code: int | None = None
+    latency_ms: float | None = None
+    error: str = ""
+
+
+@dataclass
+class Backoff:
+    """Failure bookkeeping for one service."""
+
+    failures: int = 0
+    next_attempt: float = 0.0
+
+
+class ProbeError(Exception):
+    """Raised when a probe does not get a usable HTTP response."""
+
+
+class Connection:
+    """A kept-alive HTTP/1.1 connection to one host."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @property
+    def closed(self):
+        return self.writer.is_closing() or self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Idle keep-alive connections, keyed by (scheme, host, port)."""
+
+    def __init__(self, max_idle_per_host=4, verify_tls=True):
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl.create_default_context()
+        if not verify_tls:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._idle: dict[tuple[str, str, int], list[Connection]] = {}
+
+    async def acquire(self, key):
+        """Return ``(connection, reused)`` for the given host key."""
+        idle = self._idle.get(key, [])
+        while idle:
+            conn = idle.pop()
+            if not conn.closed:
+                return conn, True
+            conn.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self.ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+        )
+        return Connection(reader, writer), False
+
+    def release(self, key, conn, keep_alive=True):
+        idle = self._idle.setdefault(key, [])
+        if keep_alive and not conn.closed and len(idle) < self.max_idle_per_host:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    async def aclose(self):
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
+
+
+def split_url(url):
+    """Split a service URL into the pool key and the request target."""
+    try:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ProbeError(f"unsupported URL: {url!r}")
+        # Labels longer than 63 characters or empty ones ("a..b") fail the IDNA encoding.
+        host = parts.hostname.encode("idna").decode("ascii")
+        # A port that is not a number or above 65535 raises ValueError.
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except (UnicodeError, ValueError) as exc:
+        raise ProbeError(f"invalid URL: {url!r}") from exc
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+    return (parts.scheme, host, port), target
+
+
+async def read_response_head(reader):
+    """Read the status line and headers, returning ``(status, headers)``."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ProbeError("connection closed before response")
+    try:
+        _version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        status_code = int(status)
+    except ValueError as exc:
+        raise ProbeError(f"malformed status line: {status_line!r}") from exc
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status_code, headers
+
+
+class Prober:
+    """Probe many service URLs concurrently over pooled connections."""
+
+    def __init__(
+        self,
+        concurrency=32,
+        timeout=2.0,
+        backoff_base=5.0,
+        backoff_cap=300.0,
+        verify_tls=True,
+    ):
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool = ConnectionPool(verify_tls=verify_tls)
+        self.backoff: dict[int, Backoff] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def backoff_delay(self, failures):
+        """Exponential delay with equal jitter for the given failure count."""
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (failures - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def is_due(self, service_id, now=None):
+        state = self.backoff.get(service_id)
+        return state is None or state.next_attempt <= (now if now is not None else time.monotonic())
+
+    def record(self, result):
+        if result.is_up:
+            self.backoff.pop(result.service_id, None)
+            return
+        state = self.backoff.setdefault(result.service_id, Backoff())
+        state.failures += 1
+        state.next_attempt = time.monotonic() + self.backoff_delay(state.failures)
+
+    async def _request(self, key, target):
+        conn, reused = await self.pool.acquire(key)
+        _scheme, host, port = key
+        host_header = host if port in (80, 443) else f"{host}:{port}"
+        request = (
+            f"HEAD {target} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        try:
+            conn.writer.write(request.encode("ascii"))
+            await conn.writer.drain()
+            status_code, headers = await read_response_head(conn.reader)
+        except (ConnectionError, asyncio.IncompleteReadError, ProbeError):
+            conn.close()
+            if reused:
+                # The server dropped an idle keep-alive connection, retry once on a fresh one.
+                return await self._request(key, target)
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        # HEAD responses carry no body, so the connection is reusable unless the server says otherwise.
+        keep_alive = headers.get("connection", "").lower() != "close"
+        self.pool.release(key, conn, keep_alive=keep_alive)
+        return status_code
+
+    async def probe(self, service_id, url):
+        """Probe one URL. Any response below 500 counts as up."""
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                key, target = split_url(url)
+                async with asyncio.timeout(self.timeout):
+                    status_code = await self._request(key, target)
+            except TimeoutError:
+                result = ProbeResult(service_id, False, error=f"timeout after {self.timeout:g}s")
+            except (OSError, EOFError, ProbeError) as exc:
+                result = ProbeResult(service_id, False, error=str(exc)[:200] or exc.__class__.__name__)
+            else:
+                latency_ms = (time.perf_counter() - started) * 1000
+                result = ProbeResult(service_id, status_code < 500, status_code, round(latency_ms, 1))
+                if not result.is_up:
+                    result.error = f"HTTP {status_code}"
+        self.record(result)
+        return result
+
+    async def run_round(self, targets):
+        """Probe all due ``(service_id, url)`` targets at once."""
+        now = time.monotonic()
+        due = [(service_id, url) for service_id, url in targets if self.is_due(service_id, now)]
+        results = await asyncio.gather(
+            *(self.probe(service_id, url) for service_id, url in due), return_exceptions=True
+        )
+        for index, ((service_id, _url), result) in enumerate(zip(due, results, strict=True)):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                # An unexpected error of one probe must not cost the results of the others.
+                logger.error("Probing service %s failed", service_id, exc_info=result)
+                results[index] = ProbeResult(service_id, False, error=repr(result)[:200])
+                self.record(results[index])
+        return results
+
+    async def aclose(self):
+        await self.pool.aclose()
@@ -0,0 +1,92 @@
+"""
+Offline support: web app manifest and service worker.
+
+The caching logic is the static ``core/js/service-worker.js``. The browser
+installs ``/sw.js`` instead, which is generated per services version: it sets
+``self.HOMELAB`` to the version and the URLs to precache (the dashboard shell,
+stylesheets, scripts, the logo sprite and the raster logos of the first page),
+then imports the static worker. Any change to a ``Service`` or a deploy that
+changes a hashed static URL changes the bytes of ``/sw.js``, so the browser
+installs the new worker, which fills a cache named after the new version and
+drops the old ones.
+
+The worker serves the precached and static files cache first and the
+dashboard, the card batches and the services API stale-while-revalidate, so a
+repeat visit renders from the local cache without waiting for the network and
+the dashboard keeps working while the server is unreachable.
+
+With ``SERVICE_WORKER = False`` the dashboard does not register the worker and
+``/sw.js`` is a worker that deletes its caches and unregisters itself, so
+turning it off also cleans up browsers that installed it before.
+"""
+
+import json
+
+from django.conf import settings
+from django.templatetags.static import static
+from django.urls import reverse
+
+from .icons import get_icon_stylesheet
+from .pagination import first_page_services
+from .search import get_search_index
+from .sprites import get_logo_sprite
+
+SERVICE_WORKER_PAGE_NAME = "service-worker"
+STATIC_ASSETS = [
+    "core/css/style.css",
+    "core/js/services.js",
+    "core/js/search.js",
+    "core/js/pwa.js",
+    "core/js/events.js",
+    "core/manifest.webmanifest",
+    "core/icons/homelab.svg",
+]
+# Same-origin paths served stale-while-revalidate, everything else goes to the network first.
+REVALIDATED_PATHS = ["core:home", "core:service-cards", "core:api-services"]
+
+UNREGISTER_SCRIPT = """// Service worker disabled (SERVICE_WORKER = False): remove the caches and the worker.
+self.addEventListener("install", function () { self.skipWaiting(); });
+self.addEventListener("activate", function (event) {
+    event.waitUntil(caches.keys().then(function (names) {
+        return Promise.all(names.map(function (name) { return caches.delete(name); }));
+    }).then(function () { return self.registration.unregister(); }));
+});
+"""
+
+
+def logo_urls(services):
+    """URLs of the raster renditions of ``services``; SVG logos are in the sprite."""
+    urls = []
+    for service in services:
+        picture = service.logo_picture
+        if picture is None or picture["src"].endswith(".svg"):
+            continue
+        urls.append(picture["src"])
+        for source in picture["sources"]:
+            urls.extend(candidate.split()[0] for candidate in source["srcset"].split(", "))
+    return urls
+
+
+def precache_urls():
+    """Everything the dashboard needs to render offline, for the current services version."""
+    urls = [reverse("core:home"), *(static(name) for name in STATIC_ASSETS), get_icon_stylesheet()["url"]]
+    sprite = get_logo_sprite()
+    if sprite is not None:
+        urls.append(sprite["url"])
+    index = get_search_index()
+    if index is not None:
+        urls.append(index["url"])
+    services = first_page_services(settings.DASHBOARD_PAGE_SIZE).only("logo_file", "logo_renditions")
+    urls.extend(logo_urls(services))
+    return list(dict.fromkeys(urls))
+
+
+def service_worker_script(version):
+    config = {
+        "version": str(version),
+        "precache": precache_urls(),
+        "revalidate": [reverse(name) for name in REVALIDATED_PATHS],
+        "static": settings.STATIC_URL,
+    }
+    worker = static("core/js/service-worker.js")
+    return f"self.HOMELAB = {json.dumps(config)};\nimportScripts({json.dumps(worker)});\n"
@@ -0,0 +1,222 @@
+"""
+Full-text search over services.
+
+On SQLite the services are mirrored into the FTS5 table ``core_service_fts``
+with the service id as ``rowid`` and the columns ``name``, ``description``,
+``tags`` and ``category``. ``create_search_table`` creates it after
+``migrate`` together with triggers on the service, tag and category tables, so
+every write, including ``bulk_create`` and ``QuerySet.update``, keeps it in
+sync without a signal. The table has prefix indexes for 2 to 4 characters,
+which makes the type-ahead queries of ``search_services`` (the last word of
+the query as a prefix, ranked with ``bm25``) index lookups; at 100,000
+services they take a few milliseconds, see ``benchmarks/search.py``.
+
+On other databases ``search_services`` falls back to ``icontains``.
+
+For small catalogs ``get_search_index`` also builds a compact JSON index of
+the active services that the dashboard downloads once to filter as you type
+without a request per keystroke.
+"""
+
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections
+from django.db.models import Q
+from django.http import HttpResponse
+from django.urls import reverse
+
+from .caching import build_entry, get_services_version, page_cache_key
+from .metrics import record_cache
+from .models import Service
+from .pagination import ORDERING
+from .timing import measure
+
+logger = logging.getLogger("homelab.search")
+
+TABLE = "core_service_fts"
+SEARCH_INDEX_PAGE_NAME = "search-index"
+RESULTS_LIMIT = 20
+CANDIDATES = 200
+# bm25 weights of the name, description, tags and category columns
+WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+WORD_RE = re.compile(r"\w+")
+
+TAGS_SQL = """(
+    SELECT coalesce(group_concat(t.name, ' '), '') FROM core_service_tags st
+    JOIN core_tag t ON t.id = st.tag_id WHERE st.service_id = {service}
+)"""
+CATEGORY_SQL = "coalesce((SELECT name FROM core_category WHERE id = {category}), '')"
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+        name, description, tags, category, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_insert AFTER INSERT ON core_service BEGIN
+        INSERT INTO {TABLE} (rowid, name, description, tags, category)
+        VALUES (NEW.id, NEW.name, NEW.description, '', {CATEGORY_SQL.format(category="NEW.category_id")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_update AFTER UPDATE OF name, description, category_id ON core_service
+    BEGIN
+        UPDATE {TABLE} SET name = NEW.name, description = NEW.description,
+            category = {CATEGORY_SQL.format(category="NEW.category_id")}
+        WHERE rowid = NEW.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_delete AFTER DELETE ON core_service BEGIN
+        DELETE FROM {TABLE} WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_tag_insert AFTER INSERT ON core_service_tags BEGIN
+        UPDATE {TABLE} SET tags = {TAGS_SQL.format(service="NEW.service_id")} WHERE rowid = NEW.service_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_tag_delete AFTER DELETE ON core_service_tags BEGIN
+        UPDATE {TABLE} SET tags = {TAGS_SQL.format(service="OLD.service_id")} WHERE rowid = OLD.service_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_tag_rename AFTER UPDATE OF name ON core_tag BEGIN
+        UPDATE {TABLE} SET tags = {TAGS_SQL.format(service=f"{TABLE}.rowid")}
+        WHERE rowid IN (SELECT service_id FROM core_service_tags WHERE tag_id = NEW.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_category_rename AFTER UPDATE OF name ON core_category BEGIN
+        UPDATE {TABLE} SET category = NEW.name
+        WHERE rowid IN (SELECT id FROM core_service WHERE category_id = NEW.id);
+    END""",
+]
+# Ids of the services matching one ``match_expression`` parameter
+MATCHING_IDS_SQL = f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s"
+REBUILD = [
+    f"DELETE FROM {TABLE}",
+    f"""INSERT INTO {TABLE} (rowid, name, description, tags, category)
+    SELECT s.id, s.name, s.description, {TAGS_SQL.format(service="s.id")},
+        {CATEGORY_SQL.format(category="s.category_id")}
+    FROM core_service s""",
+]
+
+
+def uses_fts(conn=connection):
+    return conn.vendor == "sqlite"
+
+
+def create_search_table(using="default", **kwargs):
+    """``post_migrate`` receiver that creates the search table and triggers, and fills a new table."""
+    conn = connections[using]
+    if not uses_fts(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABLE])
+        exists = cursor.fetchone() is not None
+        try:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+        except DatabaseError as exc:
+            logger.warning("Full-text search is not available, SQLite lacks FTS5: %s", exc)
+            return
+        if not exists:
+            for statement in REBUILD:
+                cursor.execute(statement)
+
+
+def rebuild_search_table():
+    """Refill the search table from the service tables."""
+    with connection.cursor() as cursor:
+        for statement in REBUILD:
+            cursor.execute(statement)
+
+
+def match_expression(query):
+    """
+    FTS5 query for type-ahead: every word of ``query`` must match, the last one
+    as a prefix because it may still be typed. ``None`` if it has no words.
+    """
+    words = WORD_RE.findall(query.lower())
+    if not words:
+        return None
+    # Only word characters are left, so quoting cannot break out of the string.
+    return " ".join([*(f'"{word}"' for word in words[:-1]), f'"{words[-1]}"*'])
+
+
+def search_services(query, limit=RESULTS_LIMIT):
+    """Active services matching ``query`` as dicts, the best matches first."""
+    match = match_expression(query)
+    if match is None:
+        return []
+    if not uses_fts():
+        services = Service.objects.filter(is_active=True).select_related("category")
+        for word in WORD_RE.findall(query):
+            services = services.filter(Q(name__icontains=word) | Q(description__icontains=word))
+        return [service_result(s.name, s.url, s.description, s.category and s.category.name) for s in services[:limit]]
+
+    # Ranking every match of a common word costs a bm25 call per row, so only the first CANDIDATES
+    # matches in the name and the first CANDIDATES matches anywhere are ranked, name matches first.
+    weights = ", ".join(str(weight) for weight in WEIGHTS)
+    sql = f"""
+        SELECT s.name, s.url, s.description, c.name FROM (
+            SELECT * FROM (
+                SELECT rowid AS id, 0 AS tier, bm25({TABLE}, {weights}) AS score
+                FROM {TABLE} WHERE {TABLE} MATCH %s LIMIT %s
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT rowid, 1, bm25({TABLE}, {weights}) FROM {TABLE} WHERE {TABLE} MATCH %s LIMIT %s
+            )
+        ) m
+        JOIN core_service s ON s.id = m.id
+        LEFT JOIN core_category c ON c.id = s.category_id
+        WHERE s.is_active
+        GROUP BY s.id
+        ORDER BY min(m.tier), min(m.score), s."order", s.name
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [f"name : ({match})", CANDIDATES, match, CANDIDATES, limit])
+        return [service_result(*row) for row in cursor.fetchall()]
+
+
+def service_result(name, url, description, category):
+    return {"name": name, "url": url, "description": description, "category": category or ""}
+
+
+def build_search_index():
+    """The active services as ``{"fields": [...], "services": [[name, url, category, tags], ...]}``."""
+    services = Service.objects.filter(is_active=True).order_by("category__order", "category__name", *ORDERING)
+    tags = {}
+    for service_id, tag in Service.tags.through.objects.filter(service__is_active=True).values_list(
+        "service_id", "tag__name"
+    ):
+        tags.setdefault(service_id, []).append(tag)
+    rows = [
+        [name, url, category or "", " ".join(sorted(tags.get(pk, [])))]
+        for pk, name, url, category in services.values_list("pk", "name", "url", "category__name")
+    ]
+    return {"fields": ["name", "url", "category", "tags"], "services": rows}
+
+
+def get_search_index():
+    """
+    The type-ahead index for the current services version as a dict with a
+    precompressed cache ``entry`` and its ``url``, or ``None`` if there are more
+    than ``SEARCH_INDEX_MAX_SERVICES`` active services or the index is larger
+    than the cache can store.
+    """
+    key = page_cache_key(SEARCH_INDEX_PAGE_NAME, get_services_version())
+    with measure("cache"):
+        index = cache.get(key)
+    record_cache(SEARCH_INDEX_PAGE_NAME, index is not None)
+    if index is None:
+        if Service.objects.filter(is_active=True).count() > settings.SEARCH_INDEX_MAX_SERVICES:
+            index = {}
+        else:
+            content = json.dumps(build_search_index(), ensure_ascii=False, separators=(",", ":"))
+            entry = build_entry(HttpResponse(content, content_type="application/json"), last_modified=None)
+            digest = entry["etag"].strip('"')[:12]
+            index = {"entry": entry, "url": reverse("core:search-index", args=[digest])}
+        with measure("cache"):
+            cache.set(key, index, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+            stored = not index or cache.has_key(key)
+            if not stored:
+                # An index the cache refuses would be rebuilt on every request, the dashboard searches
+                # with /search/ instead until the services version changes.
+                logger.warning("Search index of %d bytes does not fit into the cache", len(entry["identity"]))
+                index = {}
+                cache.set(key, index, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return index or None
@@ -0,0 +1,27 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_services_version
+from .media import media_index
+from .models import Category, Service, Tag
+
+
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver(m2m_changed, sender=Service.tags.through)
+def invalidate_services_cache(sender, **kwargs):
+    """Bump the services version so cached pages are re-rendered."""
+    bump_services_version()
+
+
+@receiver([post_save, post_delete], sender=Service)
+def update_category_counts(sender, **kwargs):
+    """A service may have moved between categories or been (de)activated, so recount all of them."""
+    Category.update_active_service_counts()
+
+
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_media_index(sender, **kwargs):
+    """Logo uploads and deletions change the media directory."""
+    media_index.clear()
@@ -0,0 +1,122 @@
+"""
+SVG sprite for service logos.
+
+The sanitized SVG renditions of the services on the first dashboard page (see
+``apps.core.logos`` and ``apps.core.pagination``) are combined into one
+document of ``<symbol>`` elements that the dashboard references with
+``<use href>``; cards loaded while scrolling use the logo files, so the sprite
+stays small however large the catalog is. Identical logos share a symbol and ids inside
+each logo are prefixed so gradients and clip paths of different logos cannot
+collide. The sprite is cached per services version, so saving a ``Service``
+rebuilds it, and it is served under its content hash as an immutable file.
+"""
+
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+
+from .caching import build_entry, get_services_version, page_cache_key
+from .logos import SVG_NS, XLINK_NS, svg_dimensions
+from .metrics import record_cache
+from .pagination import first_page_services
+from .timing import measure
+
+SPRITE_PAGE_NAME = "logo-sprite"
+# Attributes of the root <svg> that make no sense on a <symbol>.
+ROOT_ONLY_ATTRIBUTES = {"width", "height", "x", "y", "id", "version", "viewBox", "baseProfile"}
+URL_REFERENCE_RE = re.compile(r"url\(\s*['\"]?#([^'\")\s]+)['\"]?\s*\)")
+
+
+def svg_rendition(service):
+    """Storage name of the sanitized SVG rendition of ``service``, if it has an up-to-date one."""
+    renditions = service.logo_renditions or {}
+    if not service.logo_file or renditions.get("source") != service.logo_file.name:
+        return None
+    src = renditions.get("src", "")
+    return src if src.endswith(".svg") else None
+
+
+def symbol_from_svg(data, symbol_id):
+    """Turn a sanitized SVG document into a ``<symbol>`` with ids prefixed by ``symbol_id``."""
+    root = ET.fromstring(data)
+    width, height = svg_dimensions(root)
+    symbol = ET.Element(f"{{{SVG_NS}}}symbol", id=symbol_id, viewBox=root.get("viewBox") or f"0 0 {width} {height}")
+    for name, value in root.attrib.items():
+        if name not in ROOT_ONLY_ATTRIBUTES:
+            symbol.set(name, value)
+    symbol.extend(list(root))
+
+    ids = {element.get("id") for element in symbol.iter() if element.get("id")} - {symbol_id}
+    if not ids:
+        return symbol
+
+    def prefix_url(match):
+        return f"url(#{symbol_id}-{match.group(1)})" if match.group(1) in ids else match.group(0)
+
+    for element in symbol.iter():
+        if element is symbol:
+            continue
+        for name, value in list(element.attrib.items()):
+            if name == "id" and value in ids:
+                element.set(name, f"{symbol_id}-{value}")
+            elif name in ("href", f"{{{XLINK_NS}}}href") and value[1:] in ids and value.startswith("#"):
+                element.set(name, f"#{symbol_id}-{value[1:]}")
+            elif "url(" in value:
+                element.set(name, URL_REFERENCE_RE.sub(prefix_url, value))
+        if element.tag == f"{{{SVG_NS}}}style" and element.text:
+            element.text = URL_REFERENCE_RE.sub(prefix_url, element.text)
+    return symbol
+
+
+def build_sprite(services):
+    """Return ``(svg_bytes, {service_pk: symbol_id})`` for all services with an SVG rendition."""
+    sprite = ET.Element(f"{{{SVG_NS}}}svg")
+    symbols = {}
+    seen = set()
+    for service in services:
+        name = svg_rendition(service)
+        if name is None:
+            continue
+        try:
+            with service.logo_file.storage.open(name, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        symbol_id = f"logo-{hashlib.sha256(data).hexdigest()[:12]}"
+        if symbol_id not in seen:
+            try:
+                sprite.append(symbol_from_svg(data, symbol_id))
+            except ET.ParseError:
+                continue
+            seen.add(symbol_id)
+        symbols[service.pk] = symbol_id
+    return ET.tostring(sprite, encoding="utf-8"), symbols
+
+
+def get_logo_sprite():
+    """
+    The sprite for the current services version as a dict with a precompressed
+    cache ``entry``, the ``symbols`` per service and its ``url``, or ``None`` if
+    no service on the first page has an SVG logo.
+    """
+    key = page_cache_key(SPRITE_PAGE_NAME, get_services_version())
+    with measure("cache"):
+        sprite = cache.get(key)
+    record_cache(SPRITE_PAGE_NAME, sprite is not None)
+    if sprite is None:
+        services = first_page_services(settings.DASHBOARD_PAGE_SIZE).only("logo_file", "logo_renditions")
+        content, symbols = build_sprite(services)
+        if symbols:
+            entry = build_entry(HttpResponse(content, content_type="image/svg+xml"), last_modified=None)
+            digest = entry["etag"].strip('"')[:12]
+            sprite = {"entry": entry, "symbols": symbols, "url": reverse("core:logo-sprite", args=[digest])}
+        else:
+            sprite = {}
+        with measure("cache"):
+            cache.set(key, sprite, timeout=settings.HOME_PAGE_CACHE_TIMEOUT)
+    return sprite or None
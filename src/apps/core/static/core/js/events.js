@@ -0,0 +1,56 @@
+// Keep the dashboard current while it stays open (see apps.core.events): status
+// events update the cards in place, only a new services version (a changed
+// service, category or tag) reloads the page once.
+(function () {
+    "use strict";
+
+    var script = document.currentScript;
+    if (!("EventSource" in window) || !script) {
+        return;
+    }
+    var version = script.dataset.version;
+    var reloadKey = "homelab:reloaded-for";
+
+    function checkVersion(current) {
+        current = String(current);
+        // A cached page may still be the old version, never reload twice for the same one.
+        if (current === version || sessionStorage.getItem(reloadKey) === current) {
+            return;
+        }
+        sessionStorage.setItem(reloadKey, current);
+        window.location.reload();
+    }
+
+    function showStatus(status) {
+        var card = document.querySelector('.service-card[data-service="' + status.id + '"]');
+        if (!card) {
+            return;
+        }
+        var badge = card.querySelector(".service-status");
+        if (!badge) {
+            badge = document.createElement("span");
+            card.querySelector(".service-name").after(badge);
+        }
+        badge.className = "service-status " + (status.up ? "service-status-up" : "service-status-down");
+        if (status.up) {
+            badge.title = "HTTP " + status.code;
+            badge.textContent = status.latency === null ? "Up" : "Up · " + Math.round(status.latency) + " ms";
+        } else {
+            badge.title = status.error;
+            badge.textContent = "Down";
+        }
+    }
+
+    var source = new EventSource(script.dataset.stream);
+    source.addEventListener("snapshot", function (event) {
+        var data = JSON.parse(event.data);
+        data.statuses.forEach(showStatus);
+        checkVersion(data.version);
+    });
+    source.addEventListener("status", function (event) {
+        JSON.parse(event.data).forEach(showStatus);
+    });
+    source.addEventListener("services", function (event) {
+        checkVersion(JSON.parse(event.data).version);
+    });
+})();
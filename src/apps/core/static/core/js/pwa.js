@@ -0,0 +1,32 @@
+// Register the service worker (see apps.core.pwa) so the dashboard also opens
+// from the local cache and while the server is unreachable.
+(function () {
+    "use strict";
+
+    var script = document.currentScript;
+    if (!("serviceWorker" in navigator) || !script) {
+        return;
+    }
+    var hadController = Boolean(navigator.serviceWorker.controller);
+
+    navigator.serviceWorker.addEventListener("message", function (event) {
+        // The worker showed the shared dashboard, but the server now answers with a personal one.
+        if (event.data && event.data.type === "homelab:reload") {
+            window.location.reload();
+        }
+    });
+    navigator.serviceWorker.addEventListener("controllerchange", function () {
+        // A new services version was installed; pages served by the old worker reload once.
+        if (hadController) {
+            hadController = false;
+            window.location.reload();
+        }
+    });
+
+    window.addEventListener("load", function () {
+        navigator.serviceWorker.register(script.dataset.worker, { scope: "/", updateViaCache: "none" })
+            .catch(function () {
+                // Without a worker the dashboard works as before, only not offline.
+            });
+    });
+})();
@@ -0,0 +1,134 @@
+// Type-ahead search above the dashboard. Small catalogs come with a JSON index
+// (data-index) that is downloaded on first focus and filtered in the browser;
+// otherwise every pause in typing asks the /search/ endpoint (data-endpoint).
+(function () {
+    "use strict";
+
+    var box = document.querySelector(".service-search");
+    if (!box || !window.fetch) {
+        return;
+    }
+    var input = box.querySelector(".service-search-input");
+    var list = box.querySelector(".service-search-results");
+    var LIMIT = 20;
+    var index = null;
+    var pending = null;
+    var timer = null;
+    var latest = "";
+
+    function words(text) {
+        return text.toLowerCase().split(/[^\p{L}\p{N}_]+/u).filter(Boolean);
+    }
+
+    function loadIndex() {
+        if (!pending) {
+            pending = fetch(box.dataset.index)
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error("HTTP " + response.status);
+                    }
+                    return response.json();
+                })
+                .then(function (data) {
+                    index = data.services.map(function (row) {
+                        return {
+                            result: { name: row[0], url: row[1], category: row[2] },
+                            name: words(row[0]),
+                            other: words(row[2] + " " + row[3]),
+                        };
+                    });
+                })
+                .catch(function () {
+                    // Fall back to the endpoint.
+                    delete box.dataset.index;
+                });
+        }
+        return pending;
+    }
+
+    function hasPrefix(list, word) {
+        return list.some(function (candidate) {
+            return candidate.lastIndexOf(word, 0) === 0;
+        });
+    }
+
+    // Every word of the query has to start a word of the service, name matches rank first.
+    function filterIndex(query) {
+        var queryWords = words(query);
+        var matches = [];
+        index.forEach(function (entry, position) {
+            var inName = 0;
+            for (var i = 0; i < queryWords.length; i++) {
+                if (hasPrefix(entry.name, queryWords[i])) {
+                    inName++;
+                } else if (!hasPrefix(entry.other, queryWords[i])) {
+                    return;
+                }
+            }
+            matches.push({ entry: entry, inName: inName, position: position });
+        });
+        matches.sort(function (a, b) {
+            return b.inName - a.inName || a.position - b.position;
+        });
+        return matches.slice(0, LIMIT).map(function (match) {
+            return match.entry.result;
+        });
+    }
+
+    function show(results) {
+        list.replaceChildren();
+        results.forEach(function (result) {
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = result.url || "#";
+            link.textContent = result.name;
+            item.appendChild(link);
+            if (result.category) {
+                var category = document.createElement("span");
+                category.className = "service-search-category";
+                category.textContent = result.category;
+                item.appendChild(category);
+            }
+            list.appendChild(item);
+        });
+    }
+
+    function search(query) {
+        latest = query;
+        if (!words(query).length) {
+            show([]);
+            return;
+        }
+        if (box.dataset.index) {
+            loadIndex().then(function () {
+                if (query === latest) {
+                    index ? show(filterIndex(query)) : search(query);
+                }
+            });
+            return;
+        }
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            fetch(box.dataset.endpoint + "?q=" + encodeURIComponent(query))
+                .then(function (response) {
+                    return response.json();
+                })
+                .then(function (data) {
+                    if (query === latest) {
+                        show(data.results);
+                    }
+                })
+                .catch(function () {});
+        }, 100);
+    }
+
+    box.hidden = false;
+    input.addEventListener("focus", function () {
+        if (box.dataset.index) {
+            loadIndex();
+        }
+    });
+    input.addEventListener("input", function () {
+        search(input.value);
+    });
+})();
@@ -0,0 +1,148 @@
+// Offline cache for the dashboard, imported by /sw.js after it set self.HOMELAB
+// (see apps.core.pwa): { version, precache: [urls], revalidate: [paths], static: prefix }.
+(function () {
+    "use strict";
+
+    var config = self.HOMELAB;
+    var CACHE = "homelab-" + config.version;
+    var PREFIX = "homelab-";
+    // Stored while the dashboard answers with no-store (a logged-in user), see revalidate().
+    var PRIVATE_MARKER = new URL("/?sw-private", self.location).href;
+    var precached = new Set(config.precache.map(function (url) {
+        return new URL(url, self.location).href;
+    }));
+
+    self.addEventListener("install", function (event) {
+        event.waitUntil(caches.open(CACHE).then(function (cache) {
+            return Promise.all(config.precache.map(function (url) {
+                // Hashed files of the previous version are reused instead of downloaded again.
+                return caches.match(url).then(function (cached) {
+                    var isPage = config.revalidate.indexOf(new URL(url, self.location).pathname) !== -1;
+                    if (cached && !isPage) {
+                        return cache.put(url, cached);
+                    }
+                    return fetch(url, { cache: "no-cache" }).then(function (response) {
+                        if (storable(response)) {
+                            return cache.put(url, response);
+                        }
+                    });
+                }).catch(function () {
+                    // A file that cannot be fetched now is cached on first use instead of failing the install.
+                });
+            }));
+        }).then(function () {
+            return self.skipWaiting();
+        }));
+    });
+
+    self.addEventListener("activate", function (event) {
+        event.waitUntil(caches.keys().then(function (names) {
+            return Promise.all(names.filter(function (name) {
+                return name.indexOf(PREFIX) === 0 && name !== CACHE;
+            }).map(function (name) {
+                return caches.delete(name);
+            }));
+        }).then(function () {
+            return self.clients.claim();
+        }));
+    });
+
+    function storable(response) {
+        return response.ok && response.type === "basic" &&
+            !/no-store/.test(response.headers.get("Cache-Control") || "");
+    }
+
+    function cacheFirst(request) {
+        return caches.open(CACHE).then(function (cache) {
+            return cache.match(request).then(function (cached) {
+                return cached || fetch(request).then(function (response) {
+                    if (storable(response)) {
+                        cache.put(request, response.clone());
+                    }
+                    return response;
+                });
+            });
+        });
+    }
+
+    function revalidate(cache, request, clientId, servedFromCache) {
+        return fetch(request).then(function (response) {
+            if (storable(response)) {
+                cache.put(request, response.clone());
+                if (request.mode === "navigate") {
+                    cache.delete(PRIVATE_MARKER);
+                }
+            } else if (response.ok && request.mode === "navigate") {
+                // A personal page: go to the network first from now on and reload the shared copy just shown.
+                cache.put(PRIVATE_MARKER, new Response(""));
+                if (servedFromCache) {
+                    self.clients.get(clientId).then(function (client) {
+                        if (client) {
+                            client.postMessage({ type: "homelab:reload" });
+                        }
+                    });
+                }
+            }
+            return response;
+        });
+    }
+
+    function staleWhileRevalidate(event) {
+        var request = event.request;
+        return caches.open(CACHE).then(function (cache) {
+            return Promise.all([cache.match(request), cache.match(PRIVATE_MARKER)]).then(function (found) {
+                var cached = found[0];
+                var clientId = event.resultingClientId || event.clientId;
+                if (cached && !(found[1] && request.mode === "navigate")) {
+                    event.waitUntil(revalidate(cache, request, clientId, true).catch(function () {}));
+                    return cached;
+                }
+                return revalidate(cache, request, clientId, false).catch(function (error) {
+                    if (cached) {
+                        return cached;
+                    }
+                    throw error;
+                });
+            });
+        });
+    }
+
+    function networkFirst(request) {
+        return fetch(request).catch(function (error) {
+            return caches.match(request).then(function (cached) {
+                if (cached) {
+                    return cached;
+                }
+                if (request.mode === "navigate") {
+                    // Offline: any page falls back to the dashboard.
+                    return caches.match(config.revalidate[0]).then(function (page) {
+                        if (page) {
+                            return page;
+                        }
+                        throw error;
+                    });
+                }
+                throw error;
+            });
+        });
+    }
+
+    self.addEventListener("fetch", function (event) {
+        var request = event.request;
+        var url = new URL(request.url);
+        if (request.method !== "GET" || url.origin !== self.location.origin) {
+            return;
+        }
+        if (request.headers.get("Accept") === "text/event-stream") {
+            // Live event streams never end, they go straight to the network.
+            return;
+        }
+        if (config.revalidate.indexOf(url.pathname) !== -1) {
+            event.respondWith(staleWhileRevalidate(event));
+        } else if (precached.has(url.href) || url.pathname.indexOf(config.static) === 0) {
+            event.respondWith(cacheFirst(request));
+        } else {
+            event.respondWith(networkFirst(request));
+        }
+    });
+})();
@@ -0,0 +1,43 @@
+// Replace the "Show more services" link with the next page of cards shortly
+// before it scrolls into view. Without JavaScript the link opens the next page.
+(function () {
+    "use strict";
+
+    if (!("IntersectionObserver" in window)) {
+        return;
+    }
+
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                load(entry.target);
+            }
+        });
+    }, { rootMargin: "600px 0px" });
+
+    function load(link) {
+        observer.unobserve(link);
+        fetch(link.dataset.cards, { credentials: "same-origin" })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error("HTTP " + response.status);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                var cards = document.createRange().createContextualFragment(html);
+                var next = cards.querySelector(".services-more");
+                link.replaceWith(cards);
+                if (next) {
+                    observer.observe(next);
+                }
+            })
+            .catch(function () {
+                // Leave the link in place, clicking it still loads the next page.
+            });
+    }
+
+    document.querySelectorAll(".services-more[data-cards]").forEach(function (link) {
+        observer.observe(link);
+    });
+})();
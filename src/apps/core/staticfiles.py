@@ -0,0 +1,247 @@
+"""
+Static asset build pipeline for ``collectstatic``.
+
+``StaticBuildStorage`` extends WhiteNoise's manifest storage, which adds the
+content hash to file names and precompresses them with gzip and brotli, by:
+
+- minifying CSS before it is hashed,
+- extracting the rules needed to render the templates in ``critical_css`` into
+  ``<name>.critical.css``, which ``{% critical_css %}`` inlines into the page,
+- remembering the content hash of every minified and compressed file in
+  ``staticbuild.json`` so a deploy only minifies and compresses what changed.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger("homelab.staticfiles")
+
+# Strings, comments and unquoted url() values, which the minifier must not touch
+CSS_TOKEN_RE = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/|\burl\((?!\s*["'])[^)]*\))""", re.DOTALL | re.IGNORECASE
+)
+CSS_SPACE_AROUND_RE = re.compile(r"\s*([{};,>])\s*")
+CSS_SPACE_AFTER_COLON_RE = re.compile(r":\s+")
+CLASS_ATTRIBUTE_RE = re.compile(r"""\bclass\s*=\s*(["'])(.*?)\1""", re.DOTALL)
+ID_ATTRIBUTE_RE = re.compile(r"""\bid\s*=\s*(["'])(.*?)\1""", re.DOTALL)
+TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+TEMPLATE_TAG_RE = re.compile(r"\{%.*?%\}", re.DOTALL)
+TEMPLATE_VARIABLE_RE = re.compile(r"\{\{.*?\}\}", re.DOTALL)
+SELECTOR_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+SELECTOR_ID_RE = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+SELECTOR_TAG_RE = re.compile(r"(?:^|[\s>+~(])([a-zA-Z][a-zA-Z0-9-]*)")
+SELECTOR_NOISE_RE = re.compile(r"\[[^\]]*\]|::?[\w-]+(?:\([^)]*\))?")
+KEYFRAMES_RE = re.compile(r"@(?:-[a-z]+-)?keyframes\s+(\S+)")
+ANIMATION_RE = re.compile(r"(?:^|[;{])animation(?:-name)?:([^;}]*)")
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def minify_css(css):
+    """Remove comments and whitespace; strings, ``url()`` and ``/*! ... */`` license comments are kept."""
+    parts = []
+    code = ""
+
+    def flush():
+        # The last ";" of a block is only dropped in code, never inside a string or url().
+        parts.append(code.replace(";}", "}"))
+        return ""
+
+    for index, token in enumerate(CSS_TOKEN_RE.split(css)):
+        if index % 2:
+            if token.startswith("/*") and not token.startswith("/*!"):
+                # Code around a removed comment is joined, ".a{color:red;/* x */}" still loses its ";".
+                continue
+            code = flush()
+            parts.append(token)
+        else:
+            token = " ".join(token.split())
+            token = CSS_SPACE_AROUND_RE.sub(r"\1", token)
+            code += CSS_SPACE_AFTER_COLON_RE.sub(":", token)
+    flush()
+    return "".join(parts).strip()
+
+
+def split_rules(css):
+    """Split minified CSS into ``(prelude, body)`` pairs at the top level."""
+    rules = []
+    depth = 0
+    start = 0
+    prelude = ""
+    for index, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                prelude = css[start:index].strip()
+                start = index + 1
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:index]))
+                start = index + 1
+    return rules
+
+
+class TemplateVocabulary:
+    """The classes, ids and tags that appear in a set of templates."""
+
+    def __init__(self, sources):
+        self.classes = set()
+        self.class_prefixes = set()
+        self.ids = set()
+        self.tags = {"html", "body"}
+        for source in sources:
+            for _quote, value in CLASS_ATTRIBUTE_RE.findall(source):
+                value = TEMPLATE_VARIABLE_RE.sub("{}", TEMPLATE_TAG_RE.sub(" ", value))
+                for token in value.split():
+                    if "{}" in token:
+                        # e.g. "service-status-{{ state }}", any class with this prefix may be rendered
+                        self.class_prefixes.add(token.split("{}", 1)[0])
+                    else:
+                        self.classes.add(token)
+            self.ids.update(value.strip() for _quote, value in ID_ATTRIBUTE_RE.findall(source))
+            self.tags.update(tag.lower() for tag in TAG_RE.findall(source))
+
+    def has_class(self, name):
+        return name in self.classes or any(prefix and name.startswith(prefix) for prefix in self.class_prefixes)
+
+    def matches(self, selector):
+        selector = SELECTOR_NOISE_RE.sub("", selector)
+        return (
+            all(self.has_class(name) for name in SELECTOR_CLASS_RE.findall(selector))
+            and all(name in self.ids for name in SELECTOR_ID_RE.findall(selector))
+            and all(name.lower() in self.tags for name in SELECTOR_TAG_RE.findall(selector))
+        )
+
+
+def extract_critical_css(css, sources):
+    """Return the rules of ``css`` that can apply to markup in the template ``sources``."""
+    vocabulary = TemplateVocabulary(sources)
+    keyframes = {}
+
+    def extract(block):
+        kept = []
+        for prelude, body in split_rules(block):
+            if prelude.startswith(("@media", "@supports")):
+                inner = extract(body)
+                if inner:
+                    kept.append(f"{prelude}{{{inner}}}")
+            elif match := KEYFRAMES_RE.match(prelude):
+                keyframes.setdefault(match.group(1), []).append(f"{prelude}{{{body}}}")
+            elif prelude.startswith("@"):
+                continue
+            elif any(vocabulary.matches(selector) for selector in prelude.split(",")):
+                kept.append(f"{prelude}{{{body}}}")
+        return "".join(kept)
+
+    critical = extract(minify_css(css))
+    # An inlined rule that starts an animation needs its @keyframes, whatever the selectors matched.
+    used = {name for value in ANIMATION_RE.findall(critical) for name in re.split(r"[\s,]+", value)}
+    return critical + "".join(rule for name in sorted(used & keyframes.keys()) for rule in keyframes[name])
+
+
+def critical_name(name):
+    root, extension = os.path.splitext(name)
+    return f"{root}.critical{extension}"
+
+
+class StaticBuildStorage(CompressedManifestStaticFilesStorage):
+    build_cache_name = "staticbuild.json"
+    # Stylesheet -> templates whose markup is rendered above the fold
+    critical_css = {"core/css/style.css": ["base.html", "core/home.html", "core/service_cards.html"]}
+
+    def load_build_cache(self):
+        try:
+            with open(self.path(self.build_cache_name), encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        return {"minified": cache.get("minified", {}), "compressed": cache.get("compressed", {})}
+
+    def save_build_cache(self):
+        with open(self.path(self.build_cache_name), "w", encoding="utf-8") as f:
+            json.dump(self.build_cache, f, indent=1, sort_keys=True)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+        self.build_cache = self.load_build_cache()
+        self.minify(paths)
+        self.write_critical_css()
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        self.save_build_cache()
+
+    def minify(self, paths):
+        """Minify the collected CSS files in place and hash the minified copies."""
+        for name in list(paths):
+            if not name.endswith(".css") or name.endswith(".min.css"):
+                continue
+            full_path = self.path(name)
+            if self.build_cache["minified"].get(name) != file_digest(full_path):
+                with open(full_path, encoding="utf-8") as f:
+                    css = minify_css(f.read())
+                with open(full_path, "w", encoding="utf-8") as f:
+                    f.write(css)
+                self.build_cache["minified"][name] = file_digest(full_path)
+            # Read the collected, minified file instead of the original source when hashing.
+            paths[name] = (self, name)
+
+    def write_critical_css(self):
+        for name, templates in self.critical_css.items():
+            if not self.exists(name):
+                continue
+            sources = []
+            for template_name in templates:
+                with open(get_template(template_name).origin.name, encoding="utf-8") as f:
+                    sources.append(f.read())
+            with self.open(name) as f:
+                critical = extract_critical_css(f.read().decode(), sources)
+            with open(self.path(critical_name(name)), "w", encoding="utf-8") as f:
+                f.write(critical)
+            logger.info("Extracted %d bytes of critical CSS from %s", len(critical), name)
+
+    def compress_files(self, paths):
+        """Only compress files whose content changed since the last build."""
+        pending = {}
+        for name in paths:
+            digest = file_digest(self.path(name))
+            if self.build_cache["compressed"].get(name) != digest:
+                pending[name] = digest
+        yield from super().compress_files(pending)
+        self.build_cache["compressed"].update(pending)
+
+
+@dataclass(frozen=True)
+class CriticalCSS:
+    css: str
+    # True if the critical rules are the whole stylesheet, so it does not have to be loaded at all
+    complete: bool
+
+
+@functools.cache
+def load_critical_css(name):
+    """Read the critical CSS written by the last ``collectstatic`` once per process, or return ``None``."""
+    if not isinstance(staticfiles_storage, StaticBuildStorage):
+        return None
+    try:
+        with staticfiles_storage.open(critical_name(name)) as f:
+            critical = f.read().decode()
+        with staticfiles_storage.open(name) as f:
+            stylesheet = f.read().decode()
+    except OSError:
+        return None
+    return CriticalCSS(css=mark_safe(critical), complete=critical == stylesheet)
@@ -0,0 +1,19 @@
+from django import template
+from django.conf import settings
+from django.urls import reverse
+
+from ..staticfiles import load_critical_css
+
+register = template.Library()
+
+
+@register.simple_tag
+def critical_css(name):
+    """Critical CSS of the stylesheet ``name`` from the last static build, or ``None``."""
+    return load_critical_css(name)
+
+
+@register.simple_tag
+def service_worker_url():
+    """URL of the service worker to register, or ``""`` with ``SERVICE_WORKER = False``."""
+    return reverse("core:service-worker") if settings.SERVICE_WORKER else ""
@@ -0,0 +1,11 @@
+from django import template
+
+from ..icons import get_icon_stylesheet
+
+register = template.Library()
+
+
+@register.simple_tag
+def icon_stylesheet_url():
+    """URL of the Font Awesome subset for the current services version."""
+    return get_icon_stylesheet()["url"]
@@ -0,0 +1,171 @@
+"""
+Server-Timing instrumentation.
+
+``ServerTimingMiddleware`` records where each request spends its time and
+sends it as a ``Server-Timing`` header, which browser devtools show in the
+network panel, e.g.::
+
+    Server-Timing: db;dur=3.1;desc="4 queries", template;dur=12.0, cache;dur=0.4, app;dur=1.2, total;dur=16.7
+
+The same numbers are logged as one line on the ``homelab.timing`` logger. The
+phases are recorded by
+
+- ``db``: an ``execute_wrapper`` installed on every new database connection,
+- ``template``: ``apps.core.backends.templates``, which times every template render,
+- ``cache``: ``measure("cache")`` around the page, sprite and icon cache lookups,
+- ``media``: ``measure("media")`` in ``serve_media``.
+
+Phases are exclusive: queries run by lazy querysets while rendering count as
+``db``, not ``template``. ``app`` is the rest of ``total``. With
+``SERVER_TIMING = False`` the header and log line are skipped. The same
+``Timings`` feed the Prometheus metrics in ``apps.core.metrics`` when
+``METRICS_ENABLED`` is set; with both settings off the middleware removes
+itself, no database wrapper is installed and ``measure`` only reads a context
+variable.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+
+logger = logging.getLogger("homelab.timing")
+
+PHASES = ("db", "template", "cache", "media")
+
+_current = contextvars.ContextVar("server_timing", default=None)
+
+
+class Timings:
+    """Time and number of calls per phase for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        # Time spent in nested phases, one entry per phase that is currently running
+        self._nested = []
+
+    def metrics(self):
+        """``(name, milliseconds, count)`` for every phase that ran, then ``app`` and ``total``."""
+        total = (time.perf_counter() - self.started) * 1000
+        metrics = [(phase, self.durations[phase] * 1000, self.counts[phase]) for phase in PHASES if self.counts[phase]]
+        metrics.append(("app", max(total - sum(ms for _phase, ms, _count in metrics), 0.0), None))
+        metrics.append(("total", total, None))
+        return metrics
+
+
+@contextmanager
+def measure(phase):
+    """Add the time spent in the block to ``phase`` of the current request, if one is being timed."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings._nested.append(0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = timings._nested.pop()
+        timings.durations[phase] += elapsed - nested
+        timings.counts[phase] += 1
+        if timings._nested:
+            timings._nested[-1] += elapsed
+
+
+def time_query(execute, sql, params, many, context):
+    with measure("db"):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver that times every query on the new connection."""
+    if time_query not in connection.execute_wrappers:
+        # First, so a surrounding ``connection.execute_wrapper()`` block still pops its own wrapper.
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def format_header(metrics):
+    parts = []
+    for name, ms, count in metrics:
+        part = f"{name};dur={ms:.1f}"
+        if name == "db":
+            part += f';desc="{count} queries"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def enabled():
+    return settings.SERVER_TIMING or settings.METRICS_ENABLED
+
+
+class ServerTimingMiddleware:
+    """Time every request for the ``Server-Timing`` header (``SERVER_TIMING``) and metrics (``METRICS_ENABLED``)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.server_timing = settings.SERVER_TIMING
+        self.metrics = settings.METRICS_ENABLED
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        if self.metrics:
+            metrics.record_request(request, response, timings, time.perf_counter() - timings.started)
+        if self.server_timing:
+            self.add_header(request, response, timings)
+        return response
+
+    def add_header(self, request, response, timings):
+        phases = timings.metrics()
+        header = format_header(phases)
+        if response.has_header("Server-Timing"):
+            header = f"{response['Server-Timing']}, {header}"
+        response["Server-Timing"] = header
+        fields = {}
+        for name, ms, count in phases:
+            fields[f"{name}_ms"] = round(ms, 2)
+            if count is not None:
+                fields[f"{name}_count"] = count
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"server_timing": fields},
+        )
@@ -1,10 +1,42 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import HomeView, connection_info
+from .metrics import metrics_view
+from .views import (
+    AsyncHomeView,
+    AsyncServiceCardsView,
+    HomeView,
+    ServiceCardsView,
+    aconnection_info,
+    connection_info,
+    events,
+    icon_stylesheet,
+    logo_sprite,
+    search,
+    search_index,
+    service_worker,
+    services_api,
+)
 
 app_name = "core"
 
+# The ASGI entry point turns on ASYNC_VIEWS, under WSGI the dashboard stays synchronous and avoids
+# running every request in its own event loop with thread hops for the template and the cache.
+if settings.ASYNC_VIEWS:
+    home_view, cards_view, connection_info_view = AsyncHomeView, AsyncServiceCardsView, aconnection_info
+else:
+    home_view, cards_view, connection_info_view = HomeView, ServiceCardsView, connection_info
+
 urlpatterns = [
-    path("", HomeView.as_view(), name="home"),
-    path("connection-info/", connection_info, name="connection-info"),
+    path("", home_view.as_view(), name="home"),
+    path("services/cards/", cards_view.as_view(), name="service-cards"),
+    path("search/", search, name="search"),
+    path("search/index.<slug:digest>.json", search_index, name="search-index"),
+    path("api/services/", services_api, name="api-services"),
+    path("events/", events, name="events"),
+    path("connection-info/", connection_info_view, name="connection-info"),
+    path("sprites/logos.<slug:digest>.svg", logo_sprite, name="logo-sprite"),
+    path("icons/fontawesome.<slug:digest>.css", icon_stylesheet, name="icon-stylesheet"),
+    path("sw.js", service_worker, name="service-worker"),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -1,24 +1,277 @@
 import ipaddress
 
-from django.shortcuts import render
-from django.views.generic import ListView
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.cache import add_never_cache_headers, get_conditional_response, patch_cache_control
+from django.views import View
 
-from .models import Service
+from .api import astream_services, parse_fields, parse_is_active, services_etag, stream_services
+from .caching import acached_page, aget_services_version, cached_page, get_services_version, response_from_entry
+from .events import broker
+from .history import sparklines
+from .icons import get_icon_stylesheet
+from .pagination import acategory_page, afirst_page, category_page, decode_cursor, first_page
+from .preload import EAGER_LOGOS, get_preload_links
+from .pwa import SERVICE_WORKER_PAGE_NAME, UNREGISTER_SCRIPT, service_worker_script
+from .search import get_search_index, search_services
+from .sprites import get_logo_sprite
 
 
-class HomeView(ListView):
-    """Homepage view showing all active services."""
+class HomeView(View):
+    """
+    Homepage view showing the first page of active services of every category.
+
+    This is the synchronous view for the WSGI entry point; ``AsyncHomeView`` is
+    the same page for ASGI, where it runs on the event loop.
+    """
 
-    model = Service
     template_name = "core/home.html"
-    context_object_name = "services"
 
-    def get_queryset(self):
-        return Service.objects.filter(is_active=True)
+    def get(self, request, *args, **kwargs):
+        # ?after= is the "Show more services" link for browsers without JavaScript, it is not cached.
+        cursor = request.GET.get("after")
+        # Authenticated users get admin links and a CSRF token, so only anonymous pages are shared.
+        if request.user.is_authenticated:
+            response = self.render_page(request, cursor)
+            # Keeps the page with admin links and CSRF token out of shared and service worker caches.
+            add_never_cache_headers(response)
+        elif cursor:
+            response = self.render_page(request, cursor)
+        else:
+            response = cached_page(
+                request,
+                "home",
+                render=lambda: self.render_page(request),
+                status=True,
+            )
+        if not cursor and response.status_code == 200:
+            # The browser starts on the stylesheets and first logos while the HTML is still arriving.
+            response["Link"] = get_preload_links()
+        return response
 
+    def get_context_data(self, cursor=None):
+        size = settings.DASHBOARD_PAGE_SIZE
+        try:
+            groups = [category_page(cursor, size)] if cursor else first_page(size)
+        except ValueError as exc:
+            raise Http404("Invalid cursor") from exc
+        services = [service for group in groups for service in group.page_services]
+        return self.build_context(
+            groups,
+            cursor,
+            search_index=None if cursor else get_search_index(),
+            version=get_services_version() if settings.LIVE_EVENTS else None,
+            lines=sparklines([service.pk for service in services]),
+            sprite=get_logo_sprite(),
+        )
 
-def connection_info(request):
-    """Display connection information for debugging."""
+    def build_context(self, groups, cursor, search_index, version, lines, sprite):
+        # Only logos at the top of the first page are above the fold, later ones are loaded lazily.
+        for index, group in enumerate(groups):
+            group.eager_logos = EAGER_LOGOS if index == 0 and not cursor else 0
+        context = {"groups": groups, "has_more": any(group.next_cursor for group in groups)}
+        if not cursor:
+            # The search box is on the first page only, the type-ahead index only exists for small catalogs.
+            context["search"] = {"index_url": search_index["url"] if search_index else None}
+            if settings.LIVE_EVENTS:
+                context["events"] = {"url": reverse("core:events"), "version": version}
+        services = [service for group in groups for service in group.page_services]
+        for service in services:
+            service.sparkline = lines.get(service.pk)
+        if sprite is not None:
+            context["logo_sprite_url"] = sprite["url"]
+            for service in services:
+                service.logo_symbol = sprite["symbols"].get(service.pk)
+        return context
+
+    def render_page(self, request, cursor=None):
+        return render(request, self.template_name, self.get_context_data(cursor))
+
+
+class AsyncHomeView(HomeView):
+    """``HomeView`` on the async ORM and cache API, used by the ASGI entry point (``ASYNC_VIEWS``)."""
+
+    async def get(self, request, *args, **kwargs):
+        cursor = request.GET.get("after")
+        user = await request.auser()
+        if user.is_authenticated:
+            response = await self.render_page(request, cursor)
+            add_never_cache_headers(response)
+        elif cursor:
+            response = await self.render_page(request, cursor)
+        else:
+            response = await acached_page(
+                request,
+                "home",
+                render=lambda: self.render_page(request),
+                status=True,
+            )
+        if not cursor and response.status_code == 200:
+            response["Link"] = await sync_to_async(get_preload_links)()
+        return response
+
+    async def get_context_data(self, cursor=None):
+        size = settings.DASHBOARD_PAGE_SIZE
+        try:
+            groups = [await acategory_page(cursor, size)] if cursor else await afirst_page(size)
+        except ValueError as exc:
+            raise Http404("Invalid cursor") from exc
+        services = [service for group in groups for service in group.page_services]
+        return self.build_context(
+            groups,
+            cursor,
+            search_index=None if cursor else await sync_to_async(get_search_index)(),
+            version=await aget_services_version() if settings.LIVE_EVENTS else None,
+            lines=await sync_to_async(sparklines)([service.pk for service in services]),
+            sprite=await sync_to_async(get_logo_sprite)(),
+        )
+
+    async def render_page(self, request, cursor=None):
+        context = await self.get_context_data(cursor)
+        # Context processors and template tags (request.user, the icon subset) are still synchronous.
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+def cards_context(context):
+    """The context of the service cards template from that of the dashboard."""
+    group = context["groups"][0]
+    return {
+        "logo_sprite_url": context.get("logo_sprite_url"),
+        "services": group.page_services,
+        "next_cursor": group.next_cursor,
+        "eager_logos": 0,
+    }
+
+
+def cards_cursor(request):
+    cursor = request.GET.get("after", "")
+    try:
+        decode_cursor(cursor)
+    except ValueError as exc:
+        raise Http404("Invalid cursor") from exc
+    return cursor
+
+
+class ServiceCardsView(HomeView):
+    """The service cards after ``?after=``, appended to the dashboard while scrolling."""
+
+    template_name = "core/service_cards.html"
+
+    def get_context_data(self, cursor=None):
+        return cards_context(super().get_context_data(cursor))
+
+    def get(self, request, *args, **kwargs):
+        cursor = cards_cursor(request)
+        # The cards hold nothing user specific, so every user shares the cached batch.
+        return cached_page(
+            request,
+            f"home-cards:{cursor}",
+            render=lambda: self.render_page(request, cursor),
+            status=True,
+        )
+
+
+class AsyncServiceCardsView(AsyncHomeView):
+    """``ServiceCardsView`` for the ASGI entry point."""
+
+    template_name = ServiceCardsView.template_name
+
+    async def get_context_data(self, cursor=None):
+        return cards_context(await super().get_context_data(cursor))
+
+    async def get(self, request, *args, **kwargs):
+        cursor = cards_cursor(request)
+        return await acached_page(
+            request,
+            f"home-cards:{cursor}",
+            render=lambda: self.render_page(request, cursor),
+            status=True,
+        )
+
+
+def logo_sprite(request, digest):
+    """Serve the SVG logo sprite; outdated digests redirect to the current one."""
+    sprite = get_logo_sprite()
+    if sprite is None:
+        raise Http404("No SVG logos")
+    if not sprite["entry"]["etag"].startswith(f'"{digest}'):
+        return redirect(sprite["url"])
+    return response_from_entry(request, sprite["entry"], immutable=True)
+
+
+async def search(request):
+    """Active services matching ``?q=`` as JSON, best matches first."""
+    query = request.GET.get("q", "")[:200]
+    results = await sync_to_async(search_services)(query)
+    return JsonResponse({"query": query, "results": results})
+
+
+def search_index(request, digest):
+    """Serve the type-ahead index; outdated digests redirect to the current one."""
+    index = get_search_index()
+    if index is None:
+        raise Http404("Too many services for a search index")
+    if not index["entry"]["etag"].startswith(f'"{digest}'):
+        return redirect(index["url"])
+    return response_from_entry(request, index["entry"], immutable=True)
+
+
+def services_api(request):
+    """Services as JSON for other tools, see ``apps.core.api``."""
+    try:
+        fields = parse_fields(request.GET.get("fields", ""))
+        is_active = parse_is_active(request.GET.get("is_active"))
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    etag = services_etag(fields, is_active)
+    # The generator runs no query until the body is sent, so a 304 costs none.
+    stream = astream_services if isinstance(request, ASGIRequest) else stream_services
+    response = StreamingHttpResponse(stream(fields, is_active), content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+async def events(request):
+    """Server-Sent Events with live status and services changes, see ``apps.core.events``."""
+    if not settings.LIVE_EVENTS or not isinstance(request, ASGIRequest):
+        # A WSGI worker thread would be held for as long as the dashboard stays open; 204 stops EventSource.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        broker.stream(request.headers.get("Last-Event-ID")), content_type="text/event-stream"
+    )
+    add_never_cache_headers(response)
+    # Tells nginx-style proxies to pass every event on at once.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def service_worker(request):
+    """The service worker for the current services version, at the root so it controls every page."""
+    if not settings.SERVICE_WORKER:
+        response = HttpResponse(UNREGISTER_SCRIPT, content_type="text/javascript")
+        add_never_cache_headers(response)
+        return response
+    return cached_page(
+        request,
+        SERVICE_WORKER_PAGE_NAME,
+        render=lambda: HttpResponse(service_worker_script(get_services_version()), content_type="text/javascript"),
+    )
+
+
+def icon_stylesheet(request, digest):
+    """Serve the Font Awesome subset; outdated digests redirect to the current one, which may be the static file."""
+    stylesheet = get_icon_stylesheet()
+    if stylesheet["entry"] is None or not stylesheet["entry"]["etag"].startswith(f'"{digest}'):
+        return redirect(stylesheet["url"])
+    return response_from_entry(request, stylesheet["entry"], immutable=True)
+
+
+def connection_context(request):
     # Get client IP
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
     if x_forwarded_for:
@@ -40,7 +293,7 @@ def connection_info(request):
     except ValueError:
         pass
 
-    context = {
+    return {
         "client_ip": client_ip,
         "is_tailscale": is_tailscale,
         "is_local": is_local,
@@ -50,4 +303,12 @@ def connection_info(request):
         "forwarded_for": x_forwarded_for,
     }
 
-    return render(request, "core/connection_info.html", context)
+
+def connection_info(request):
+    """Display connection information for debugging."""
+    return render(request, "core/connection_info.html", connection_context(request))
+
+
+async def aconnection_info(request):
+    """``connection_info`` for the ASGI entry point."""
+    return await sync_to_async(render)(request, "core/connection_info.html", connection_context(request))
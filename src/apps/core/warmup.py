@@ -0,0 +1,137 @@
+"""
+Worker warm-up.
+
+The first request served by a fresh granian worker used to pay for importing
+the URLconfs and admin modules, compiling templates, connecting to SQLite and
+filling the dashboard cache. ``warmup`` does all of this right after the WSGI
+application is created, so that cost moves to startup, and logs how long each
+step took. A boot slower than ``WARMUP_SLOW_MS`` is logged as a warning.
+
+Django's database connections belong to the thread that opened them, and
+warm-up runs on the thread that imports the application, not on the threads
+that serve requests. The ``database`` step therefore only warms what the
+process shares: the database driver and the database file in the OS page
+cache. Each request thread still opens its own connection on its first
+request, and the warm-up closes the connections it used when it is done so
+they do not stay open on the import thread.
+"""
+
+import io
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger("homelab.warmup")
+
+TEMPLATES = ["base.html", "core/home.html", "core/connection_info.html"]
+DASHBOARD_PATHS = ["/"]
+
+
+@dataclass
+class WarmupReport:
+    timings: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def total_ms(self):
+        return sum(self.timings.values())
+
+    def __str__(self):
+        steps = ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.timings.items())
+        return f"{self.total_ms:.1f}ms ({steps})"
+
+
+def warm_urls():
+    """Import every URLconf (including the admin's) and build the reverse lookup tables."""
+    pending = [get_resolver()]
+    while pending:
+        resolver = pending.pop()
+        resolver.reverse_dict  # noqa: B018 - populates the resolver
+        pending.extend(pattern for pattern in resolver.url_patterns if isinstance(pattern, URLResolver))
+
+
+def warm_templates():
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def warm_database():
+    """Connect and read the schema, which loads the driver and the start of the database file."""
+    for alias in connections:
+        connection = connections[alias]
+        with connection.cursor():
+            connection.introspection.table_names()
+
+
+def warmup_host():
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip(".")
+        if host and "*" not in host:
+            return host
+    return "localhost"
+
+
+def get(application, path):
+    """Call the WSGI ``application`` like the server would and return the status line."""
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "SERVER_NAME": warmup_host(),
+        "SERVER_PORT": "443",
+        "HTTP_HOST": warmup_host(),
+        "HTTP_X_FORWARDED_PROTO": "https",
+        "HTTP_ACCEPT_ENCODING": "br, gzip",
+        "wsgi.url_scheme": "https",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": io.StringIO(),
+    }
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b"".join(response)
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    return statuses[0]
+
+
+def warm_dashboard(application):
+    """Send the dashboard requests through the full middleware stack to fill the page cache."""
+    for path in DASHBOARD_PATHS:
+        status = get(application, path)
+        if not status.startswith("200"):
+            raise RuntimeError(f"GET {path} returned {status}")
+
+
+def warmup(application=None):
+    """Run all warm-up steps; failures are logged and never stop the worker from starting."""
+    application = application or WSGIHandler()
+    steps = [
+        ("urls", warm_urls),
+        ("templates", warm_templates),
+        ("database", warm_database),
+        ("dashboard", lambda: warm_dashboard(application)),
+    ]
+    report = WarmupReport()
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:
+            logger.exception("Warm-up step %s failed", name)
+            report.errors[name] = str(exc)
+        report.timings[name] = (time.perf_counter() - started) * 1000
+    # The request threads open their own connections.
+    connections.close_all()
+
+    if report.total_ms > settings.WARMUP_SLOW_MS:
+        logger.warning("Slow warm-up: %s", report)
+    else:
+        logger.info("Warm-up finished in %s", report)
+    return report
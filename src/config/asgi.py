@@ -0,0 +1,33 @@
+"""
+ASGI config for homelab project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Run it with ``granian --interface asgi src.config.asgi:application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+# The dashboard views run on the event loop instead of in a thread per request.
+os.environ.setdefault("ASYNC_VIEWS", "True")
+
+from django.conf import settings  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+application = get_asgi_application()
+
+# Runs once per granian worker, before its event loop starts. The warm-up requests go
+# through a WSGI handler, which shares the URLconfs, templates, connection and page cache.
+if settings.WARMUP_ON_STARTUP:
+    from apps.core.warmup import warmup
+
+    warmup()
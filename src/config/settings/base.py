@@ -44,6 +44,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # First, so the total in the Server-Timing header covers all other middleware
+    "apps.core.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -58,7 +60,8 @@ ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend plus render timing for the Server-Timing header
+        "BACKEND": "apps.core.backends.templates.DjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -73,12 +76,36 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
+
+# Route the dashboard to its async views (apps.core.urls), turned on by config.asgi
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 DATABASES = {
     "default": env.db(default="sqlite:///db.sqlite3"),
 }
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Same backend plus the pragma profile below, see apps.core.backends.sqlite3
+    DATABASES["default"]["ENGINE"] = "apps.core.backends.sqlite3"
+    # Take the write lock at BEGIN, so concurrent writers wait for busy_timeout instead of failing
+    DATABASES["default"].setdefault("OPTIONS", {}).setdefault("transaction_mode", "IMMEDIATE")
+# Keep connections open per worker thread (None = forever), checked for health before reuse
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DJANGO_CONN_MAX_AGE", default=None)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Pragmas applied to every new SQLite connection, None leaves SQLite's default
+SQLITE_PRAGMAS = {
+    "journal_mode": env("SQLITE_JOURNAL_MODE", default="WAL"),
+    "synchronous": env("SQLITE_SYNCHRONOUS", default="NORMAL"),
+    # 64 MiB of the database file mapped into memory, shared by all connections of a process
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=64 * 1024 * 1024),
+    # Negative values are KiB: 16 MiB page cache per connection
+    "cache_size": env.int("SQLITE_CACHE_SIZE", default=-16 * 1024),
+    "temp_store": env("SQLITE_TEMP_STORE", default="MEMORY"),
+    "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT", default=5000),
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -116,10 +143,56 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media serving (apps.core.media)
+MEDIA_CACHE_MAX_AGE = env.int("MEDIA_CACHE_MAX_AGE", default=60 * 60)
+MEDIA_INDEX_TTL = env.int("MEDIA_INDEX_TTL", default=60)
+# Offload file transfer to the front-end server, e.g. "X-Accel-Redirect" (nginx) or "X-Sendfile"
+MEDIA_SENDFILE_HEADER = env("MEDIA_SENDFILE_HEADER", default="")
+MEDIA_SENDFILE_PREFIX = env("MEDIA_SENDFILE_PREFIX", default="/protected-media/")
+
+# Font Awesome SVGs for the icon subset, defaults to the fontawesomefree package
+FONTAWESOME_DIR = env("FONTAWESOME_DIR", default="")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Dashboard page cache, entries are keyed on the services version and never served stale
+HOME_PAGE_CACHE_TIMEOUT = env.int("HOME_PAGE_CACHE_TIMEOUT", default=60 * 60 * 24)
+
+# Services on the first dashboard page and in every batch loaded while scrolling (apps.core.pagination)
+DASHBOARD_PAGE_SIZE = env.int("DASHBOARD_PAGE_SIZE", default=24)
+
+# Up to this many active services the dashboard downloads a JSON index for type-ahead search (apps.core.search),
+# as long as the index fits into the cache (about 110 bytes per service, MAX_VALUE_SIZE of the shared cache)
+SEARCH_INDEX_MAX_SERVICES = env.int("SEARCH_INDEX_MAX_SERVICES", default=5000)
+
+# Sync the default services from apps/core/catalog.toml after migrate when the catalog changed (apps.core.catalog)
+CATALOG_AUTOLOAD = env.bool("CATALOG_AUTOLOAD", default=True)
+
+# Live status and services updates over Server-Sent Events (apps.core.events), streams need the ASGI entry point
+LIVE_EVENTS = env.bool("LIVE_EVENTS", default=True)
+EVENTS_POLL_INTERVAL = env.float("EVENTS_POLL_INTERVAL", default=2.0)
+EVENTS_HEARTBEAT = env.float("EVENTS_HEARTBEAT", default=15.0)
+EVENTS_RING_SIZE = env.int("EVENTS_RING_SIZE", default=256)
+EVENTS_CLIENT_BUFFER = env.int("EVENTS_CLIENT_BUFFER", default=32)
+
+# Register the offline service worker on the dashboard (apps.core.pwa); off, /sw.js unregisters installed ones
+SERVICE_WORKER = env.bool("SERVICE_WORKER", default=True)
+
+# Worker warm-up (apps.core.warmup), boots slower than WARMUP_SLOW_MS are logged as warnings
+WARMUP_ON_STARTUP = env.bool("WARMUP_ON_STARTUP", default=True)
+WARMUP_SLOW_MS = env.int("WARMUP_SLOW_MS", default=2000)
+
+# Server-Timing header and per-request timing log line (apps.core.timing)
+SERVER_TIMING = env.bool("SERVER_TIMING", default=True)
+
+# Prometheus metrics at /metrics, every worker process writes its counters to a file in METRICS_DIR
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_DIR = env("METRICS_DIR", default="/tmp/homelab_metrics")
+# Bearer token for scraping /metrics, without one only staff users can read the metrics
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
 # Admin URL
 ADMIN_URL = env("DJANGO_ADMIN_URL", default="admin/")
 
@@ -28,5 +28,8 @@ SHELL_PLUS_PRINT_SQL_TRUNCATE = 1000
 # Email Backend
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Service worker - its cache would hide changes to templates and unhashed static files
+SERVICE_WORKER = False
+
 # Static files - use Django's static file serving in development
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
@@ -33,23 +33,27 @@ CSRF_TRUSTED_ORIGINS = [
     "https://*.home.wersdoerfer.de",
 ]
 
-# Static files - use Whitenoise for production
+# Static files - hashed, minified and precompressed by collectstatic, served by Whitenoise
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+        "BACKEND": "apps.core.staticfiles.StaticBuildStorage",
     },
 }
 
-# Cache
+# Cache - one memory-mapped hash table shared by all granian workers, deleted by the systemd unit on start
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "BACKEND": "apps.core.backends.cache.SharedMemoryCache",
         "LOCATION": env("DJANGO_CACHE_LOCATION", default="/tmp/homelab_cache"),  # noqa
         "TIMEOUT": 600,
-        "OPTIONS": {"MAX_ENTRIES": 10000},
+        "OPTIONS": {
+            "MAX_ENTRIES": env.int("DJANGO_CACHE_MAX_ENTRIES", default=4096),  # noqa
+            "SLOT_SIZE": env.int("DJANGO_CACHE_SLOT_SIZE", default=64 * 1024),  # noqa
+            "MAX_VALUE_SIZE": env.int("DJANGO_CACHE_MAX_VALUE_SIZE", default=8 * 1024 * 1024),  # noqa
+        },
     }
 }
 
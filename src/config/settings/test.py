@@ -50,3 +50,12 @@ MIDDLEWARE = [  # noqa: F405
     for m in MIDDLEWARE  # noqa: F405
     if "whitenoise" not in m.lower()
 ]
+
+# Importing config.wsgi/config.asgi in tests must not render the dashboard
+WARMUP_ON_STARTUP = False
+
+# Tests that need metrics enable them with a temporary METRICS_DIR
+METRICS_ENABLED = False
+
+# Tests start with an empty database, catalog tests load it explicitly
+CATALOG_AUTOLOAD = False
@@ -5,7 +5,8 @@ URL configuration for homelab project.
 from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path, re_path
-from django.views.static import serve
+
+from apps.core.media import serve_media
 
 urlpatterns = [
     path(settings.ADMIN_URL, admin.site.urls),
@@ -19,8 +20,8 @@ if settings.DEBUG:
         path("__debug__/", include(debug_toolbar.urls)),
     ] + urlpatterns
 
-# Serve media files (for low-traffic homelab, this is fine in production too)
+# Serve media files in production too, with conditional requests, ranges and sendfile
 # Note: static() only works when DEBUG=True, so we add it unconditionally for homelab
 urlpatterns += [
-    re_path(r"^media/(?P<path>.*)$", serve, {"document_root": settings.MEDIA_ROOT}),
+    re_path(r"^media/(?P<path>.*)$", serve_media, name="media"),
 ]
@@ -17,6 +17,13 @@ sys.path.insert(0, str(BASE_DIR / "src"))
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
+from django.conf import settings  # noqa: E402
 from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 application = get_wsgi_application()
+
+# Runs once per granian worker, before it accepts requests
+if settings.WARMUP_ON_STARTUP:
+    from apps.core.warmup import warmup
+
+    warmup(application)
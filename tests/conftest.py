@@ -32,6 +32,16 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache so cached pages do not leak between tests."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def client():
     """Provide a Django test client."""
@@ -57,6 +67,13 @@ def admin_client(db):
     return client
 
 
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Store uploaded files in a temporary MEDIA_ROOT."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
 @pytest.fixture
 def service(db):
     """Create a test service."""
@@ -1,6 +1,6 @@
 from django.core.management import call_command
 
-from apps.core.models import Service
+from apps.core.models import Category, Service
 
 
 def test_add_default_services_includes_opsgate():
@@ -34,3 +34,12 @@ def test_add_default_services_updates_existing_opsgate():
     assert opsgate.icon == "fas fa-clipboard-check"
     assert opsgate.is_active is False
     assert opsgate.order == 25
+
+
+def test_add_default_services_assigns_categories():
+    call_command("add_default_services")
+
+    assert Service.objects.filter(category=None).count() == 0
+    assert Service.objects.get(name="Jellyfin").category.name == "Media"
+    monitoring = Category.objects.get(slug="monitoring")
+    assert monitoring.active_service_count == monitoring.services.filter(is_active=True).count() > 0
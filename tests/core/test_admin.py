@@ -0,0 +1,53 @@
+"""
+Tests for the core admin.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.models import Category, Service, Tag
+
+
+def create_services(count, categories, tags):
+    for index in range(count):
+        service = Service.objects.create(name=f"Service {index:02d}", category=categories[index % len(categories)])
+        service.tags.set(tags[: index % 3])
+
+
+def changelist_queries(admin_client, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse("admin:core_service_changelist"), params)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestServiceAdmin:
+    """Test the service changelist."""
+
+    @pytest.fixture
+    def taxonomy(self):
+        categories = [Category.objects.create(name=name, slug=name.lower()) for name in ("Media", "Mail")]
+        tags = [Tag.objects.create(name=name, slug=name) for name in ("a", "b")]
+        return categories, tags
+
+    def test_changelist_queries_do_not_grow_with_services(self, admin_client, taxonomy):
+        create_services(3, *taxonomy)
+        few = changelist_queries(admin_client)
+        Service.objects.all().delete()
+        create_services(30, *taxonomy)
+        assert changelist_queries(admin_client) == few
+
+    def test_filter_by_category(self, admin_client, taxonomy):
+        create_services(6, *taxonomy)
+        media = taxonomy[0][0]
+        response = admin_client.get(reverse("admin:core_service_changelist"), {"category__id__exact": media.pk})
+        assert [service.category for service in response.context["cl"].result_list] == [media] * 3
+        assert changelist_queries(admin_client, category__id__exact=media.pk) == changelist_queries(admin_client)
+
+    def test_tags_column(self, admin_client, taxonomy):
+        create_services(3, *taxonomy)
+        content = admin_client.get(reverse("admin:core_service_changelist")).content.decode()
+        assert '<td class="field-tag_list">a, b</td>' in content
@@ -0,0 +1,114 @@
+"""
+Tests for the read-only services API.
+"""
+
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from apps.core import api
+from apps.core.models import Category, Service, Tag
+
+URL = "/api/services/"
+
+
+def get_json(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200
+    assert response.streaming
+    return response, json.loads(b"".join(response.streaming_content))
+
+
+@pytest.fixture
+def catalog(service):
+    media = Category.objects.create(name="Media", slug="media")
+    jellyfin = Service.objects.create(name="Jellyfin", url="https://jellyfin.example.com", category=media, order=2)
+    jellyfin.tags.add(Tag.objects.create(name="video", slug="video"), Tag.objects.create(name="audio", slug="audio"))
+    Service.objects.create(name="Old", is_active=False)
+    return [service, jellyfin]
+
+
+def test_url():
+    assert reverse("core:api-services") == URL
+
+
+def test_lists_all_fields(client, catalog):
+    _response, data = get_json(client)
+    services = data["services"]
+    assert [service["name"] for service in services] == ["Test Service", "Jellyfin", "Old"]
+    assert list(services[1]) == list(api.FIELDS)
+    assert services[1]["category"] == "media"
+    assert services[1]["tags"] == ["audio", "video"]
+    assert services[0]["category"] is None
+    assert services[0]["tags"] == []
+    assert services[0]["logo"] is None
+    assert services[0]["created_at"] == catalog[0].created_at.isoformat()
+
+
+def test_fields_projection(client, catalog):
+    _response, data = get_json(client, fields="url,name,url")
+    assert data["services"][0] == {"url": "https://example.com", "name": "Test Service"}
+
+
+@pytest.mark.parametrize(("value", "names"), [("true", ["Test Service", "Jellyfin"]), ("0", ["Old"])])
+def test_is_active_filter(client, catalog, value, names):
+    _response, data = get_json(client, fields="name", is_active=value)
+    assert [service["name"] for service in data["services"]] == names
+
+
+@pytest.mark.parametrize("params", [{"fields": "name,password"}, {"fields": ","}, {"is_active": "maybe"}])
+def test_invalid_parameters(client, params):
+    response = client.get(URL, params)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+def test_not_modified_without_queries(client, catalog, django_assert_num_queries):
+    response, _data = get_json(client, fields="name")
+    etag = response["ETag"]
+    assert response["Cache-Control"] == "no-cache"
+
+    with django_assert_num_queries(0):
+        response = client.get(URL, {"fields": "name"}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    # Other fields are another representation
+    assert get_json(client, fields="url")[0]["ETag"] != etag
+
+
+def test_etag_changes_with_services(client, catalog):
+    etag = get_json(client)[0]["ETag"]
+    Tag.objects.get(slug="video").services.clear()
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_streams_in_batches(client, monkeypatch, django_assert_num_queries):
+    monkeypatch.setattr(api, "BATCH_SIZE", 2)
+    Service.objects.bulk_create(Service(name=f"Service {index}") for index in range(5))
+    response = client.get(URL, {"fields": "id,name,tags"})
+
+    # Three batches of services and their tags; a full last batch would need one more empty query.
+    with django_assert_num_queries(6):
+        chunks = list(response.streaming_content)
+    assert len(chunks) == 5
+    data = json.loads(b"".join(chunks))
+    assert [service["name"] for service in data["services"]] == [f"Service {index}" for index in range(5)]
+
+
+def test_asgi_streams_asynchronously(async_client, monkeypatch):
+    monkeypatch.setattr(api, "BATCH_SIZE", 2)
+    Service.objects.bulk_create(Service(name=f"Service {index}") for index in range(3))
+
+    async def fetch():
+        response = await async_client.get(URL, {"fields": "name"})
+        return response, [chunk async for chunk in response.streaming_content]
+
+    response, chunks = async_to_sync(fetch)()
+    assert response.is_async
+    assert len(chunks) == 4
+    assert json.loads(b"".join(chunks)) == {"services": [{"name": f"Service {index}"} for index in range(3)]}
@@ -0,0 +1,176 @@
+"""
+Tests for the dashboard page cache.
+"""
+
+import asyncio
+import gzip
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+
+from apps.core import caching
+from apps.core.models import Service
+
+
+@pytest.mark.django_db
+class TestServicesVersion:
+    def test_saving_a_service_bumps_version(self):
+        version = caching.get_services_version()
+        Service.objects.create(name="Bumped")
+        assert caching.get_services_version() > version
+
+    def test_deleting_a_service_bumps_version(self, service):
+        version = caching.get_services_version()
+        service.delete()
+        assert caching.get_services_version() > version
+
+    def test_lost_counter_is_reseeded(self):
+        cache.delete(caching.SERVICES_VERSION_KEY)
+        assert caching.bump_services_version() is not None
+
+
+@pytest.mark.django_db
+class TestHomePageCache:
+    url = reverse("core:home")
+
+    def test_second_request_is_served_without_queries(self, client, service, django_assert_num_queries):
+        client.get(self.url)
+        with django_assert_num_queries(0):
+            response = client.get(self.url)
+        assert response.status_code == 200
+        assert service.name in response.content.decode()
+
+    def test_service_change_invalidates_page(self, client, service):
+        client.get(self.url)
+        service.name = "Renamed Service"
+        service.save()
+
+        response = client.get(self.url)
+        assert "Renamed Service" in response.content.decode()
+
+    def test_etag_allows_304(self, client, service):
+        response = client.get(self.url)
+        assert response["ETag"].startswith('"')
+
+        not_modified = client.get(self.url, headers={"If-None-Match": response["ETag"]})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    def test_no_last_modified(self, client, service):
+        # Deleting the latest edited service or a probe result changes the page without a newer timestamp.
+        response = client.get(self.url)
+        assert "Last-Modified" not in response
+        since = client.get(self.url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+        assert since.status_code == 200
+
+    def test_gzip_variant(self, client, service):
+        response = client.get(self.url, headers={"Accept-Encoding": "gzip, deflate"})
+        assert response["Content-Encoding"] == "gzip"
+        assert service.name in gzip.decompress(response.content).decode()
+        assert "Accept-Encoding" in response["Vary"]
+
+    def test_each_coding_has_its_own_etag(self, client, service):
+        identity = client.get(self.url)["ETag"]
+        gzipped = client.get(self.url, headers={"Accept-Encoding": "gzip"})["ETag"]
+        assert gzipped == f'{identity[:-1]}-gzip"'
+        headers = {"Accept-Encoding": "gzip", "If-None-Match": gzipped}
+        assert client.get(self.url, headers=headers).status_code == 304
+        assert client.get(self.url, headers={"If-None-Match": gzipped}).status_code == 200
+
+    def test_encoding_with_zero_quality_is_not_used(self, client, service):
+        response = client.get(self.url, headers={"Accept-Encoding": "gzip;q=0"})
+        assert not response.has_header("Content-Encoding")
+
+    def test_authenticated_users_bypass_cache(self, admin_client, service):
+        response = admin_client.get(self.url)
+        assert not response.has_header("ETag")
+        assert "Logout" in response.content.decode()
+
+    def test_concurrent_misses_render_once(self, rf):
+        calls = []
+        gate = threading.Event()
+
+        def render():
+            calls.append(1)
+            gate.wait(1)
+            return HttpResponse(b"page")
+
+        responses = []
+        request = rf.get(self.url)
+
+        def worker():
+            responses.append(caching.cached_page(request, "race", render))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [response.content for response in responses] == [b"page"] * 4
+
+    def test_async_concurrent_misses_render_once(self, rf):
+        calls = []
+
+        async def render():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return HttpResponse(b"page")
+
+        async def race():
+            request = rf.get(self.url)
+            return await asyncio.gather(*(caching.acached_page(request, "race", render) for _ in range(4)))
+
+        responses = asyncio.run(race())
+
+        assert len(calls) == 1
+        assert [response.content for response in responses] == [b"page"] * 4
+
+    def test_waiters_stop_when_the_page_could_not_be_cached(self, rf, monkeypatch):
+        monkeypatch.setattr(caching, "LOCK_WAIT", 10.0)
+        # Like a cache backend that refuses the entry, the page is rendered but not stored.
+        monkeypatch.setattr(caching, "fill", lambda key, render: caching.build_entry(render(), None))
+        calls = []
+        gate = threading.Event()
+
+        def render():
+            calls.append(1)
+            gate.wait(1)
+            return HttpResponse(b"page")
+
+        request = rf.get(self.url)
+        holder = threading.Thread(target=caching.cached_page, args=(request, "uncacheable", render))
+        holder.start()
+        while not calls:
+            time.sleep(0.01)
+        started = time.monotonic()
+        threading.Timer(0.1, gate.set).start()
+
+        response = caching.cached_page(request, "uncacheable", render)
+        holder.join()
+
+        assert response.content == b"page"
+        assert len(calls) == 2
+        assert time.monotonic() - started < 1
+
+
+@pytest.mark.django_db
+def test_page_larger_than_a_shared_cache_slot_is_cached(client, settings, tmp_path, django_assert_num_queries):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "apps.core.backends.cache.SharedMemoryCache",
+            "LOCATION": str(tmp_path),
+            "OPTIONS": {"MAX_ENTRIES": 64, "SLOT_SIZE": 4096},
+        }
+    }
+    Service.objects.bulk_create(Service(name=f"Service {index}", description="x" * 200) for index in range(40))
+    first = client.get(reverse("core:home"))
+    assert len(first.content) > 4096
+    with django_assert_num_queries(0):
+        assert client.get(reverse("core:home")).content == first.content
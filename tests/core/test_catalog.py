@@ -0,0 +1,212 @@
+"""
+Tests for the catalog manifest and its sync engine.
+"""
+
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.catalog import CatalogError, apply_sync, load_catalog, load_manifest, plan_sync
+from apps.core.models import CatalogState, Category, Service
+
+LOGO = b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10"><circle cx="5" cy="5" r="4"/></svg>'
+
+
+@pytest.fixture
+def logos_dir(tmp_path):
+    directory = tmp_path / "logos"
+    directory.mkdir()
+    (directory / "wagtail.svg").write_bytes(LOGO)
+    (directory / "copy.svg").write_bytes(LOGO)
+    return directory
+
+
+def write_manifest(path, count, **extra):
+    lines = ['[[categories]]\nslug = "media"\nname = "Media"\norder = 1\n']
+    for number in range(count):
+        lines.append(f'[[services]]\nname = "Service {number:04d}"\ncategory = "media"\norder = {number}\n')
+    for name, fields in extra.items():
+        lines.append(f'[[services]]\nname = "{name}"\n{fields}\n')
+    path.write_text("\n".join(lines))
+    return path
+
+
+def sync(path, logos_dir, prune=False):
+    return apply_sync(plan_sync(load_manifest(path), logos_dir=logos_dir, prune=prune), logos_dir=logos_dir)
+
+
+def test_default_manifest_is_valid():
+    manifest = load_manifest()
+    assert len(manifest["services"]) > 20
+    assert {"name": "OpsGate", "category": "infrastructure"}.items() <= manifest["services"][-2].items()
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("[[services]]\ndescription = 'x'", "has no name"),
+        ("[[services]]\nname = 'A'\ncolour = 'red'", "unknown field 'colour'"),
+        ("[[services]]\nname = 'A'\norder = true", "order must be of type int"),
+        ("[[services]]\nname = 'A'\n[[services]]\nname = 'A'", "duplicate service: A"),
+        ("[[services]]\nname = 'A'\ncategory = 'nope'", "unknown category 'nope'"),
+        ("[settings]\nx = 1", "unknown sections: settings"),
+        ("[[services]\n", "cannot read"),
+    ],
+)
+def test_invalid_manifest(tmp_path, content, message):
+    path = tmp_path / "catalog.toml"
+    path.write_text(content)
+    with pytest.raises(CatalogError, match=message):
+        load_manifest(path)
+
+
+def test_sync_creates_and_then_does_nothing(tmp_path, logos_dir):
+    path = write_manifest(tmp_path / "catalog.toml", 3)
+    plan = sync(path, logos_dir)
+    assert len(plan.create_services) == 3
+    assert list(Service.objects.values_list("name", "category__slug", "order")) == [
+        ("Service 0000", "media", 0),
+        ("Service 0001", "media", 1),
+        ("Service 0002", "media", 2),
+    ]
+    assert Category.objects.get().active_service_count == 3
+
+    with CaptureQueriesContext(connection) as queries:
+        assert not plan_sync(load_manifest(path), logos_dir=logos_dir)
+    assert len(queries) == 2
+
+
+def test_query_count_does_not_grow_with_services(tmp_path, logos_dir):
+    counts = []
+    for count in (5, 60):
+        Service.objects.all().delete()
+        Category.objects.all().delete()
+        path = write_manifest(tmp_path / f"catalog-{count}.toml", count)
+        with CaptureQueriesContext(connection) as queries:
+            sync(path, logos_dir)
+        counts.append(len(queries))
+        Service.objects.update(description="changed")
+        with CaptureQueriesContext(connection) as queries:
+            assert len(sync(path, logos_dir).update_services) == 0
+        counts.append(len(queries))
+    assert counts[0] == counts[2]
+    assert counts[1] == counts[3]
+
+
+def test_only_listed_fields_are_updated(tmp_path, logos_dir):
+    Service.objects.create(name="Kept", description="from the admin", is_active=False, order=9)
+    Service.objects.create(name="Changed", url="https://old.example.com/", order=1)
+    path = write_manifest(
+        tmp_path / "catalog.toml",
+        0,
+        Kept='order = 9\ncategory = "media"',
+        Changed='url = "https://new.example.com/"\norder = 1',
+    )
+
+    plan = sync(path, logos_dir)
+
+    assert sorted((service.name, fields) for service, fields in plan.update_services) == [
+        ("Changed", ["url"]),
+        ("Kept", ["category"]),
+    ]
+    kept = Service.objects.get(name="Kept")
+    assert (kept.description, kept.is_active, kept.category.slug) == ("from the admin", False, "media")
+    assert Service.objects.get(name="Changed").url == "https://new.example.com/"
+
+
+def test_prune_deactivates_unlisted_services(tmp_path, logos_dir):
+    Service.objects.create(name="Manual")
+    path = write_manifest(tmp_path / "catalog.toml", 1)
+
+    sync(path, logos_dir)
+    assert Service.objects.get(name="Manual").is_active
+
+    plan = sync(path, logos_dir, prune=True)
+    assert [service.name for service in plan.deactivate_services] == ["Manual"]
+    assert not Service.objects.get(name="Manual").is_active
+
+
+def test_logos_are_stored_once_per_content(tmp_path, logos_dir, settings):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    path = write_manifest(
+        tmp_path / "catalog.toml",
+        0,
+        A='logo = "wagtail.svg"',
+        B='logo = "wagtail.svg"',
+        C='logo = "copy.svg"',
+        D='logo = "missing.svg"',
+    )
+    plan = sync(path, logos_dir)
+
+    assert plan.missing_logos == [("D", "missing.svg")]
+    logos = dict(Service.objects.exclude(logo_file="").values_list("name", "logo_file"))
+    assert set(logos) == {"A", "B", "C"}
+    assert len(set(logos.values())) == 1
+    service = Service.objects.get(name="C")
+    assert service.logo_picture["src"].endswith(".svg")
+    logos = settings.MEDIA_ROOT / "services" / "logos"
+    assert len([path for path in logos.glob("??/??/*") if path.is_file()]) == 1
+
+    # A later sync stores nothing new for a file of another name with the same content.
+    (logos_dir / "renamed.svg").write_bytes(LOGO)
+    Service.objects.create(name="E")
+    sync(write_manifest(tmp_path / "more.toml", 0, E='logo = "renamed.svg"'), logos_dir)
+    assert Service.objects.get(name="E").logo_file.name == service.logo_file.name
+    assert len([path for path in logos.glob("??/??/*") if path.is_file()]) == 1
+
+
+def test_dry_run_writes_nothing(tmp_path, logos_dir):
+    path = write_manifest(tmp_path / "catalog.toml", 2, A='logo = "wagtail.svg"')
+    out = io.StringIO()
+
+    call_command("add_default_services", manifest=path, logos_dir=logos_dir, dry_run=True, stdout=out)
+
+    assert not Service.objects.exists()
+    assert "Create service Service 0001" in out.getvalue()
+    assert "Add logo wagtail.svg to A" in out.getvalue()
+    assert "would create 3 services, update 0, deactivate 0 and add 1 logos" in out.getvalue()
+
+
+def test_command_reports_invalid_manifest(tmp_path):
+    path = tmp_path / "catalog.toml"
+    path.write_text("[[services]]\n")
+    with pytest.raises(CommandError, match="has no name"):
+        call_command("add_default_services", manifest=path)
+
+
+def test_load_catalog_skips_unchanged_fingerprint(tmp_path, logos_dir, settings):
+    settings.CATALOG_AUTOLOAD = True
+    settings.MEDIA_ROOT = tmp_path / "media"
+    path = write_manifest(tmp_path / "catalog.toml", 2, A='logo = "wagtail.svg"')
+
+    assert len(load_catalog(path=path, logos_dir=logos_dir).create_services) == 3
+    fingerprint = CatalogState.objects.get().fingerprint
+
+    with CaptureQueriesContext(connection) as queries:
+        assert load_catalog(path=path, logos_dir=logos_dir) is None
+    assert not [query for query in queries if "core_service" in query["sql"]]
+
+    # A changed logo file changes the fingerprint, even though the manifest is the same.
+    Service.objects.filter(name="A").update(description="from the admin")
+    (logos_dir / "wagtail.svg").write_bytes(LOGO.replace(b'r="4"', b'r="3"'))
+    assert not load_catalog(path=path, logos_dir=logos_dir)
+    assert CatalogState.objects.get().fingerprint != fingerprint
+    assert Service.objects.get(name="A").description == "from the admin"
+
+
+def test_load_catalog_disabled(tmp_path, logos_dir):
+    path = write_manifest(tmp_path / "catalog.toml", 2)
+    assert load_catalog(path=path, logos_dir=logos_dir) is None
+    assert not Service.objects.exists()
+    assert not CatalogState.objects.exists()
+
+
+def test_default_catalog_is_loaded_once(tmp_path, settings):
+    settings.CATALOG_AUTOLOAD = True
+    settings.MEDIA_ROOT = tmp_path / "media"
+    load_catalog()
+    assert Service.objects.filter(name="Logyard", category__slug="monitoring").exists()
+    assert load_catalog() is None
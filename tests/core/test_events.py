@@ -0,0 +1,174 @@
+"""
+Tests for the Server-Sent Events stream of live dashboard updates.
+"""
+
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.caching import bump_services_version, bump_status_version
+from apps.core.events import HEARTBEAT, Event, EventBroker, Subscriber
+from apps.core.models import ServiceStatus
+
+
+@pytest.fixture
+def broker(settings):
+    settings.EVENTS_POLL_INTERVAL = 0.01
+    settings.EVENTS_HEARTBEAT = 0.05
+    settings.EVENTS_RING_SIZE = 4
+    settings.EVENTS_CLIENT_BUFFER = 2
+    return EventBroker()
+
+
+def set_status(service, is_up, latency_ms=12.0):
+    ServiceStatus.objects.update_or_create(
+        service=service,
+        defaults={
+            "is_up": is_up,
+            "status_code": 200 if is_up else None,
+            "latency_ms": latency_ms,
+            "checked_at": timezone.now(),
+        },
+    )
+
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_event_encoding():
+    assert Event("ab-1", "status", [{"id": 1}]).encode() == b'id: ab-1\nevent: status\ndata: [{"id":1}]\n\n'
+
+
+def test_poll_publishes_only_changes(broker, service):
+    set_status(service, True)
+    async_to_sync(broker.poll)()
+    assert not broker.ring
+    assert broker.snapshot().data["statuses"] == [
+        {"id": service.pk, "up": True, "code": 200, "latency": 12.0, "error": ""}
+    ]
+
+    set_status(service, True)
+    async_to_sync(broker.poll)()
+    assert not broker.ring
+
+    set_status(service, False)
+    bump_services_version()
+    async_to_sync(broker.poll)()
+    assert [(event.type, event.id) for event in broker.ring] == [
+        ("status", f"{broker.epoch}-1"),
+        ("services", f"{broker.epoch}-2"),
+    ]
+    assert broker.ring[0].data[0]["up"] is False
+
+
+def test_status_version_is_not_published(broker, service):
+    async_to_sync(broker.poll)()
+    version = broker.version
+
+    # The prober bumps the status version for re-rendering, open dashboards update the badge in place.
+    set_status(service, False)
+    bump_status_version()
+    async_to_sync(broker.poll)()
+
+    assert [event.type for event in broker.ring] == ["status"]
+    assert broker.version == version == broker.snapshot().data["version"]
+
+
+def test_resume_from_the_ring(broker):
+    for number in range(6):
+        broker.publish("status", [number])
+    # The ring keeps the last four events, 3 to 6.
+    assert [event.data for event in broker.missed(f"{broker.epoch}-4")] == [[4], [5]]
+    assert broker.missed(f"{broker.epoch}-6") == []
+    assert len(broker.missed(f"{broker.epoch}-2")) == 4
+    assert broker.missed(f"{broker.epoch}-1") is None
+    assert broker.missed("00000000-5") is None
+    assert broker.missed("garbage") is None
+    assert broker.missed(None) is None
+
+
+def test_slow_clients_are_dropped(broker):
+    async def run():
+        slow, fast = Subscriber(2), Subscriber(8)
+        broker.subscribers.update({slow, fast})
+        for number in range(3):
+            broker.publish("status", [number])
+        return slow, fast
+
+    slow, fast = async_to_sync(run)()
+    assert slow.dropped
+    assert broker.subscribers == {fast}
+    assert slow.queue.qsize() == 1 and slow.queue.get_nowait() is None
+    assert fast.queue.qsize() == 3
+
+
+def test_stream_sends_snapshot_heartbeat_and_changes(broker, service):
+    set_status(service, True)
+
+    async def run():
+        stream = broker.stream()
+        chunks = [await anext(stream) for _ in range(3)]
+        await sync_to_async(set_status)(service, False)
+        chunks.append(await anext(stream))
+        while chunks[-1] == HEARTBEAT:
+            chunks[-1] = await anext(stream)
+        await stream.aclose()
+        return chunks
+
+    retry, snapshot, heartbeat, change = async_to_sync(run)()
+    assert retry == b"retry: 5000\n\n"
+    assert parse(snapshot)[0] == "snapshot"
+    assert parse(snapshot)[1]["statuses"][0]["up"] is True
+    assert heartbeat == HEARTBEAT
+    assert parse(change) == ("status", [{"id": service.pk, "up": False, "code": None, "latency": 12.0, "error": ""}])
+    assert not broker.subscribers
+
+
+def test_stream_resumes_with_missed_events(broker):
+    async def run():
+        await broker.subscribe()
+        broker.subscribers.clear()
+        first = broker.publish("services", {"version": 1})
+        broker.publish("services", {"version": 2})
+        stream = broker.stream(first.id)
+        chunks = [await anext(stream) for _ in range(2)]
+        await stream.aclose()
+        return chunks
+
+    _retry, missed = async_to_sync(run)()
+    assert parse(missed) == ("services", {"version": 2})
+
+
+def test_wsgi_requests_get_no_stream(client):
+    assert client.get(reverse("core:events")).status_code == 204
+
+
+def test_asgi_stream_response(settings, broker, monkeypatch):
+    monkeypatch.setattr("apps.core.views.broker", broker)
+
+    async def run():
+        response = await AsyncClient().get(reverse("core:events"))
+        first = await anext(aiter(response.streaming_content))
+        return response, first
+
+    response, first = async_to_sync(run)()
+    assert response["Content-Type"] == "text/event-stream"
+    assert "no-cache" in response["Cache-Control"]
+    assert first == b"retry: 5000\n\n"
+
+
+def test_dashboard_includes_the_stream(client, service, settings):
+    content = client.get(reverse("core:home")).content.decode()
+    assert f'data-stream="{reverse("core:events")}"' in content
+    assert f'data-service="{service.pk}"' in content
+
+    settings.LIVE_EVENTS = False
+    client.get(reverse("core:home"))
+    bump_services_version()
+    assert "data-stream" not in client.get(reverse("core:home")).content.decode()
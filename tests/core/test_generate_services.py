@@ -0,0 +1,48 @@
+"""
+Tests for the synthetic catalog generator.
+"""
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from apps.core.caching import get_services_version
+from apps.core.models import Service, ServiceStatus
+
+
+def test_generates_services_with_logos_and_statuses(media_root):
+    version = get_services_version()
+
+    call_command("generate_services", count=30, logos=0.5, logo_variants=4)
+
+    services = Service.objects.filter(name__startswith="Synthetic ")
+    assert services.count() == 30
+    assert ServiceStatus.objects.filter(service__in=services).count() == 30
+    with_logo = services.exclude(logo_file="")
+    assert 0 < with_logo.count() < 30
+    for service in with_logo:
+        assert service.logo_picture is not None
+        assert (media_root / service.logo_file.name).exists()
+    assert get_services_version() != version
+
+
+def test_is_deterministic_and_appends(media_root):
+    call_command("generate_services", count=5, logos=0)
+    first = list(Service.objects.values_list("name", flat=True))
+    call_command("generate_services", count=5, logos=0)
+
+    names = list(Service.objects.filter(name__startswith="Synthetic ").values_list("name", flat=True))
+    assert len(names) == 10
+    assert names[:5] == first
+
+
+def test_clear_removes_services_and_files(media_root):
+    call_command("generate_services", count=10, logos=1, logo_variants=2)
+    call_command("generate_services", count=0, clear=True)
+
+    assert not Service.objects.filter(name__startswith="Synthetic ").exists()
+    assert not [path for path in media_root.rglob("*") if path.is_file()]
+
+
+def test_rejects_invalid_options():
+    with pytest.raises(CommandError):
+        call_command("generate_services", count=1, logos=2)
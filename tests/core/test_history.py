@@ -0,0 +1,102 @@
+"""
+Tests for the ring-buffer probe history and its rollups.
+"""
+
+import math
+from datetime import UTC, datetime, timedelta
+
+from django.urls import reverse
+
+from apps.core.history import SAMPLE_COLUMNS, History, Ring, record_results, sparklines
+from apps.core.models import ServiceHistory
+from apps.core.probes import ProbeResult
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def probe(service, minutes, latency=10.0, is_up=True, seconds=0):
+    checked_at = START + timedelta(minutes=minutes, seconds=seconds)
+    return record_results([ProbeResult(service.pk, is_up, 200 if is_up else None, latency)], checked_at)
+
+
+def rows(service, field):
+    return History(ServiceHistory.objects.get(service=service)).levels[field].rows()
+
+
+def test_ring_wraps_and_round_trips():
+    ring = Ring(SAMPLE_COLUMNS, 3)
+    for second in range(5):
+        ring.append(time=second, latency=second / 2, up=second % 2)
+    data = ring.to_bytes()
+    assert len(data) == Ring.size(SAMPLE_COLUMNS, 3)
+
+    loaded = Ring(SAMPLE_COLUMNS, 3, data)
+    assert list(loaded.column("time")) == [2, 3, 4]
+    assert list(loaded.column("latency")) == [1.0, 1.5, 2.0]
+    assert loaded.last("up") == 0
+    # A ring stored with another capacity starts over.
+    assert Ring(SAMPLE_COLUMNS, 4, data).length == 0
+
+
+def test_minute_rollup_is_exact(service):
+    for second, latency in enumerate([10.0, 20.0, 30.0, 40.0, None]):
+        probe(service, 0, latency, is_up=latency is not None, seconds=second * 10)
+    assert rows(service, "minutes") == []
+
+    probe(service, 1)
+    [minute] = rows(service, "minutes")
+    assert minute == {"start": int(START.timestamp()), "count": 5, "up": 4, "min": 10, "avg": 25, "max": 40, "p95": 40}
+
+
+def test_hours_and_days_roll_up_from_the_level_below(service):
+    # One probe per minute: 30 minutes at 10 ms and 30 at 40 ms, the next hour starts.
+    for minute in range(60):
+        probe(service, minute, 10.0 if minute < 30 else 40.0)
+    assert probe(service, 60) is True
+
+    [hour] = rows(service, "hours")
+    assert (hour["count"], hour["up"], hour["min"], hour["avg"], hour["max"], hour["p95"]) == (60, 60, 10, 25, 40, 40)
+    assert rows(service, "days") == []
+
+    probe(service, 24 * 60)
+    [day] = rows(service, "days")
+    assert day["count"] == 61 and day["min"] == 10 and day["max"] == 40
+
+
+def test_down_periods_have_no_latency(service):
+    probe(service, 0, None, is_up=False)
+    probe(service, 1)
+    [minute] = rows(service, "minutes")
+    assert minute["up"] == 0 and math.isnan(minute["avg"])
+
+
+def test_record_results_writes_in_bulk(service, django_assert_num_queries):
+    probe(service, 0)
+    with django_assert_num_queries(2):
+        # One select and one bulk update for every service of the round.
+        probe(service, 0, seconds=10)
+    assert ServiceHistory.objects.count() == 1
+
+
+def test_sparklines(service):
+    for hour in range(4):
+        probe(service, hour * 60, latency=10.0 * (hour + 1))
+    lines = sparklines([service.pk, service.pk + 1])
+    assert list(lines) == [service.pk]
+    assert lines[service.pk]["max"] == 30
+    # Three hourly points, the slowest hour at the top of the 20 px box.
+    assert lines[service.pk]["points"] == "0.0,19.0 50.0,10.0 100.0,1.0"
+
+
+def test_dashboard_shows_sparklines(client, service):
+    for hour in range(3):
+        probe(service, hour * 60)
+    assert 'class="service-sparkline"' in client.get(reverse("core:home")).content.decode()
+
+
+def test_history_ignores_resized_rings(service):
+    ServiceHistory.objects.create(service=service, samples=b"\x00" * 7, hours=b"short")
+    probe(service, 0)
+    history = History(ServiceHistory.objects.get(service=service))
+    assert history.samples.length == 1
+    assert sparklines([service.pk]) == {}
@@ -0,0 +1,94 @@
+"""
+Tests for the self-hosted Font Awesome subset.
+"""
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from apps.core import icons
+from apps.core.icons import build_stylesheet, get_icon_stylesheet, parse_icons, used_icons
+from apps.core.models import Service
+
+
+@pytest.fixture(autouse=True)
+def static_source(monkeypatch, tmp_path):
+    path = tmp_path / "static" / icons.STATIC_NAME
+    monkeypatch.setattr(icons, "static_source", lambda: path)
+    return path
+
+
+def test_parse_icons():
+    assert parse_icons('<i class="fas fa-home"></i> fab fa-mastodon fa-solid fa-arrow-left') == {
+        ("solid", "home"),
+        ("brands", "mastodon"),
+        ("solid", "arrow-left"),
+    }
+    assert parse_icons("fa-fw fa-spin") == set()
+
+
+def test_used_icons_include_templates_and_services():
+    Service.objects.create(name="Fedi", icon="fab fa-mastodon")
+    icons = used_icons()
+    assert ("brands", "mastodon") in icons
+    assert ("solid", "info-circle") in icons
+    assert ("solid", "server") in icons
+
+
+def test_stylesheet_resolves_aliases_and_reports_missing():
+    css, missing = build_stylesheet({("solid", "home"), ("solid", "no-such-icon")})
+    assert ".fas.fa-home,.fa-solid.fa-home{--fa-icon:url(" in css
+    assert "%3Csvg" in css
+    assert missing == ["solid/no-such-icon"]
+
+
+class TestIconStylesheet:
+    def test_pages_use_local_stylesheet(self, client):
+        content = client.get("/").content.decode()
+        assert "cdnjs" not in content
+        assert f'href="{get_icon_stylesheet()["url"]}"' in content
+
+    def test_stylesheet_is_served_immutable(self, client):
+        response = client.get(get_icon_stylesheet()["url"])
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/css; charset=utf-8"
+        assert "immutable" in response["Cache-Control"]
+        assert b".fas.fa-server" in response.content
+
+    def test_icon_change_rebuilds_stylesheet(self, client):
+        service = Service.objects.create(name="Fedi", icon="fas fa-rocket")
+        old_url = get_icon_stylesheet()["url"]
+
+        service.icon = "fab fa-mastodon"
+        service.save()
+
+        new_url = get_icon_stylesheet()["url"]
+        assert new_url != old_url
+        assert b".fab.fa-mastodon" in client.get(new_url).content
+        assert client.get(old_url)["Location"] == new_url
+
+
+def test_build_icons_command(tmp_path, static_source):
+    Service.objects.create(name="Broken", icon="fas fa-does-not-exist")
+    output = tmp_path / "icons.css"
+
+    with pytest.raises(CommandError):
+        call_command("build_icons", "--check", "--output", str(output))
+    assert ".fas.fa-home" in output.read_text()
+    assert static_source.read_text() == output.read_text()
+
+
+class TestStaticSubset:
+    def test_built_subset_is_served_as_static_file(self, client, static_source):
+        call_command("build_icons")
+        assert get_icon_stylesheet() == {"entry": None, "url": f"/static/{icons.STATIC_NAME}", "missing": []}
+        assert f'href="/static/{icons.STATIC_NAME}"' in client.get("/").content.decode()
+        # Old links to the app-served subset lead to the static file.
+        assert client.get("/icons/fontawesome.0123456789ab.css")["Location"] == f"/static/{icons.STATIC_NAME}"
+
+    def test_icon_changed_after_the_build_is_served_by_the_app(self, client, static_source):
+        call_command("build_icons")
+        Service.objects.create(name="Fedi", icon="fab fa-mastodon")
+
+        url = get_icon_stylesheet()["url"]
+        assert url.startswith("/icons/fontawesome.")
+        assert b".fab.fa-mastodon" in client.get(url).content
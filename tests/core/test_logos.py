@@ -0,0 +1,136 @@
+"""
+Tests for logo renditions.
+"""
+
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.core.logos import LOGO_BOX, LogoError, build_renditions, fit, process_logo, sanitize_svg
+from apps.core.models import Service
+
+
+def png_bytes(size=(400, 200)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (255, 0, 0, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+SVG = b"""<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 40 20">
+  <script>alert(1)</script>
+  <rect width="40" height="20" onclick="alert(2)"/>
+  <image xlink:href="https://evil.example/x.png"/>
+  <use href="#local"/>
+</svg>"""
+
+
+def test_fit_keeps_aspect_ratio_and_does_not_enlarge():
+    assert fit(400, 200, 80) == (80, 40)
+    assert fit(40, 20, 80) == (40, 20)
+    assert fit(40, 20, 80, enlarge=True) == (80, 40)
+
+
+class TestBuildRenditions:
+    def test_raster_renditions(self):
+        result = build_renditions(png_bytes(), "logo.png")
+        assert (result["width"], result["height"]) == (LOGO_BOX, LOGO_BOX // 2)
+        assert result["src"] == f"-{LOGO_BOX}.png"
+        assert result["sources"][-1]["type"] == "image/png"
+        assert [descriptor for _suffix, descriptor in result["sources"][-1]["srcset"]] == ["1x", "2x"]
+        assert Image.open(io.BytesIO(result["files"][f"-{LOGO_BOX * 2}.png"])).size == (160, 80)
+
+    def test_small_sources_get_no_upscaled_2x(self):
+        result = build_renditions(png_bytes((60, 60)), "logo.png")
+        assert [descriptor for _suffix, descriptor in result["sources"][-1]["srcset"]] == ["1x"]
+
+    def test_unreadable_image(self):
+        with pytest.raises(LogoError):
+            build_renditions(b"not an image", "logo.png")
+
+    def test_svg_is_sanitized(self):
+        svg, width, height = sanitize_svg(SVG)
+        assert (width, height) == (40, 20)
+        assert b"script" not in svg
+        assert b"onclick" not in svg
+        assert b"evil.example" not in svg
+        assert b'href="#local"' in svg
+        assert b"\n" not in svg
+
+    def test_invalid_svg(self):
+        with pytest.raises(LogoError):
+            build_renditions(b"<html></html>", "logo.svg")
+
+    @pytest.mark.parametrize(
+        "attributes",
+        ['viewBox="0 0 0 0"', 'viewBox="0 0 a b"', 'viewBox="0 0 inf 10"', 'width="1.2.3" height="10"'],
+    )
+    def test_invalid_svg_size(self, attributes):
+        with pytest.raises(LogoError, match="invalid SVG size"):
+            build_renditions(f'<svg xmlns="http://www.w3.org/2000/svg" {attributes}/>'.encode(), "logo.svg")
+
+
+class TestProcessLogo:
+    def test_renditions_are_stored_and_rendered(self, client, media_root):
+        service = Service.objects.create(
+            name="Logo", logo_file=SimpleUploadedFile("logo.png", png_bytes(), content_type="image/png")
+        )
+        process_logo(service)
+
+        picture = service.logo_picture
+        assert picture["width"] == LOGO_BOX
+        assert picture["src"].endswith(".png")
+        assert (media_root / service.logo_renditions["src"]).exists()
+
+        content = client.get("/").content.decode()
+        assert "<picture>" in content
+        assert f'width="{LOGO_BOX}"' in content
+        assert picture["sources"][-1]["srcset"] in content
+
+    def test_replacing_the_logo_keeps_old_renditions_for_collect_logos(self, media_root):
+        service = Service.objects.create(
+            name="Logo", logo_file=SimpleUploadedFile("logo.png", png_bytes(), content_type="image/png")
+        )
+        process_logo(service)
+        old_src = media_root / service.logo_renditions["src"]
+
+        service.logo_file = SimpleUploadedFile("logo.png", png_bytes((300, 300)), content_type="image/png")
+        service.save()
+        assert service.logo_picture is None
+        process_logo(service)
+
+        # Stored files may be shared by other services, only collect_logos deletes them.
+        assert old_src.exists()
+        assert service.logo_picture["height"] == LOGO_BOX
+        call_command("collect_logos", min_age=0, stdout=io.StringIO())
+        assert not old_src.exists()
+        assert (media_root / service.logo_renditions["src"]).exists()
+
+    def test_process_logos_command_backfills(self, media_root):
+        service = Service.objects.create(
+            name="Logo", logo_file=SimpleUploadedFile("logo.svg", SVG, content_type="image/svg+xml")
+        )
+        call_command("process_logos", "--workers", "1")
+
+        service.refresh_from_db()
+        assert service.logo_picture["src"].endswith(".svg")
+        assert (service.logo_picture["width"], service.logo_picture["height"]) == (LOGO_BOX, LOGO_BOX // 2)
+
+    def test_process_logos_command_skips_missing_files(self, media_root):
+        missing = Service.objects.create(
+            name="Missing",
+            logo_file=SimpleUploadedFile("gone.svg", SVG + b"<!-- gone -->", content_type="image/svg+xml"),
+        )
+        service = Service.objects.create(
+            name="Logo", logo_file=SimpleUploadedFile("logo.svg", SVG, content_type="image/svg+xml")
+        )
+        (media_root / missing.logo_file.name).unlink()
+        stderr = io.StringIO()
+        call_command("process_logos", "--workers", "1", stderr=stderr, stdout=io.StringIO())
+
+        assert "Skipping Missing" in stderr.getvalue()
+        service.refresh_from_db()
+        assert service.logo_picture["src"].endswith(".svg")
@@ -0,0 +1,103 @@
+"""
+Tests for media file serving.
+"""
+
+import pytest
+
+from apps.core.media import media_index, parse_range
+
+LOGO = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(media_root):
+    """The shared ``media_root`` with a raster and an SVG logo in it."""
+    (media_root / "services" / "logos").mkdir(parents=True)
+    (media_root / "services" / "logos" / "logo.png").write_bytes(LOGO)
+    (media_root / "services" / "logos" / "0123456789abcdef.svg").write_bytes(b"<svg/>")
+    media_index.clear()
+    yield media_root
+    media_index.clear()
+
+
+def content(response):
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+class TestParseRange:
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ("bytes=0-9", (0, 9)),
+            ("bytes=10-", (10, 99)),
+            ("bytes=-10", (90, 99)),
+            ("bytes=90-200", (90, 99)),
+            ("bytes=1-2,5-6", None),
+            ("items=0-1", None),
+        ],
+    )
+    def test_ranges(self, header, expected):
+        assert parse_range(header, 100) == expected
+
+    def test_unsatisfiable(self):
+        with pytest.raises(ValueError):
+            parse_range("bytes=100-", 100)
+
+
+class TestServeMedia:
+    url = "/media/services/logos/logo.png"
+
+    def test_serves_file_with_validators(self, client, media_root):
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert content(response) == LOGO
+        assert response["Content-Type"] == "image/png"
+        assert response["Accept-Ranges"] == "bytes"
+        assert "ETag" in response and "Last-Modified" in response
+        assert "immutable" not in response["Cache-Control"]
+
+    def test_if_none_match_returns_304(self, client, media_root):
+        etag = client.get(self.url)["ETag"]
+        response = client.get(self.url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_if_modified_since_returns_304(self, client, media_root):
+        last_modified = client.get(self.url)["Last-Modified"]
+        response = client.get(self.url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+    def test_range_request(self, client, media_root):
+        response = client.get(self.url, headers={"Range": "bytes=8-15"})
+        assert response.status_code == 206
+        assert response.content == LOGO[8:16]
+        assert response["Content-Range"] == f"bytes 8-15/{len(LOGO)}"
+
+    def test_range_ignored_when_if_range_does_not_match(self, client, media_root):
+        response = client.get(self.url, headers={"Range": "bytes=8-15", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert content(response) == LOGO
+
+    def test_unsatisfiable_range(self, client, media_root):
+        response = client.get(self.url, headers={"Range": f"bytes={len(LOGO)}-"})
+        assert response.status_code == 416
+        assert response["Content-Range"] == f"bytes */{len(LOGO)}"
+
+    def test_hashed_names_are_immutable(self, client, media_root):
+        response = client.get("/media/services/logos/0123456789abcdef.svg")
+        assert "immutable" in response["Cache-Control"]
+        assert "sandbox" in response["Content-Security-Policy"]
+
+    def test_new_files_are_found_after_index_build(self, client, media_root):
+        client.get(self.url)
+        (media_root / "late.png").write_bytes(LOGO)
+        assert client.get("/media/late.png").status_code == 200
+
+    def test_missing_and_traversal_paths_404(self, client, media_root):
+        assert client.get("/media/missing.png").status_code == 404
+        assert client.get("/media/../settings.py").status_code == 404
+
+    def test_sendfile_offload(self, client, media_root, settings):
+        settings.MEDIA_SENDFILE_HEADER = "X-Accel-Redirect"
+        response = client.get(self.url)
+        assert response["X-Accel-Redirect"] == "/protected-media/services/logos/logo.png"
+        assert response.content == b""
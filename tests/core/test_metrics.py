@@ -0,0 +1,111 @@
+"""
+Tests for the multiprocess Prometheus metrics.
+"""
+
+import os
+
+import pytest
+
+from apps.core.metrics import INITIAL_SIZE, CounterFile, collect, read_entries, record_cache, render, sample_key
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+class TestCounterFile:
+    def test_values_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "metrics-1.db")
+        counters = CounterFile(path)
+        counters.add("a", 1)
+        counters.add("a", 2.5)
+        counters.add("b", 1)
+        counters.close()
+
+        with open(path, "rb") as f:
+            assert {key: value for key, value, _offset in read_entries(f.read())} == {"a": 3.5, "b": 1.0}
+        reopened = CounterFile(path)
+        reopened.add("a", 1)
+        reopened.close()
+        assert collect(tmp_path)[0] == {"a": 4.5, "b": 1.0}
+
+    def test_grows_beyond_initial_size(self, tmp_path):
+        counters = CounterFile(str(tmp_path / "metrics-1.db"))
+        keys = [f"key-{index:05d}-{'x' * 40}" for index in range(INITIAL_SIZE // 32)]
+        for key in keys:
+            counters.add(key, 1)
+        counters.close()
+
+        totals, pids = collect(tmp_path)
+        assert len(totals) == len(keys)
+        assert pids == [1]
+        assert os.path.getsize(tmp_path / "metrics-1.db") > INITIAL_SIZE
+
+
+def test_samples_are_summed_across_workers(tmp_path):
+    key = sample_key("homelab_http_requests_total", {"view": "core:home", "method": "GET", "status": "200"})
+    for pid in (101, 102):
+        counters = CounterFile(str(tmp_path / f"metrics-{pid}.db"))
+        counters.add(key, 3)
+        counters.close()
+
+    assert 'homelab_http_requests_total{method="GET",status="200",view="core:home"} 6' in render(tmp_path)
+
+
+def test_metrics_endpoint(client, service, metrics_dir, settings):
+    settings.METRICS_TOKEN = "scrape-token"
+    client.get("/")
+    client.get("/")
+    client.get("/missing/")
+
+    text = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).content.decode()
+
+    assert "# TYPE homelab_http_request_duration_seconds histogram" in text
+    assert 'homelab_http_requests_total{method="GET",status="200",view="core:home"} 2' in text
+    assert 'homelab_http_requests_total{method="GET",status="404",view="unmatched"} 1' in text
+    assert 'homelab_http_request_duration_seconds_bucket{le="+Inf",view="core:home"} 2' in text
+    assert 'homelab_http_request_duration_seconds_count{view="core:home"} 2' in text
+    assert 'homelab_db_queries_total{view="core:home"}' in text
+    assert 'homelab_cache_requests_total{cache="home",result="hit"} 1' in text
+    assert 'homelab_cache_requests_total{cache="home",result="miss"} 1' in text
+    assert f'homelab_worker_resident_memory_bytes{{pid="{os.getpid()}"}}' in text
+
+
+def test_paginated_pages_share_a_cache_label(metrics_dir):
+    record_cache("home-cards:WzAsImEiLDFd", hit=False)
+    record_cache("home-cards:WzAsImIiLDJd", hit=False)
+    assert 'homelab_cache_requests_total{cache="home-cards",result="miss"} 2' in render(metrics_dir)
+
+
+def test_disabled_metrics_write_nothing(client, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    client.get("/")
+    assert not list(tmp_path.iterdir())
+
+
+class TestMetricsAccess:
+    @pytest.fixture(autouse=True)
+    def token(self, metrics_dir, settings):
+        settings.METRICS_TOKEN = "scrape-token"
+
+    def test_anonymous_requests_are_refused(self, client):
+        assert client.get("/metrics").status_code == 403
+
+    def test_wrong_token_is_refused(self, client):
+        assert client.get("/metrics", headers={"Authorization": "Bearer guess"}).status_code == 403
+
+    def test_non_ascii_token_is_refused(self, client):
+        assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer sch\u00fcssel").status_code == 403
+
+    def test_no_token_configured_refuses_empty_bearer(self, client, settings):
+        settings.METRICS_TOKEN = ""
+        assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 403
+
+    def test_staff_users_can_read_metrics(self, admin_client):
+        assert admin_client.get("/metrics").status_code == 200
+
+    def test_bearer_token_is_accepted(self, client):
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).status_code == 200
@@ -2,6 +2,8 @@
 Tests for core app models.
 """
 
+import hashlib
+
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import IntegrityError
@@ -58,7 +60,9 @@ class TestServiceModel:
         service = Service.objects.create(name="Test Service", logo_file=logo_file)
 
         assert service.logo_file is not None
-        assert "test_logo" in service.logo_file.name
+        # Stored under the SHA-256 of the content, sharded by its first two bytes.
+        digest = hashlib.sha256(svg_content).hexdigest()
+        assert service.logo_file.name == f"services/logos/{digest[:2]}/{digest[2:4]}/{digest}.svg"
 
         # Clean up
         service.logo_file.delete()
@@ -0,0 +1,194 @@
+"""
+Tests for the grouped, keyset-paginated dashboard.
+"""
+
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.models import Category, Service, Tag
+from apps.core.pagination import acategory_page, afirst_page, decode_cursor, encode_cursor, services_after
+
+CARDS_LINK_RE = re.compile(r'data-cards="([^"]+)"')
+
+
+@pytest.fixture
+def catalog(settings):
+    """Eleven services spread over two categories and no category, four per page."""
+    settings.DASHBOARD_PAGE_SIZE = 4
+    categories = [
+        Category.objects.create(name="Media", slug="media", order=1),
+        Category.objects.create(name="Monitoring", slug="monitoring", order=2),
+        None,
+    ]
+    # Services of equal order are ordered by name
+    services = [
+        Service(name=f"Service {index:02d}", order=index % 2, category=categories[index % 3]) for index in range(11)
+    ]
+    Service.objects.bulk_create(services)
+    Category.update_active_service_counts()
+    return services
+
+
+def service_names(groups):
+    return [[service.name for service in group.page_services] for group in groups]
+
+
+def expected_names(category):
+    return list(
+        Service.objects.filter(category=category).order_by("order", "name", "id").values_list("name", flat=True)
+    )
+
+
+def test_cursor_round_trip(catalog):
+    service = catalog[0]
+    assert decode_cursor(encode_cursor(service)) == (service.category_id, service.order, service.name, service.pk)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not-base64!", "bnVsbA", "WzEsMl0", "WyJhIiwiYiIsMV0", "WyJ4IiwwLCJhIiwxXQ", "W251bGwsMCwiYSIsIjEiXQ"],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_first_page_groups_by_category(catalog):
+    groups = async_to_sync(afirst_page)(4)
+
+    assert [group.name for group in groups] == ["Media", "Monitoring", "Other services"]
+    assert service_names(groups) == [expected_names(category)[:4] for category in [*Category.objects.all(), None]]
+    assert [group.active_service_count for group in groups[:2]] == [4, 4]
+    assert all(group.next_cursor is None for group in groups)
+
+
+def test_first_page_reads_one_bounded_page_per_category(catalog):
+    with CaptureQueriesContext(connection) as queries:
+        async_to_sync(afirst_page)(2)
+    before = len(queries)
+    mail = Category.objects.create(name="Mail", slug="mail", order=3)
+    Service.objects.create(name="Mailbox", category=mail).tags.add(Tag.objects.create(name="mail", slug="mail"))
+
+    with CaptureQueriesContext(connection) as queries:
+        groups = async_to_sync(afirst_page)(2)
+
+    assert len(groups) == 4
+    # Categories, one LIMIT 3 query per group and the tags of all groups.
+    assert len(queries) == before + 1 == 6
+    services = [query["sql"] for query in queries if 'FROM "core_service"' in query["sql"]]
+    assert len(services) == 4
+    assert all(sql.endswith("LIMIT 3") and "ROW_NUMBER" not in sql for sql in services)
+
+
+def test_pages_cover_every_category_once(catalog):
+    for group in async_to_sync(afirst_page)(2):
+        seen = [service.name for service in group.page_services]
+        cursor = group.next_cursor
+        while cursor is not None:
+            page = async_to_sync(acategory_page)(cursor, 2)
+            assert page.name == group.name
+            seen.extend(service.name for service in page.page_services)
+            cursor = page.next_cursor
+        assert seen == expected_names(group if group.pk else None)
+
+
+def test_query_count_does_not_grow_with_depth(catalog):
+    cursor = async_to_sync(afirst_page)(1)[0].next_cursor
+    counts = []
+    while cursor is not None:
+        with CaptureQueriesContext(connection) as queries:
+            cursor = async_to_sync(acategory_page)(cursor, 1).next_cursor
+        counts.append(len(queries))
+        assert not any("OFFSET" in query["sql"] for query in queries)
+    assert counts == [3, 3, 3]
+
+
+def test_query_uses_dashboard_index(catalog):
+    queryset = services_after(encode_cursor(catalog[3]))
+    with CaptureQueriesContext(connection) as queries:
+        list(queryset)
+    with connection.cursor() as db:
+        db.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+        plan = " ".join(str(row[-1]) for row in db.fetchall())
+    assert "core_service_dashboard_idx" in plan
+
+
+def test_counts_follow_service_changes(catalog):
+    media = Category.objects.get(slug="media")
+    service = Service.objects.filter(category=media).first()
+
+    service.is_active = False
+    service.save()
+    media.refresh_from_db()
+    assert media.active_service_count == 3
+
+    service.category = Category.objects.get(slug="monitoring")
+    service.is_active = True
+    service.save()
+    assert list(Category.objects.values_list("active_service_count", flat=True)) == [3, 5]
+
+    service.delete()
+    assert list(Category.objects.values_list("active_service_count", flat=True)) == [3, 4]
+
+
+@pytest.mark.django_db
+class TestLazyDashboard:
+    """Test the first dashboard page and the batches loaded while scrolling."""
+
+    def test_home_shows_category_sections(self, client, catalog):
+        content = client.get(reverse("core:home")).content.decode()
+        assert content.count('class="service-group-title"') == 3
+        assert content.index("Media") < content.index("Monitoring") < content.index("Other services")
+
+    def test_single_uncategorized_group_has_no_title(self, client, service):
+        assert 'class="service-group-title"' not in client.get(reverse("core:home")).content.decode()
+
+    def test_tags_are_shown(self, client, service):
+        service.tags.add(Tag.objects.create(name="self-hosted", slug="self-hosted"))
+        assert '<li class="service-tag">self-hosted</li>' in client.get(reverse("core:home")).content.decode()
+
+    def test_cards_follow_the_more_links(self, client, catalog, settings):
+        settings.DASHBOARD_PAGE_SIZE = 2
+        content = client.get(reverse("core:home")).content.decode()
+        assert "core/js/services.js" in content
+        cards = content.count('class="service-card"')
+        links = CARDS_LINK_RE.findall(content)
+        assert len(links) == 3
+        while links:
+            response = client.get(links.pop().replace("&amp;", "&"))
+            assert response.status_code == 200
+            assert "<html" not in response.content.decode()
+            cards += response.content.decode().count('class="service-card"')
+            links.extend(CARDS_LINK_RE.findall(response.content.decode()))
+        assert cards == len(catalog)
+
+    def test_no_script_without_more_services(self, client, service):
+        content = client.get(reverse("core:home")).content.decode()
+        assert "services-more" not in content
+        assert "core/js/services.js" not in content
+
+    def test_no_javascript_fallback(self, client, catalog, settings):
+        settings.DASHBOARD_PAGE_SIZE = 1
+        first = Service.objects.filter(category__slug="media").order_by("order", "name").first()
+        response = client.get(reverse("core:home"), {"after": encode_cursor(first)})
+        assert response.status_code == 200
+        assert response.content.decode().count('class="service-card"') == 1
+        assert "Media" in response.content.decode()
+
+    def test_cards_are_cached(self, client, catalog, django_assert_num_queries):
+        url = reverse("core:service-cards")
+        cursor = encode_cursor(catalog[3])
+        client.get(url, {"after": cursor})
+        with django_assert_num_queries(0):
+            assert client.get(url, {"after": cursor}).status_code == 200
+
+    @pytest.mark.parametrize("cursor", ["", "garbage", "Wzk5OSwwLCJhIiwxXQ"])
+    def test_invalid_cursor_is_not_found(self, client, cursor):
+        assert client.get(reverse("core:service-cards"), {"after": cursor}).status_code == 404
+        if cursor:
+            assert client.get(reverse("core:home"), {"after": cursor}).status_code == 404
@@ -0,0 +1,74 @@
+"""
+Tests for the preload Link header of the dashboard.
+"""
+
+from django.urls import reverse
+
+from apps.core import preload
+from apps.core.models import Category, Service
+from apps.core.pagination import encode_cursor
+from apps.core.staticfiles import CriticalCSS
+
+RENDITIONS = {
+    "source": "services/logos/a.png",
+    "src": "services/logos/renditions/a-80.png",
+    "width": 80,
+    "height": 80,
+    "sources": [
+        {"type": "image/avif", "srcset": [["services/logos/renditions/a-80.avif", "1x"], ["a-160.avif", "2x"]]},
+        {"type": "image/webp", "srcset": [["services/logos/renditions/a-80.webp", "1x"]]},
+    ],
+}
+
+
+def links(client, **params):
+    response = client.get(reverse("core:home"), params)
+    assert response.status_code == 200
+    return response["Link"].split(", <")
+
+
+def test_stylesheets_are_preloaded(client):
+    header = links(client)
+    assert header[0] == "</static/core/css/style.css>; rel=preload; as=style"
+    assert header[1].startswith("/icons/fontawesome.")
+    assert header[1].endswith("; rel=preload; as=style")
+
+
+def test_inlined_stylesheet_is_not_preloaded(client, monkeypatch):
+    monkeypatch.setattr(preload, "load_critical_css", lambda name: CriticalCSS(css="", complete=True))
+    assert "style.css" not in links(client)[0]
+
+
+def test_first_source_of_eager_logos(client):
+    Service.objects.create(name="A", logo_file="services/logos/a.png", logo_renditions=RENDITIONS)
+    assert links(client)[-1] == (
+        '/media/services/logos/renditions/a-80.avif>; rel=preload; as=image; type="image/avif"; '
+        'imagesrcset="/media/services/logos/renditions/a-80.avif 1x, /media/a-160.avif 2x"'
+    )
+
+
+def test_only_eager_logos_of_the_first_group(client):
+    media = Category.objects.create(name="Media", slug="media")
+    Service.objects.bulk_create(
+        Service(name=f"Logo {index}", logo_file=f"services/logos/{index}.png", category=media, order=index)
+        for index in range(preload.EAGER_LOGOS + 2)
+    )
+    Service.objects.create(name="Other", logo_file="services/logos/other.png")
+    Category.update_active_service_counts()
+
+    logos = [link for link in links(client) if "as=image" in link]
+    assert logos == [f"/media/services/logos/{index}.png>; rel=preload; as=image" for index in range(6)]
+
+
+def test_header_is_cached_per_version(client, service, django_assert_num_queries):
+    client.get(reverse("core:home"))
+    with django_assert_num_queries(0):
+        first = client.get(reverse("core:home"))["Link"]
+    Service.objects.create(name="B", logo_file="services/logos/b.png")
+    assert client.get(reverse("core:home"))["Link"] != first
+
+
+def test_not_sent_with_more_services(client, service):
+    response = client.get(reverse("core:home"), {"after": encode_cursor(service)})
+    assert response.status_code == 200
+    assert not response.has_header("Link")
@@ -0,0 +1,164 @@
+"""
+Tests for the asynchronous service prober.
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.management import call_command
+
+from apps.core.caching import get_services_version
+from apps.core.models import Service, ServiceStatus
+from apps.core.probes import ProbeError, Prober, split_url
+
+
+class ProbeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.server.connections.add(self.client_address)
+        status = 503 if self.path == "/broken" else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ProbeHandler)
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def server_url(server, path="/"):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+class TestSplitUrl:
+    def test_encodes_idn_hostnames(self):
+        key, target = split_url("https://torrent.home.wersdörfer.de")
+        assert key == ("https", "torrent.home.xn--wersdrfer-47a.de", 443)
+        assert target == "/"
+
+    def test_keeps_path_and_query(self):
+        key, target = split_url("http://example.com:8080/cms?x=1")
+        assert key == ("http", "example.com", 8080)
+        assert target == "/cms?x=1"
+
+    def test_rejects_non_http_urls(self):
+        with pytest.raises(ProbeError):
+            split_url("ftp://example.com/")
+
+    @pytest.mark.parametrize(
+        "url", ["http://:80/", "http://a..b/", f"http://{'a' * 64}.example/", "http://example.com:70000/"]
+    )
+    def test_rejects_invalid_urls(self, url):
+        with pytest.raises(ProbeError):
+            split_url(url)
+
+
+class TestBackoff:
+    def test_delay_grows_and_is_capped(self):
+        prober = Prober(backoff_base=1.0, backoff_cap=8.0)
+        for failures, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+            delay = prober.backoff_delay(failures)
+            assert ceiling / 2 <= delay <= ceiling
+
+    def test_failing_service_is_skipped_until_due(self):
+        prober = Prober(timeout=0.5, backoff_base=60.0)
+        result = asyncio.run(prober.probe(1, "http://127.0.0.1:1/"))
+
+        assert result.is_up is False
+        assert prober.backoff[1].failures == 1
+        assert prober.is_due(1) is False
+        assert asyncio.run(prober.run_round([(1, "http://127.0.0.1:1/")])) == []
+
+
+class TestProber:
+    def test_invalid_urls_are_down_without_failing_the_round(self, http_server, monkeypatch):
+        prober = Prober(timeout=0.5)
+        real_probe = prober.probe
+
+        async def probe(service_id, url):
+            if service_id == 3:
+                raise RuntimeError("unexpected")
+            return await real_probe(service_id, url)
+
+        monkeypatch.setattr(prober, "probe", probe)
+        targets = [(1, "http://example.com:70000/"), (2, server_url(http_server)), (3, server_url(http_server))]
+
+        async def run():
+            try:
+                return await prober.run_round(targets)
+            finally:
+                await prober.aclose()
+
+        results = asyncio.run(run())
+
+        assert [(result.service_id, result.is_up) for result in results] == [(1, False), (2, True), (3, False)]
+        assert results[0].error == "invalid URL: 'http://example.com:70000/'"
+        assert "unexpected" in results[2].error
+        assert prober.backoff[3].failures == 1
+
+    def test_round_reuses_pooled_connection(self, http_server):
+        async def probe_twice():
+            prober = Prober()
+            first = await prober.run_round([(1, server_url(http_server))])
+            second = await prober.run_round([(1, server_url(http_server))])
+            await prober.aclose()
+            return first + second
+
+        results = asyncio.run(probe_twice())
+
+        assert [result.is_up for result in results] == [True, True]
+        assert all(result.status_code == 200 and result.latency_ms is not None for result in results)
+        assert len(http_server.connections) == 1
+
+    def test_server_errors_count_as_down(self, http_server):
+        result = asyncio.run(Prober().probe(1, server_url(http_server, "/broken")))
+        assert result.is_up is False
+        assert result.status_code == 503
+        assert result.error == "HTTP 503"
+
+
+class TestProbeServicesCommand:
+    def test_once_stores_status_for_active_services(self, http_server):
+        up = Service.objects.create(name="Up", url=server_url(http_server))
+        down = Service.objects.create(name="Down", url=server_url(http_server, "/broken"))
+        Service.objects.create(name="Inactive", url=server_url(http_server), is_active=False)
+        Service.objects.create(name="No URL")
+
+        call_command("probe_services", "--once", verbosity=0)
+
+        assert ServiceStatus.objects.count() == 2
+        assert ServiceStatus.objects.get(service=up).is_up is True
+        down_status = ServiceStatus.objects.get(service=down)
+        assert down_status.is_up is False
+        assert down_status.consecutive_failures == 1
+
+    def test_home_view_shows_status(self, client, http_server):
+        Service.objects.create(name="Up", url=server_url(http_server))
+
+        call_command("probe_services", "--once", verbosity=0)
+        response = client.get("/")
+
+        assert "service-status-up" in response.content.decode()
+
+    def test_status_change_renews_the_dashboard_but_not_the_services_version(self, client, http_server):
+        Service.objects.create(name="Up", url=server_url(http_server))
+        assert "service-status-up" not in client.get("/").content.decode()
+        version = get_services_version()
+
+        call_command("probe_services", "--once", verbosity=0)
+
+        assert "service-status-up" in client.get("/").content.decode()
+        assert get_services_version() == version
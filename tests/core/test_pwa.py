@@ -0,0 +1,93 @@
+"""
+Tests for the web app manifest and the service worker.
+"""
+
+import json
+import re
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.urls import reverse
+
+from apps.core.models import Service
+
+CONFIG_RE = re.compile(r"^self\.HOMELAB = (.*);$", re.MULTILINE)
+
+
+def worker_config(client):
+    response = client.get(reverse("core:service-worker"))
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/javascript"
+    assert "no-cache" in response["Cache-Control"]
+    content = response.content.decode()
+    assert f'importScripts("{static("core/js/service-worker.js")}")' in content
+    return json.loads(CONFIG_RE.search(content).group(1))
+
+
+def test_worker_is_served_at_the_root():
+    assert reverse("core:service-worker") == "/sw.js"
+
+
+def test_static_files_exist():
+    for name in ["core/js/service-worker.js", "core/js/pwa.js", "core/manifest.webmanifest", "core/icons/homelab.svg"]:
+        assert finders.find(name), name
+
+
+def test_manifest():
+    with open(finders.find("core/manifest.webmanifest")) as f:
+        manifest = json.load(f)
+    assert manifest["start_url"] == manifest["scope"] == "/"
+    assert all(finders.find(f"core/{icon['src']}") for icon in manifest["icons"])
+
+
+def test_precaches_the_shell(client):
+    config = worker_config(client)
+    assert config["precache"][0] == "/"
+    assert static("core/css/style.css") in config["precache"]
+    assert any(url.startswith("/icons/fontawesome.") for url in config["precache"])
+    assert config["revalidate"] == ["/", "/services/cards/", "/api/services/"]
+
+
+def test_version_follows_services(client, service):
+    version = worker_config(client)["version"]
+    service.name = "Renamed"
+    service.save()
+    assert worker_config(client)["version"] != version
+
+
+def test_precaches_first_page_logos(client, settings):
+    settings.DASHBOARD_PAGE_SIZE = 1
+    renditions = {
+        "source": "services/logos/a.png",
+        "src": "services/logos/renditions/a-80.png",
+        "width": 80,
+        "height": 80,
+        "sources": [{"type": "image/webp", "srcset": [["services/logos/renditions/a-80.webp", "1x"]]}],
+    }
+    Service.objects.create(name="A", logo_file="services/logos/a.png", logo_renditions=renditions, order=0)
+    Service.objects.create(name="B", logo_file="services/logos/b.png", logo_renditions={**renditions}, order=1)
+
+    precache = worker_config(client)["precache"]
+    assert "/media/services/logos/renditions/a-80.png" in precache
+    assert "/media/services/logos/renditions/a-80.webp" in precache
+    # B is not on the first page, and its renditions are outdated anyway
+    assert not any("/b" in url for url in precache)
+
+
+def test_disabled_worker_unregisters(client, settings):
+    settings.SERVICE_WORKER = False
+    response = client.get(reverse("core:service-worker"))
+    assert b"unregister()" in response.content
+    assert "no-store" in response["Cache-Control"]
+    assert "core/js/pwa.js" not in client.get(reverse("core:home")).content.decode()
+
+
+def test_dashboard_registers_worker(client):
+    content = client.get(reverse("core:home")).content.decode()
+    assert 'rel="manifest"' in content
+    assert 'data-worker="/sw.js"' in content
+
+
+def test_personal_dashboard_is_not_stored(admin_client):
+    response = admin_client.get(reverse("core:home"))
+    assert "no-store" in response["Cache-Control"]
@@ -0,0 +1,147 @@
+"""
+Tests for the full-text service search.
+"""
+
+import json
+
+import pytest
+from django.urls import reverse
+
+from apps.core.models import Category, Service, Tag
+from apps.core.search import get_search_index, match_expression, rebuild_search_table, search_services
+
+
+def names(query):
+    return [result["name"] for result in search_services(query)]
+
+
+@pytest.fixture
+def services():
+    media = Category.objects.create(name="Media", slug="media")
+    jellyfin = Service.objects.create(name="Jellyfin", description="Stream movies and shows", category=media)
+    jellyfin.tags.add(Tag.objects.create(name="streaming", slug="streaming"))
+    Service.objects.create(name="Navidrome", description="Music server with Jellyfin-like playlists", category=media)
+    Service.objects.create(name="Grafana", description="Dashboards for metrics", url="https://grafana.example.com/")
+    return media
+
+
+class TestSearchServices:
+    """Test the FTS5 mirror and ranking."""
+
+    def test_prefix_matching(self, services):
+        assert names("graf") == ["Grafana"]
+        assert names("dashboards metr") == ["Grafana"]
+        assert names("dash metr") == []
+        assert names("graf stream") == []
+
+    def test_name_matches_rank_first(self, services):
+        assert names("jelly") == ["Jellyfin", "Navidrome"]
+
+    def test_matches_tags_and_category(self, services):
+        assert names("stream") == ["Jellyfin"]
+        assert sorted(names("media")) == ["Jellyfin", "Navidrome"]
+
+    def test_follows_changes(self, services):
+        grafana = Service.objects.get(name="Grafana")
+        grafana.name = "Grafana Cloud"
+        grafana.save()
+        assert names("cloud") == ["Grafana Cloud"]
+
+        grafana.tags.add(Tag.objects.create(name="observability", slug="observability"))
+        assert names("observ") == ["Grafana Cloud"]
+        Tag.objects.filter(name="observability").update(name="monitoring")
+        assert names("observ") == []
+        assert names("monit") == ["Grafana Cloud"]
+
+        Category.objects.filter(pk=services.pk).update(name="Entertainment")
+        assert sorted(names("entertain")) == ["Jellyfin", "Navidrome"]
+
+        grafana.delete()
+        assert names("graf") == []
+
+    def test_bulk_created_services_are_found(self):
+        Service.objects.bulk_create([Service(name=f"Bulk {index}") for index in range(3)])
+        assert len(names("bulk")) == 3
+
+    def test_inactive_services_are_not_found(self, services):
+        Service.objects.filter(name="Grafana").update(is_active=False)
+        assert names("graf") == []
+
+    @pytest.mark.parametrize("query", ['"', "NEAR(a b)", "a OR b*", "-", "col:jelly", "^jelly"])
+    def test_query_syntax_is_escaped(self, services, query):
+        search_services(query)
+
+    def test_match_expression(self):
+        assert match_expression("Jelly fin") == '"jelly" "fin"*'
+        assert match_expression(" -* ") is None
+
+    def test_rebuild(self, services):
+        rebuild_search_table()
+        assert names("jelly") == ["Jellyfin", "Navidrome"]
+
+
+class TestSearchViews:
+    """Test the search endpoint and the type-ahead index."""
+
+    def test_search_endpoint(self, client, services):
+        response = client.get(reverse("core:search"), {"q": "graf"})
+        assert response.status_code == 200
+        assert response.json() == {
+            "query": "graf",
+            "results": [
+                {
+                    "name": "Grafana",
+                    "url": "https://grafana.example.com/",
+                    "description": "Dashboards for metrics",
+                    "category": "",
+                }
+            ],
+        }
+
+    def test_empty_query(self, client, services):
+        assert client.get(reverse("core:search")).json()["results"] == []
+
+    def test_search_index(self, client, services):
+        index = get_search_index()
+        response = client.get(index["url"])
+        assert response.status_code == 200
+        assert "immutable" in response["Cache-Control"]
+        data = json.loads(response.content)
+        assert data["fields"] == ["name", "url", "category", "tags"]
+        assert ["Jellyfin", "", "Media", "streaming"] in data["services"]
+
+    def test_dashboard_links_index(self, client, services):
+        content = client.get(reverse("core:home")).content.decode()
+        assert f'data-index="{get_search_index()["url"]}"' in content
+        assert "core/js/search.js" in content
+
+    def test_no_index_for_large_catalogs(self, client, services, settings):
+        settings.SEARCH_INDEX_MAX_SERVICES = 2
+        assert get_search_index() is None
+        assert "data-index" not in client.get(reverse("core:home")).content.decode()
+        assert client.get(reverse("core:search-index", args=["0123456789ab"])).status_code == 404
+
+    def test_no_index_larger_than_the_cache_stores(self, client, services, settings, tmp_path):
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "apps.core.backends.cache.SharedMemoryCache",
+                "LOCATION": str(tmp_path),
+                "OPTIONS": {"MAX_ENTRIES": 64, "SLOT_SIZE": 512, "MAX_VALUE_SIZE": 512},
+            }
+        }
+        assert get_search_index() is None
+        assert "data-index" not in client.get(reverse("core:home")).content.decode()
+
+        # The decision is cached per services version, a larger cache is used after the next change.
+        settings.CACHES = {"default": {**settings.CACHES["default"], "OPTIONS": {"MAX_ENTRIES": 64, "SLOT_SIZE": 512}}}
+        Service.objects.create(name="Vaultwarden")
+        assert get_search_index() is not None
+
+    def test_outdated_index_redirects(self, client, services):
+        response = client.get(reverse("core:search-index", args=["0123456789ab"]))
+        assert response.status_code == 302
+        assert response["Location"] == get_search_index()["url"]
+
+    def test_admin_search_uses_full_text_table(self, admin_client, services):
+        response = admin_client.get(reverse("admin:core_service_changelist"), {"q": "jelly"})
+        assert [service.name for service in response.context["cl"].result_list] == ["Jellyfin", "Navidrome"]
@@ -0,0 +1,132 @@
+"""
+Tests for the shared-memory cache backend.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from apps.core.backends.cache import SharedMemoryCache
+
+
+def make_cache(path, **options):
+    options.setdefault("MAX_ENTRIES", 64)
+    options.setdefault("SLOT_SIZE", 1024)
+    return SharedMemoryCache(str(path), {"TIMEOUT": 300, "OPTIONS": options})
+
+
+@pytest.fixture
+def shm_cache(tmp_path):
+    return make_cache(tmp_path)
+
+
+def increment_many(path, times):
+    cache = make_cache(path)
+    for _ in range(times):
+        cache.incr("counter")
+
+
+class TestSharedMemoryCache:
+    def test_set_get_delete(self, shm_cache):
+        shm_cache.set("key", {"value": [1, 2, 3]})
+        assert shm_cache.get("key") == {"value": [1, 2, 3]}
+        assert shm_cache.has_key("key")
+        assert shm_cache.delete("key") is True
+        assert shm_cache.get("key", "missing") == "missing"
+        assert shm_cache.delete("key") is False
+
+    def test_add_only_sets_missing_keys(self, shm_cache):
+        assert shm_cache.add("key", 1) is True
+        assert shm_cache.add("key", 2) is False
+        assert shm_cache.get("key") == 1
+
+    def test_expired_entries_are_misses(self, shm_cache):
+        shm_cache.set("key", "value", timeout=0)
+        assert shm_cache.get("key") is None
+        assert shm_cache.add("key", "fresh") is True
+        assert shm_cache.get("key") == "fresh"
+
+    def test_touch_extends_and_expires(self, shm_cache):
+        shm_cache.set("key", "value", timeout=1)
+        assert shm_cache.touch("key", timeout=None) is True
+        assert shm_cache.touch("missing") is False
+        shm_cache.touch("key", timeout=0)
+        assert shm_cache.get("key") is None
+
+    def test_incr_and_decr(self, shm_cache):
+        shm_cache.set("counter", 10)
+        assert shm_cache.incr("counter") == 11
+        assert shm_cache.decr("counter", 5) == 6
+        with pytest.raises(ValueError):
+            shm_cache.incr("missing")
+
+    def test_full_bucket_evicts_least_recently_used(self, tmp_path):
+        cache = make_cache(tmp_path, MAX_ENTRIES=4, BUCKET_WAYS=4)
+        for index in range(4):
+            cache.set(f"key-{index}", index)
+            time.sleep(0.001)
+        cache.get("key-0")
+
+        cache.set("key-4", 4)
+
+        assert cache.get("key-0") == 0
+        assert cache.get("key-1") is None
+        assert [cache.get(f"key-{index}") for index in range(2, 5)] == [2, 3, 4]
+
+    def test_large_values_go_to_overflow_files(self, shm_cache, tmp_path):
+        overflow = tmp_path / "overflow"
+        shm_cache.set("key", "x" * 4096)
+        assert shm_cache.get("key") == "x" * 4096
+        assert len(list(overflow.iterdir())) == 1
+        # The file of the replaced value is removed.
+        shm_cache.set("key", "y" * 4096)
+        assert shm_cache.get("key") == "y" * 4096
+        assert len(list(overflow.iterdir())) == 1
+        shm_cache.set("key", "small")
+        assert shm_cache.get("key") == "small"
+        assert list(overflow.iterdir()) == []
+
+    def test_lost_overflow_file_is_a_miss(self, shm_cache, tmp_path):
+        shm_cache.set("key", "x" * 4096)
+        for path in (tmp_path / "overflow").iterdir():
+            path.unlink()
+        assert shm_cache.get("key", "missing") == "missing"
+
+    def test_values_above_max_value_size_are_not_stored(self, tmp_path, caplog):
+        cache = make_cache(tmp_path, MAX_VALUE_SIZE=2048)
+        cache.set("key", "small")
+        cache.set("key", "x" * 4096)
+        assert cache.get("key") is None
+        assert cache.add("other", "x" * 4096) is False
+        cache.set("key", "x" * 4096)
+        # Reported once per key, not on every attempt.
+        assert len([record for record in caplog.records if "MAX_VALUE_SIZE" in record.message]) == 2
+
+    def test_clear(self, shm_cache, tmp_path):
+        shm_cache.set_many({"a": 1, "b": 2, "c": "x" * 4096})
+        shm_cache.clear()
+        assert shm_cache.get_many(["a", "b", "c"]) == {}
+        assert list((tmp_path / "overflow").iterdir()) == []
+
+    def test_layout_change_replaces_file(self, tmp_path):
+        old = make_cache(tmp_path)
+        old.set("key", "value")
+        new = make_cache(tmp_path, SLOT_SIZE=2048)
+        assert new.get("key") is None
+        new.set("key", "new")
+        # The old mapping is left intact for workers that still use it.
+        assert old.get("key") == "value"
+        assert make_cache(tmp_path, SLOT_SIZE=2048).get("key") == "new"
+
+    def test_entries_are_shared_between_processes(self, tmp_path):
+        cache = make_cache(tmp_path)
+        cache.set("counter", 0)
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=increment_many, args=(tmp_path, 200)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert cache.get("counter") == 800
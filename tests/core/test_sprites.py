@@ -0,0 +1,79 @@
+"""
+Tests for the SVG logo sprite.
+"""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.core.logos import process_logo
+from apps.core.models import Service
+from apps.core.sprites import get_logo_sprite, symbol_from_svg
+
+GRADIENT_SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10" fill="none">
+  <defs><linearGradient id="g"><stop offset="0"/></linearGradient></defs>
+  <rect width="10" height="10" fill="url(#g)"/>
+  <use href="#g"/>
+</svg>"""
+
+
+def create_service(name, filename, content):
+    service = Service.objects.create(name=name, logo_file=SimpleUploadedFile(filename, content))
+    process_logo(service)
+    return service
+
+
+def test_symbol_ids_are_prefixed():
+    symbol = symbol_from_svg(GRADIENT_SVG, "logo-abc")
+    assert symbol.get("id") == "logo-abc"
+    assert symbol.get("viewBox") == "0 0 10 10"
+    assert symbol.get("fill") == "none"
+    rect = symbol.find("{http://www.w3.org/2000/svg}rect")
+    assert rect.get("fill") == "url(#logo-abc-g)"
+    assert symbol.find("{http://www.w3.org/2000/svg}use").get("href") == "#logo-abc-g"
+
+
+class TestLogoSprite:
+    def test_identical_logos_share_a_symbol(self, media_root):
+        first = create_service("First", "first.svg", GRADIENT_SVG)
+        second = create_service("Second", "second.svg", GRADIENT_SVG)
+
+        sprite = get_logo_sprite()
+
+        assert sprite["symbols"][first.pk] == sprite["symbols"][second.pk]
+        assert sprite["entry"]["identity"].count(b"<symbol") == 1
+
+    def test_dashboard_references_sprite(self, client, media_root):
+        service = create_service("Vector", "vector.svg", GRADIENT_SVG)
+        sprite = get_logo_sprite()
+
+        content = client.get("/").content.decode()
+
+        assert f'<use href="{sprite["url"]}#{sprite["symbols"][service.pk]}">' in content
+        assert 'aria-label="Vector logo"' in content
+
+    def test_sprite_is_served_immutable(self, client, media_root):
+        create_service("Vector", "vector.svg", GRADIENT_SVG)
+        url = get_logo_sprite()["url"]
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/svg+xml"
+        assert "immutable" in response["Cache-Control"]
+        assert client.get(url, headers={"If-None-Match": response["ETag"]}).status_code == 304
+
+    def test_logo_change_rebuilds_sprite(self, client, media_root):
+        service = create_service("Vector", "vector.svg", GRADIENT_SVG)
+        old_url = get_logo_sprite()["url"]
+
+        service.logo_file = SimpleUploadedFile("vector.svg", GRADIENT_SVG.replace(b"10 10", b"20 20"))
+        service.save()
+        process_logo(service)
+
+        new_url = get_logo_sprite()["url"]
+        assert new_url != old_url
+        assert client.get(old_url)["Location"] == new_url
+
+    def test_no_sprite_without_svg_logos(self, client, media_root):
+        Service.objects.create(name="Plain")
+        assert get_logo_sprite() is None
+        assert client.get("/sprites/logos.0123456789ab.svg").status_code == 404
@@ -0,0 +1,47 @@
+"""
+Tests for the tuned SQLite backend.
+"""
+
+import pytest
+from django.db.utils import ConnectionHandler
+
+
+@pytest.fixture
+def connection(tmp_path):
+    handler = ConnectionHandler(
+        {
+            "default": {
+                "ENGINE": "apps.core.backends.sqlite3",
+                "NAME": str(tmp_path / "db.sqlite3"),
+                "OPTIONS": {"pragmas": {"cache_size": -1024}, "transaction_mode": "IMMEDIATE"},
+            }
+        }
+    )
+    connection = handler["default"]
+    yield connection
+    connection.close()
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragma_profile_is_applied(connection, settings):
+    assert pragma(connection, "journal_mode") == "wal"
+    assert pragma(connection, "synchronous") == 1  # NORMAL
+    assert pragma(connection, "temp_store") == 2  # MEMORY
+    assert pragma(connection, "busy_timeout") == settings.SQLITE_PRAGMAS["busy_timeout"]
+    assert pragma(connection, "mmap_size") == settings.SQLITE_PRAGMAS["mmap_size"]
+
+
+def test_options_override_single_pragmas(connection):
+    assert pragma(connection, "cache_size") == -1024
+
+
+def test_in_memory_databases_skip_file_pragmas(settings):
+    handler = ConnectionHandler({"default": {"ENGINE": "apps.core.backends.sqlite3", "NAME": ":memory:"}})
+    connection = handler["default"]
+    assert "journal_mode" not in connection.get_pragmas()
+    assert pragma(connection, "synchronous") == 1
@@ -0,0 +1,110 @@
+"""
+Tests for the static asset build pipeline.
+"""
+
+import json
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from apps.core.staticfiles import extract_critical_css, load_critical_css, minify_css
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "apps.core.staticfiles.StaticBuildStorage"},
+}
+
+
+def collectstatic():
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+
+@pytest.fixture(scope="module")
+def first_build(tmp_path_factory):
+    """Compressing the admin files takes a while, so the full build only runs once."""
+    root = tmp_path_factory.mktemp("static")
+    with override_settings(STATIC_ROOT=root, STORAGES=STORAGES):
+        collectstatic()
+    return root
+
+
+@pytest.fixture
+def build_storage(settings, tmp_path, first_build):
+    shutil.copytree(first_build, tmp_path, dirs_exist_ok=True)
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = STORAGES
+    load_critical_css.cache_clear()
+    yield tmp_path
+    load_critical_css.cache_clear()
+
+
+def test_minify_css():
+    css = '/* comment */\n.a ,  .b > .c {\n  color: red;\n  content: " {  } ";\n}\n/*! license */'
+    assert minify_css(css) == '.a,.b>.c{color:red;content:" {  } "}/*! license */'
+
+
+def test_minify_css_keeps_strings_and_urls():
+    css = '.a { content: "x;}" ; } .b { background: url(data:image/svg+xml;utf8,<svg a=1;}>) ; /* end */ }'
+    assert minify_css(css) == '.a{content:"x;}"}.b{background:url(data:image/svg+xml;utf8,<svg a=1;}>)}'
+
+
+def test_extract_critical_css():
+    css = (
+        ":root{--x:1px}.navbar a:hover{color:red}.unused{color:blue}"
+        ".status-up{color:green}@media (max-width:10px){.navbar{display:none}.unused{margin:0}}"
+        "@keyframes spin{to{transform:rotate(1turn)}}"
+    )
+    html = '<nav class="navbar"><a href="/">x</a><span class="status-{{ state }}"></span></nav>'
+    assert extract_critical_css(css, [html]) == (
+        ":root{--x:1px}.navbar a:hover{color:red}.status-up{color:green}@media (max-width:10px){.navbar{display:none}}"
+    )
+
+
+def test_critical_css_keeps_referenced_keyframes():
+    css = (
+        "@keyframes spin{to{transform:rotate(1turn)}}@keyframes fade{to{opacity:0}}"
+        "@-webkit-keyframes spin{to{transform:rotate(1turn)}}"
+        ".loader{animation:1s linear infinite spin}.toast{animation-name:fade}"
+    )
+    assert extract_critical_css(css, ['<div class="loader"></div>']) == (
+        ".loader{animation:1s linear infinite spin}"
+        "@keyframes spin{to{transform:rotate(1turn)}}@-webkit-keyframes spin{to{transform:rotate(1turn)}}"
+    )
+
+
+class TestStaticBuildStorage:
+    def test_collectstatic_hashes_minifies_and_compresses(self, build_storage):
+        manifest = json.loads((build_storage / "staticfiles.json").read_text())
+        hashed = build_storage / manifest["paths"]["core/css/style.css"]
+        assert hashed.name != "style.css"
+        assert "\n" not in hashed.read_text()
+        assert hashed.with_name(hashed.name + ".gz").exists()
+        assert hashed.with_name(hashed.name + ".br").exists()
+        assert ".navbar{" in (build_storage / "core/css/style.critical.css").read_text()
+
+    def test_unchanged_files_are_not_compressed_again(self, build_storage):
+        manifest = json.loads((build_storage / "staticfiles.json").read_text())
+        compressed = build_storage / (manifest["paths"]["core/css/style.css"] + ".br")
+        compressed.write_bytes(b"marker")
+
+        collectstatic()
+
+        assert compressed.read_bytes() == b"marker"
+
+    def test_critical_css_is_inlined(self, build_storage, client):
+        (build_storage / "core/css/style.critical.css").write_text(".navbar{color:red}")
+
+        content = client.get("/").content.decode()
+
+        assert "<style>.navbar{color:red}</style>" in content
+        assert 'rel="preload"' in content
+
+    def test_complete_critical_css_replaces_the_stylesheet(self, build_storage, client):
+        (build_storage / "core/css/style.critical.css").write_text((build_storage / "core/css/style.css").read_text())
+
+        content = client.get("/").content.decode()
+
+        assert "<style>*{margin:0" in content
+        assert "core/css/style." not in content
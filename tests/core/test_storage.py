@@ -0,0 +1,139 @@
+"""
+Tests for the content-addressed logo storage and its garbage collection.
+"""
+
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from apps.core.backends.storage import ContentAddressedStorage, hashed_name
+from apps.core.logos import process_logo
+from apps.core.management.commands.collect_logos import delete_unreferenced
+from apps.core.models import Service
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10"><circle cx="5" cy="5" r="4"/></svg>'
+OTHER_SVG = SVG.replace(b'r="4"', b'r="3"')
+
+
+@pytest.fixture
+def storage(media_root):
+    return ContentAddressedStorage()
+
+
+def stored(media_root):
+    return sorted(path.relative_to(media_root).as_posix() for path in media_root.rglob("*") if path.is_file())
+
+
+def test_hashed_name():
+    digest = hashlib.sha256(SVG).hexdigest()
+    assert hashed_name("services/logos/Logo.SVG", digest) == f"services/logos/{digest[:2]}/{digest[2:4]}/{digest}.svg"
+
+
+def test_identical_content_is_stored_once(storage, media_root):
+    first = storage.save("services/logos/a.svg", ContentFile(SVG))
+    second = storage.save("services/logos/b.svg", ContentFile(SVG))
+    other = storage.save("services/logos/a.svg", ContentFile(OTHER_SVG))
+
+    assert first == second
+    assert other != first
+    assert stored(media_root) == sorted([first, other])
+    assert storage.url(first) == f"/media/{first}"
+
+
+def test_name_longer_than_max_length_is_rejected(storage):
+    with pytest.raises(SuspiciousFileOperation):
+        storage.save("services/logos/a.svg", ContentFile(SVG), max_length=80)
+
+
+def test_lost_race_keeps_the_first_file(storage, media_root, monkeypatch):
+    name = storage.save("services/logos/a.svg", ContentFile(SVG))
+    real_exists = storage.exists
+    checks = []
+
+    def exists(name):
+        # Another process writes the file between the first check and the write.
+        checks.append(name)
+        return len(checks) > 1 and real_exists(name)
+
+    monkeypatch.setattr(storage, "exists", exists)
+    assert storage.save("services/logos/a.svg", ContentFile(SVG)) == name
+    assert stored(media_root) == [name]
+
+
+def test_delete_removes_empty_shard_directories(storage, media_root):
+    name = storage.save("services/logos/a.svg", ContentFile(SVG))
+    storage.delete(name)
+    assert list((media_root / "services" / "logos").iterdir()) == []
+
+
+def test_hashed_logo_urls_are_immutable(client, media_root):
+    service = Service.objects.create(name="Logo", logo_file=SimpleUploadedFile("logo.svg", SVG))
+    response = client.get(service.logo_file.url)
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
+
+
+def test_replacing_a_shared_logo_keeps_its_renditions(media_root):
+    first = Service.objects.create(name="First", logo_file=SimpleUploadedFile("first.svg", SVG))
+    second = Service.objects.create(name="Second", logo_file=SimpleUploadedFile("second.svg", SVG))
+    process_logo(first)
+    process_logo(second)
+    assert first.logo_file.name == second.logo_file.name
+    assert first.logo_renditions == second.logo_renditions
+
+    first.logo_file = SimpleUploadedFile("first.svg", OTHER_SVG)
+    first.save()
+    process_logo(first)
+
+    assert (media_root / second.logo_renditions["src"]).exists()
+    assert first.logo_renditions["src"] != second.logo_renditions["src"]
+
+
+def test_new_upload_of_shared_content_is_not_collected(media_root, storage):
+    # Another process stored the content, its service row is not committed yet.
+    name = storage.save("services/logos/upload.svg", ContentFile(SVG))
+    dropped = Service.objects.create(name="Dropped", logo_file=name)
+    dropped.delete()
+    assert delete_unreferenced([name]) == []
+    assert stored(media_root) == [name]
+
+
+class TestCollectLogos:
+    def age(self, media_root, seconds):
+        past = time.time() - seconds
+        for path in media_root.rglob("*"):
+            os.utime(path, (past, past))
+
+    def test_deletes_only_unreferenced_files(self, media_root, storage):
+        kept = Service.objects.create(name="Kept", logo_file=SimpleUploadedFile("kept.svg", SVG))
+        process_logo(kept)
+        dropped = Service.objects.create(name="Dropped", logo_file=SimpleUploadedFile("dropped.svg", OTHER_SVG))
+        process_logo(dropped)
+        legacy = storage.save("services/logos/legacy.svg", ContentFile(b"<svg/>"))
+        Service.objects.filter(pk=dropped.pk).delete()
+        self.age(media_root, 7200)
+        out = io.StringIO()
+
+        call_command("collect_logos", stdout=out)
+
+        assert stored(media_root) == sorted([kept.logo_file.name, kept.logo_renditions["src"]])
+        assert legacy not in stored(media_root)
+        assert "Deleted 3 of 5 files" in out.getvalue()
+
+    def test_keeps_recent_files_and_dry_run(self, media_root, storage):
+        storage.save("services/logos/new.svg", ContentFile(SVG))
+        call_command("collect_logos", stdout=io.StringIO())
+        assert len(stored(media_root)) == 1
+
+        self.age(media_root, 7200)
+        out = io.StringIO()
+        call_command("collect_logos", dry_run=True, stdout=out)
+        assert len(stored(media_root)) == 1
+        assert "would delete 1 of 1 files" in out.getvalue()
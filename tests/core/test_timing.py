@@ -0,0 +1,62 @@
+"""
+Tests for the Server-Timing instrumentation.
+"""
+
+import logging
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from apps.core.timing import ServerTimingMiddleware, Timings, _current, measure
+
+
+def metric_names(header):
+    return [part.split(";")[0].strip() for part in header.split(",")]
+
+
+def test_dashboard_reports_phases(client, service, caplog):
+    with caplog.at_level(logging.INFO, logger="homelab.timing"):
+        response = client.get("/")
+
+    header = response["Server-Timing"]
+    assert metric_names(header) == ["db", "template", "cache", "app", "total"]
+    assert 'queries"' in header
+    record = next(record for record in caplog.records if record.name == "homelab.timing")
+    assert record.getMessage().startswith("GET / 200 db_ms=")
+    assert record.server_timing["db_count"] >= 1
+
+
+def test_cached_dashboard_has_no_queries(client, service):
+    client.get("/")
+    response = client.get("/")
+    assert metric_names(response["Server-Timing"]) == ["cache", "app", "total"]
+
+
+def test_nested_phases_are_exclusive(monkeypatch):
+    clock = iter([0.0, 1.0, 2.0, 5.0, 10.0, 10.0])
+    monkeypatch.setattr("apps.core.timing.time.perf_counter", lambda: next(clock))
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        with measure("template"):
+            with measure("db"):
+                pass
+    finally:
+        _current.reset(token)
+
+    # template ran from 1 to 10 seconds and spent 2 to 5 in the database
+    assert timings.durations == {"db": 3.0, "template": 6.0, "cache": 0.0, "media": 0.0}
+    assert {name: ms for name, ms, _count in timings.metrics()}["app"] == 1000.0
+
+
+def test_measure_outside_a_request_does_nothing():
+    with measure("db"):
+        pass
+    assert _current.get() is None
+
+
+def test_disabled_by_setting(settings):
+    settings.SERVER_TIMING = False
+    with pytest.raises(MiddlewareNotUsed):
+        ServerTimingMiddleware(lambda request: HttpResponse())
@@ -2,11 +2,33 @@
 Tests for core app views.
 """
 
+import importlib
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.urls import reverse
+from django.urls import clear_url_caches, resolve, reverse
 
+from apps.core import urls
 from apps.core.models import Service
+from config import urls as config_urls
+
+
+@pytest.fixture
+def async_views(settings):
+    """Route the dashboard to its async views, like the ASGI entry point does."""
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+
+
+def reload_urls():
+    importlib.reload(urls)
+    # The project URLconf holds the resolver of the included one.
+    importlib.reload(config_urls)
+    clear_url_caches()
 
 
 @pytest.mark.django_db
@@ -109,3 +131,34 @@ class TestHomeView:
         assert '<i class="fas fa-server"></i>' in content
 
         service.delete()
+
+
+class TestAsgi:
+    """With ASYNC_VIEWS the dashboard views are async and work under the ASGI handler."""
+
+    def test_views_follow_the_entry_point(self, async_views):
+        assert resolve(reverse("core:home")).func.view_class.view_is_async
+        assert resolve(reverse("core:service-cards")).func.view_class.view_is_async
+
+    def test_wsgi_views_are_sync(self):
+        assert not resolve(reverse("core:home")).func.view_class.view_is_async
+
+    def test_home_view(self, async_views, async_client, service):
+        response = async_to_sync(async_client.get)(reverse("core:home"))
+        assert response.status_code == 200
+        assert service.name in response.content.decode()
+        assert "ETag" in response
+
+    def test_connection_info(self, async_views, async_client):
+        response = async_to_sync(async_client.get)(
+            reverse("core:connection-info"), headers={"X-Forwarded-For": "100.64.1.2"}
+        )
+        assert response.status_code == 200
+        assert "100.64.1.2" in response.content.decode()
+
+    def test_asgi_application(self):
+        from django.core.handlers.asgi import ASGIHandler
+
+        from config.asgi import application
+
+        assert isinstance(application, ASGIHandler)
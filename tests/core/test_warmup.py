@@ -0,0 +1,41 @@
+"""
+Tests for worker warm-up.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from apps.core.caching import get_page_version, page_cache_key
+from apps.core.warmup import warmup
+
+
+def test_warmup_fills_dashboard_cache(service):
+    report = warmup()
+
+    assert report.errors == {}
+    assert list(report.timings) == ["urls", "templates", "database", "dashboard"]
+    assert cache.get(page_cache_key("home", get_page_version(status=True))) is not None
+
+
+def test_failing_step_is_reported(monkeypatch):
+    monkeypatch.setattr("apps.core.warmup.TEMPLATES", ["missing.html"])
+
+    report = warmup()
+
+    assert "templates" in report.errors
+    assert "dashboard" not in report.errors
+
+
+def test_slow_warmup_is_logged(settings, caplog):
+    settings.WARMUP_SLOW_MS = 0
+    warmup()
+    assert "Slow warm-up" in caplog.text
+
+
+def test_warmup_command(capsys):
+    call_command("warmup")
+    assert "total" in capsys.readouterr().out
+
+    with pytest.raises(CommandError):
+        call_command("warmup", "--max-ms", "0")